@@ -1,12 +1,54 @@
-"""Mem0 REST API Server for Protocol OMNI v16.2."""
+"""Mem0 REST API Server for Protocol OMNI v16.2.
+
+Mem0 calls run in worker threads so the event loop never blocks on an
+embedding or a Qdrant round trip. Every embedding (add, search, batch
+search) goes through one EmbeddingBatcher: a worker thread that collects
+requests for up to MEM0_EMBED_WAIT_MS, encodes them in one forward pass and
+serves repeats from an LRU cache keyed by content hash.
+"""
+import asyncio
+import hashlib
 import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 from mem0 import Memory
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 
 memory = None
+batcher = None
+
+# Upper bound on queries per /search/batch request
+MAX_BATCH_QUERIES = int(os.getenv("MEM0_MAX_BATCH_QUERIES", "256"))
+EMBED_MAX_BATCH = int(os.getenv("MEM0_EMBED_MAX_BATCH", "64"))
+EMBED_WAIT_MS = float(os.getenv("MEM0_EMBED_WAIT_MS", "5"))
+EMBED_CACHE_SIZE = int(os.getenv("MEM0_EMBED_CACHE_SIZE", "10000"))
+
+embed_batch_size = Histogram(
+    "mem0_embed_batch_size",
+    "Texts encoded per embedding forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+embed_queue_wait = Histogram(
+    "mem0_embed_queue_wait_seconds",
+    "Time an embedding request waited before its batch started",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+embed_encode_seconds = Histogram(
+    "mem0_embed_encode_seconds",
+    "Embedding forward pass duration",
+)
+embed_cache_total = Counter(
+    "mem0_embed_cache_total",
+    "Embedding cache lookups",
+    ["result"],
+)
 
 config = {
     "vector_store": {
@@ -33,10 +75,123 @@ config = {
     },
 }
 
+class EmbeddingBatcher:
+    """Micro-batching embedder with an LRU cache; embed_many is thread-safe and blocking."""
+
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]], max_batch: int = EMBED_MAX_BATCH,
+                 max_wait_ms: float = EMBED_WAIT_MS, cache_size: int = EMBED_CACHE_SIZE):
+        self._encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._worker.start()
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        keys = [hashlib.sha256(t.encode("utf-8")).digest() for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending = []
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = vector
+        hits = sum(r is not None for r in results)
+        embed_cache_total.labels(result="hit").inc(hits)
+        embed_cache_total.labels(result="miss").inc(len(texts) - hits)
+
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                future: Future = Future()
+                self._queue.put((text, keys[i], future, time.perf_counter()))
+                pending.append((i, future))
+        for i, future in pending:
+            results[i] = future.result()
+        return results
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._process(batch)
+            except Exception as e:
+                # Fail the batch, never the worker: callers block on future.result()
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch) -> None:
+        started = time.perf_counter()
+        for _, _, _, enqueued in batch:
+            embed_queue_wait.observe(started - enqueued)
+
+        # Identical texts queued together are encoded once
+        unique: Dict[bytes, str] = {}
+        for text, key, _, _ in batch:
+            unique.setdefault(key, text)
+        try:
+            vectors = self._encode(list(unique.values()))
+            if len(vectors) != len(unique):
+                raise RuntimeError(f"Encoder returned {len(vectors)} vectors for {len(unique)} texts")
+        except Exception as e:
+            for _, _, future, _ in batch:
+                future.set_exception(e)
+            return
+        embed_encode_seconds.observe(time.perf_counter() - started)
+        embed_batch_size.observe(len(unique))
+
+        by_key = dict(zip(unique.keys(), vectors))
+        with self._cache_lock:
+            for key, vector in by_key.items():
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        for _, key, future, _ in batch:
+            future.set_result(by_key[key])
+
+class BatchedEmbedder:
+    """Stands in for mem0's embedder so Memory.add/search embed through the batcher."""
+
+    def __init__(self, inner, batcher: EmbeddingBatcher):
+        self._inner = inner
+        self._batcher = batcher
+
+    def embed(self, text, memory_action=None):
+        return self._batcher.embed(text)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+def _encoder(embedder) -> Callable[[List[str]], List[List[float]]]:
+    """One forward pass per batch when the embedder exposes its SentenceTransformer."""
+    model = getattr(embedder, "model", None)
+    if model is not None and hasattr(model, "encode"):
+        return lambda texts: model.encode(texts, convert_to_numpy=True, batch_size=len(texts)).tolist()
+    return lambda texts: [embedder.embed(text, "search") for text in texts]
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global memory
+    global memory, batcher
     memory = Memory.from_config(config)
+    batcher = EmbeddingBatcher(_encoder(memory.embedding_model))
+    memory.embedding_model = BatchedEmbedder(memory.embedding_model, batcher)
     yield
 
 app = FastAPI(title="Mem0 Memory Server", version="1.0.0", lifespan=lifespan)
@@ -45,6 +200,10 @@ app = FastAPI(title="Mem0 Memory Server", version="1.0.0", lifespan=lifespan)
 async def health():
     return {"status": "ok", "vector_store": "qdrant"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 class AddRequest(BaseModel):
     messages: List[Dict[str, str]]
     user_id: str
@@ -55,13 +214,24 @@ class SearchRequest(BaseModel):
     user_id: str
     limit: Optional[int] = 10
 
+class BatchSearchQuery(BaseModel):
+    query: str
+    user_id: str
+    limit: Optional[int] = 10
+    agent_id: Optional[str] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchSearchQuery]
+
 # v16.2.4: Routes use /v1 prefix to match client expectations
 @app.post("/v1/memories/")
 @app.post("/v1/memories")
 @app.post("/memories")
 async def add_memory(request: AddRequest):
     try:
-        result = memory.add(request.messages, user_id=request.user_id, metadata=request.metadata)
+        result = await asyncio.to_thread(
+            memory.add, request.messages, user_id=request.user_id, metadata=request.metadata
+        )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -71,16 +241,98 @@ async def add_memory(request: AddRequest):
 @app.post("/memories/search")
 async def search_memory(request: SearchRequest):
     try:
-        results = memory.search(request.query, user_id=request.user_id, limit=request.limit)
+        results = await asyncio.to_thread(
+            memory.search, request.query, user_id=request.user_id, limit=request.limit
+        )
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+_CORE_PAYLOAD_KEYS = {"data", "hash", "created_at", "updated_at", "user_id", "agent_id", "run_id", "actor_id", "role"}
+
+def _format_hit(hit) -> Dict[str, Any]:
+    """Shape a vector-store hit like Memory.search results."""
+    payload = hit.payload or {}
+    item = {
+        "id": hit.id,
+        "memory": payload.get("data", ""),
+        "hash": payload.get("hash"),
+        "created_at": payload.get("created_at"),
+        "updated_at": payload.get("updated_at"),
+        "score": hit.score,
+    }
+    for key in ("user_id", "agent_id", "run_id", "actor_id", "role"):
+        if key in payload:
+            item[key] = payload[key]
+    metadata = {k: v for k, v in payload.items() if k not in _CORE_PAYLOAD_KEYS}
+    if metadata:
+        item["metadata"] = metadata
+    return item
+
+def _vector_search(query: BatchSearchQuery, vector: List[float]) -> List[Dict[str, Any]]:
+    """Memory.search's vector-store path, with the query embedded by the batch."""
+    filters = {"user_id": query.user_id}
+    if query.agent_id:
+        filters["agent_id"] = query.agent_id
+    hits = memory.vector_store.search(query=query.query, vectors=vector, limit=query.limit, filters=filters)
+    return [_format_hit(hit) for hit in hits]
+
+def _search_one(query: BatchSearchQuery) -> List[Dict[str, Any]]:
+    kwargs = {"user_id": query.user_id, "limit": query.limit}
+    if query.agent_id:
+        kwargs["agent_id"] = query.agent_id
+    results = memory.search(query.query, **kwargs)
+    return results.get("results", []) if isinstance(results, dict) else results
+
+def _lookup(query: BatchSearchQuery, vector: Optional[List[float]]) -> List[Dict[str, Any]]:
+    """One query's results: the batched vector lookup, else Memory.search."""
+    if vector is not None:
+        try:
+            return _vector_search(query, vector)
+        except Exception:
+            # Embedder or vector store internals differ: fall back below
+            pass
+    return _search_one(query)
+
+@app.post("/v1/memories/search/batch/")
+@app.post("/v1/memories/search/batch")
+@app.post("/memories/search/batch")
+async def search_memory_batch(request: BatchSearchRequest):
+    """
+    Many searches, any users: one embedding pass for every query, then
+    concurrent Qdrant lookups with each query's own user filter and limit.
+    A query whose lookup fails, or every query when embedding fails or the
+    graph store is enabled (its relations come from Memory.search's
+    post-processing), goes through Memory.search instead.
+    Results come back in request order; a failed query carries an error.
+    """
+    queries = request.queries
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    if not queries:
+        return {"results": []}
+
+    vectors: List[Optional[List[float]]] = [None] * len(queries)
+    if not getattr(memory, "enable_graph", False):
+        try:
+            vectors = await asyncio.to_thread(batcher.embed_many, [q.query for q in queries])
+        except Exception:
+            pass
+
+    outcomes = await asyncio.gather(
+        *(asyncio.to_thread(_lookup, q, v) for q, v in zip(queries, vectors)),
+        return_exceptions=True,
+    )
+    return {"results": [
+        {"results": [], "error": str(o)} if isinstance(o, Exception) else {"results": o}
+        for o in outcomes
+    ]}
+
 @app.get("/v1/memories/")
 @app.get("/v1/memories")
 async def get_all_memories_v1(user_id: str):
     try:
-        results = memory.get_all(user_id=user_id)
+        results = await asyncio.to_thread(memory.get_all, user_id=user_id)
         return {"memories": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,7 +340,7 @@ async def get_all_memories_v1(user_id: str):
 @app.get("/memories/{user_id}")
 async def get_all_memories(user_id: str):
     try:
-        results = memory.get_all(user_id=user_id)
+        results = await asyncio.to_thread(memory.get_all, user_id=user_id)
         return {"memories": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -97,7 +349,7 @@ async def get_all_memories(user_id: str):
 @app.get("/v1/memories/{memory_id}")
 async def get_memory(memory_id: str):
     try:
-        result = memory.get(memory_id)
+        result = await asyncio.to_thread(memory.get, memory_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -107,7 +359,7 @@ async def get_memory(memory_id: str):
 @app.delete("/memories/{memory_id}")
 async def delete_memory(memory_id: str):
     try:
-        memory.delete(memory_id)
+        await asyncio.to_thread(memory.delete, memory_id)
         return {"status": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Benchmark: single-pass matcher vs per-node keyword scans
+
+Protocol OMNI - Times the keyword work done per request on a corpus of
+realistic-length prompts (200-1500 chars), on each path:
+
+    legacy   what the graph did before agent.matcher: each node lowercases
+             the text and loops over its own keyword list (status,
+             trivial, sovereign, complex in classification; code in
+             knowledge; status_query in status), and the metacognition
+             gates run one re.search per marker
+    matcher  agent.matcher prompt_matcher.scan / response_matcher.scan,
+             one pass returning every category
+
+Every corpus entry is also checked for identical results: the same
+keywords per prompt category, and the same first marker per gate.
+
+Usage:
+    python scripts/benchmark_matcher.py
+    python scripts/benchmark_matcher.py --corpus prompts.jsonl --runs 20
+    python scripts/benchmark_matcher.py --corpus routing_log.jsonl --min-chars 0
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from agent.matcher import (  # noqa: E402
+    PROMPT_CATEGORIES,
+    RESPONSE_CATEGORIES,
+    VOCABULARY,
+    prompt_matcher,
+    response_matcher,
+)
+
+
+@dataclass
+class PathResult:
+    path: str
+    latencies_us: List[float] = field(default_factory=list)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def load_corpus(path: Optional[str], min_chars: int, max_chars: int, limit: int) -> List[str]:
+    """Prompts from a text/JSONL file, or chunks of the repo's markdown and prompts."""
+    texts: List[str] = []
+    if path:
+        with open(path) as f:
+            if path.endswith(".jsonl"):
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        texts.append(record.get("prompt") or record.get("content") or "")
+            else:
+                texts = [t.strip() for t in f.read().split("\n\n")]
+        texts = [t for t in texts if min_chars <= len(t) <= max_chars]
+    else:
+        rng = random.Random(0)
+        sources = sorted(REPO_ROOT.glob("*.md"))
+        for folder in ("prompts", "docs"):
+            sources += sorted((REPO_ROOT / folder).rglob("*.md"))
+        for source in sources:
+            text = source.read_text(errors="ignore")
+            pos = 0
+            while pos + min_chars < len(text):
+                size = rng.randint(min_chars, max_chars)
+                texts.append(text[pos:pos + size])
+                pos += size
+    return texts[:limit]
+
+
+def legacy_prompt_scan(prompt: str) -> Dict[str, List[str]]:
+    """Each node's own lowercase-and-loop scan, as before the shared matcher."""
+    hits = {}
+    for category in PROMPT_CATEGORIES:
+        prompt_lower = prompt.lower()
+        found = [kw for kw in VOCABULARY[category] if kw in prompt_lower]
+        if found:
+            hits[category] = found
+    return hits
+
+
+def legacy_response_scan(response: str) -> Dict[str, str]:
+    """One re.search per metacognition marker, first match per gate."""
+    text = response.strip().lower()
+    hits = {}
+    for category in RESPONSE_CATEGORIES:
+        for pattern in VOCABULARY[category]:
+            if re.search(pattern, text):
+                hits[category] = pattern
+                break
+    return hits
+
+
+def matcher_prompt_scan(prompt: str) -> Dict[str, List[str]]:
+    matches = prompt_matcher.scan(prompt)
+    return {c: sorted(set(matches.get(c)), key=VOCABULARY[c].index) for c in matches.categories()}
+
+
+def matcher_response_scan(response: str) -> Dict[str, str]:
+    matches = response_matcher.scan(response.strip())
+    return {c: matches.first(c) for c in matches.categories()}
+
+
+def run_path(name: str, scan: Callable[[str], object], corpus: List[str], runs: int) -> PathResult:
+    result = PathResult(path=name)
+    for _ in range(runs):
+        for text in corpus:
+            start = time.perf_counter()
+            scan(text)
+            result.latencies_us.append((time.perf_counter() - start) * 1e6)
+    return result
+
+
+def print_report(title: str, results: List[PathResult]) -> None:
+    print("\n" + "=" * 64)
+    print(title)
+    print("=" * 64)
+    print(f"{'Path':<10} {'Mean (us)':<12} {'p50 (us)':<12} {'p95 (us)':<12} {'p99 (us)':<12}")
+    print("-" * 64)
+    for r in results:
+        print(
+            f"{r.path:<10} {statistics.mean(r.latencies_us):<12.1f} {percentile(r.latencies_us, 50):<12.1f} "
+            f"{percentile(r.latencies_us, 95):<12.1f} {percentile(r.latencies_us, 99):<12.1f}"
+        )
+    print("-" * 64)
+    legacy, matcher = (statistics.mean(r.latencies_us) for r in results)
+    print(f"matcher is {legacy / matcher:.1f}x faster than legacy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass keyword matcher vs per-node scans")
+    parser.add_argument("--corpus", type=str, help="Text file (blank-line separated) or JSONL with prompt fields")
+    parser.add_argument("--min-chars", type=int, default=200)
+    parser.add_argument("--max-chars", type=int, default=1500)
+    parser.add_argument("--limit", type=int, default=2000, help="Maximum corpus entries")
+    parser.add_argument("--runs", type=int, default=10, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.min_chars, args.max_chars, args.limit)
+    if not corpus:
+        print("Empty corpus")
+        sys.exit(1)
+    lengths = [len(t) for t in corpus]
+    print(f"Corpus: {len(corpus)} prompts, {statistics.mean(lengths):.0f} chars mean, "
+          f"{min(lengths)}-{max(lengths)} chars")
+
+    mismatches = sum(
+        1 for t in corpus
+        if legacy_prompt_scan(t) != matcher_prompt_scan(t)
+        or legacy_response_scan(t) != matcher_response_scan(t)
+    )
+
+    print_report("PROMPT KEYWORDS (classification, knowledge, status)", [
+        run_path("legacy", legacy_prompt_scan, corpus, args.runs),
+        run_path("matcher", prompt_matcher.scan, corpus, args.runs),
+    ])
+    print_report("RESPONSE MARKERS (metacognition gates 1-2)", [
+        run_path("legacy", legacy_response_scan, corpus, args.runs),
+        run_path("matcher", lambda t: response_matcher.scan(t.strip()), corpus, args.runs),
+    ])
+    print("=" * 64)
+    print(f"Legacy/matcher result mismatches: {mismatches}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+MCP Upstream Benchmark: per-call subprocess vs persistent pipelined session
+
+Protocol OMNI - Drives the local echo server (src/mcp_proxy/echo_server.py)
+through mcp_proxy.upstream and times tools/call three ways:
+
+    cold       new subprocess + initialize per call (no session reuse)
+    session    one persistent session, calls issued one at a time
+    pipelined  one persistent session, N calls in flight at once
+
+Usage:
+    python scripts/benchmark_mcp_upstream.py
+    python scripts/benchmark_mcp_upstream.py --calls 500 --concurrency 32 --sleep-ms 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from mcp_proxy import echo_server  # noqa: E402
+from mcp_proxy.upstream import StdioSession, UpstreamConfig, UpstreamPool  # noqa: E402
+
+ECHO = UpstreamConfig(name="mcp_echo", command=[sys.executable, echo_server.__file__])
+
+
+@dataclass
+class ModeResult:
+    mode: str
+    calls: int
+    wall_s: float = 0.0
+    latencies_ms: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.wall_s if self.wall_s else 0.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def timed_call(call, latencies: List[float]) -> None:
+    start = time.perf_counter()
+    await call()
+    latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_cold(calls: int, sleep_ms: int) -> ModeResult:
+    result = ModeResult(mode="cold", calls=calls)
+
+    async def one():
+        session = StdioSession(ECHO)
+        await session.start()
+        try:
+            await session.request("tools/call", {"name": "echo", "arguments": {"sleep_ms": sleep_ms}})
+        finally:
+            await session.close()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        await timed_call(one, result.latencies_ms)
+    result.wall_s = time.perf_counter() - start
+    return result
+
+
+async def run_pool(mode: str, calls: int, concurrency: int, sleep_ms: int) -> ModeResult:
+    result = ModeResult(mode=mode, calls=calls)
+    pool = UpstreamPool({"mcp_echo": ECHO})
+    await pool.session("mcp_echo")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await timed_call(
+                lambda: pool.call("mcp_echo", "echo", {"sleep_ms": sleep_ms}, timeout=30),
+                result.latencies_ms,
+            )
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(calls)))
+        result.wall_s = time.perf_counter() - start
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        await pool.close()
+    return result
+
+
+def print_report(results: List[ModeResult], sleep_ms: int) -> None:
+    print("\n" + "=" * 78)
+    print(f"MCP UPSTREAM: echo server over stdio, {sleep_ms} ms simulated tool time")
+    print("=" * 78)
+    print(f"{'Mode':<10} {'Calls':<7} {'Wall (s)':<10} {'Calls/s':<10} {'p50 (ms)':<10} {'p95 (ms)':<10} {'Mean (ms)':<10}")
+    print("-" * 78)
+    for r in results:
+        if r.error:
+            print(f"{r.mode:<10} FAILED: {r.error}")
+            continue
+        print(
+            f"{r.mode:<10} {r.calls:<7} {r.wall_s:<10.2f} {r.throughput:<10.1f} "
+            f"{percentile(r.latencies_ms, 50):<10.2f} {percentile(r.latencies_ms, 95):<10.2f} "
+            f"{statistics.mean(r.latencies_ms):<10.2f}"
+        )
+    print("=" * 78)
+
+
+async def run(args) -> None:
+    results = [
+        await run_cold(args.cold_calls, args.sleep_ms),
+        await run_pool("session", args.calls, 1, args.sleep_ms),
+        await run_pool("pipelined", args.calls, args.concurrency, args.sleep_ms),
+    ]
+    print_report(results, args.sleep_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP upstream session benchmark")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per persistent-session mode")
+    parser.add_argument("--cold-calls", type=int, default=20, help="Calls for the subprocess-per-call mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight calls when pipelined")
+    parser.add_argument("--sleep-ms", type=int, default=2, help="Simulated tool latency")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Streaming Latency Benchmark: TTFT and inter-token latency
+
+Protocol OMNI - Measures how quickly SSE chunks reach the client through
+/v1/chat/completions (agent orchestrator) or directly from a llama.cpp server.
+
+Usage:
+    # Through the agent orchestrator (routing + context + model)
+    python scripts/benchmark_streaming.py --url http://192.168.3.10:8080/v1
+
+    # Directly against the Qwen executor for a baseline
+    python scripts/benchmark_streaming.py --url http://192.168.3.10:8002/v1 --model qwen2.5-coder-7b
+
+    # Force the Oracle, 5 runs
+    python scripts/benchmark_streaming.py --model deepseek-v3.2 --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import httpx
+
+BENCHMARK_PROMPT = "Explain, step by step, how a B-tree keeps itself balanced on insert."
+
+DEFAULT_URL = "http://192.168.3.10:8080/v1"
+TIMEOUT = 300  # 5 minutes for 671B model
+
+
+@dataclass
+class StreamResult:
+    run: int
+    ttft_ms: float = 0.0
+    total_ms: float = 0.0
+    chunks: int = 0
+    gaps_ms: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def run_once(url: str, model: str, prompt: str, max_tokens: int, run: int) -> StreamResult:
+    """Stream one completion and record chunk arrival times."""
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    result = StreamResult(run=run)
+
+    start = time.perf_counter()
+    last = None
+
+    try:
+        with httpx.Client(timeout=TIMEOUT) as client:
+            with client.stream("POST", f"{url}/chat/completions", json=payload) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                        content = chunk["choices"][0].get("delta", {}).get("content")
+                    except (json.JSONDecodeError, KeyError, IndexError, AttributeError):
+                        # Status short-circuit responses are plain text
+                        content = data
+                    if not content:
+                        continue
+
+                    now = time.perf_counter()
+                    if last is None:
+                        result.ttft_ms = (now - start) * 1000
+                    else:
+                        result.gaps_ms.append((now - last) * 1000)
+                    last = now
+                    result.chunks += 1
+
+    except httpx.HTTPStatusError as e:
+        result.error = f"HTTP {e.response.status_code}"
+    except Exception as e:
+        result.error = str(e)
+
+    result.total_ms = (time.perf_counter() - start) * 1000
+    return result
+
+
+def print_report(results: List[StreamResult]) -> None:
+    """Print per-run rows and aggregate TTFT / inter-token latency."""
+    print("\n" + "=" * 72)
+    print("STREAMING LATENCY: TTFT / INTER-TOKEN")
+    print("=" * 72)
+    print(f"{'Run':<5} {'TTFT (ms)':<12} {'Total (ms)':<12} {'Chunks':<8} {'ITL p50':<10} {'ITL p95':<10}")
+    print("-" * 72)
+
+    for r in results:
+        if r.error:
+            print(f"{r.run:<5} ERROR: {r.error}")
+            continue
+        print(
+            f"{r.run:<5} {r.ttft_ms:<12.1f} {r.total_ms:<12.1f} {r.chunks:<8} "
+            f"{percentile(r.gaps_ms, 50):<10.1f} {percentile(r.gaps_ms, 95):<10.1f}"
+        )
+
+    valid = [r for r in results if not r.error and r.chunks]
+    print("-" * 72)
+    if not valid:
+        print("No successful runs")
+        print("=" * 72)
+        return
+
+    ttfts = [r.ttft_ms for r in valid]
+    gaps = [g for r in valid for g in r.gaps_ms]
+    print(f"TTFT  mean={statistics.mean(ttfts):.1f}ms  p50={percentile(ttfts, 50):.1f}ms  "
+          f"p95={percentile(ttfts, 95):.1f}ms")
+    if gaps:
+        print(f"ITL   mean={statistics.mean(gaps):.1f}ms  p50={percentile(gaps, 50):.1f}ms  "
+              f"p95={percentile(gaps, 95):.1f}ms  p99={percentile(gaps, 99):.1f}ms")
+    ratio = statistics.mean(r.ttft_ms / r.total_ms for r in valid if r.total_ms)
+    print(f"TTFT / total = {ratio:.2%}  (close to 100% means the response was buffered)")
+    print("=" * 72)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE TTFT / inter-token latency benchmark")
+    parser.add_argument("--url", type=str, default=DEFAULT_URL, help="OpenAI-compatible base URL")
+    parser.add_argument("--model", type=str, default="auto", help="Model name or 'auto'")
+    parser.add_argument("--prompt", type=str, default=BENCHMARK_PROMPT, help="Prompt to send")
+    parser.add_argument("--max-tokens", type=int, default=256, help="Completion length")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs")
+    args = parser.parse_args()
+
+    print(f"Benchmarking {args.url} (model={args.model}, runs={args.runs})")
+    results = [
+        run_once(args.url, args.model, args.prompt, args.max_tokens, i + 1)
+        for i in range(args.runs)
+    ]
+    print_report(results)
+
+    sys.exit(0 if any(not r.error for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
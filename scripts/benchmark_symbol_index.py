@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Symbol Lookup Benchmark: local mmap index vs Memgraph (Bolt)
+
+Protocol OMNI - Indexes this repository's own source tree with
+scripts/index_code.py, writes a symbol index and times find_symbol-style
+lookups (exact names, prefixes and infix substrings) on each path:
+
+    index  knowledge.symbol_index.SymbolIndex.find (mmap + trigram postings)
+    scan   linear CONTAINS scan over in-memory symbols (baseline)
+    bolt   MemgraphClient.find_symbol against a live Memgraph (if reachable)
+
+Usage:
+    python scripts/benchmark_symbol_index.py
+    python scripts/benchmark_symbol_index.py --src src/ --queries 500
+    MEMGRAPH_URI=bolt://192.168.3.10:7687 python scripts/benchmark_symbol_index.py
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import index_code  # noqa: E402
+
+from knowledge.memgraph_client import CodeSymbol, MemgraphClient  # noqa: E402
+from knowledge.symbol_index import SymbolIndex  # noqa: E402
+
+
+@dataclass
+class PathResult:
+    path: str
+    latencies_us: List[float] = field(default_factory=list)
+    hits: int = 0
+    error: Optional[str] = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def build_queries(symbols: List[CodeSymbol], limit: int) -> List[str]:
+    """Exact names, 4-char prefixes and 4-char infixes drawn from the symbol table."""
+    names = sorted({s.name for s in symbols})
+    queries = []
+    for name in names:
+        queries.append(name)
+        if len(name) >= 6:
+            queries.append(name[:4])
+            mid = len(name) // 2
+            queries.append(name[mid - 2:mid + 2])
+    step = max(1, len(queries) // limit)
+    return queries[::step][:limit]
+
+
+def run_path(name: str, lookup: Callable[[str], list], queries: List[str], runs: int) -> PathResult:
+    result = PathResult(path=name)
+    try:
+        for _ in range(runs):
+            for q in queries:
+                start = time.perf_counter()
+                hits = lookup(q)
+                result.latencies_us.append((time.perf_counter() - start) * 1e6)
+                result.hits += len(hits)
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def print_report(results: List[PathResult], n_symbols: int, n_queries: int) -> None:
+    print("\n" + "=" * 72)
+    print(f"SYMBOL LOOKUP: {n_symbols} symbols, {n_queries} queries")
+    print("=" * 72)
+    print(f"{'Path':<8} {'Mean (us)':<12} {'p50 (us)':<12} {'p95 (us)':<12} {'p99 (us)':<12} {'Hits':<8}")
+    print("-" * 72)
+
+    baseline = None
+    for r in results:
+        if r.error:
+            print(f"{r.path:<8} SKIPPED: {r.error}")
+            continue
+        mean = statistics.mean(r.latencies_us)
+        if r.path == "index":
+            baseline = mean
+        print(
+            f"{r.path:<8} {mean:<12.1f} {percentile(r.latencies_us, 50):<12.1f} "
+            f"{percentile(r.latencies_us, 95):<12.1f} {percentile(r.latencies_us, 99):<12.1f} {r.hits:<8}"
+        )
+
+    print("-" * 72)
+    if baseline:
+        for r in results:
+            if r.path != "index" and not r.error:
+                print(f"index is {statistics.mean(r.latencies_us) / baseline:.1f}x faster than {r.path}")
+    print("=" * 72)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local symbol index vs Memgraph lookup benchmark")
+    parser.add_argument("--src", type=str, default=str(REPO_ROOT / "src"), help="Source tree to index")
+    parser.add_argument("--queries", type=int, default=300, help="Number of distinct queries")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the query set")
+    parser.add_argument("--skip-bolt", action="store_true", help="Do not contact Memgraph")
+    args = parser.parse_args()
+
+    src = Path(args.src)
+    files = [
+        f for f in (index_code.parse_file(p, src.parent) for p in src.rglob("*.py")
+                    if "__pycache__" not in str(p))
+        if f
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, "symbols.idx")
+        index_code.write_symbol_index([r for f in files for r in index_code.symbol_rows(f)], index_path)
+        index = SymbolIndex.open(index_path)
+        symbols = [index.symbol(i) for i in range(len(index))]
+        queries = build_queries(symbols, args.queries)
+
+        def scan(term: str) -> list:
+            return [s for s in symbols if term in s.name][:20]
+
+        results = [
+            run_path("index", lambda q: index.find(q, limit=20), queries, args.runs),
+            run_path("scan", scan, queries, args.runs),
+        ]
+
+        mismatches = sum(
+            1 for q in queries
+            if {s.qualified_name for s in index.find(q, limit=len(index))}
+            != {s.qualified_name for s in symbols if q in s.name}
+        )
+
+        if args.skip_bolt:
+            results.append(PathResult(path="bolt", error="--skip-bolt"))
+        else:
+            client = MemgraphClient(symbol_index_path="")
+            if client.health_check():
+                results.append(run_path("bolt", client.find_symbol, queries, 1))
+            else:
+                results.append(PathResult(path="bolt", error=f"Memgraph unreachable at {client.uri}"))
+            client.close()
+
+        print_report(results, len(index), len(queries))
+        print(f"Index/scan result mismatches: {mismatches}")
+        index.close()
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Routing Classifier Evaluation: learned model vs keyword heuristic
+
+Protocol OMNI - Replays labeled routing outcomes (agent.routing_log JSONL,
+labels via agent.routing_model.label_from_outcome) through both complexity
+classifiers and reports, for each:
+
+    oracle share   fraction of requests routed to DeepSeek
+    oracle recall  fraction of oracle-needing requests routed to DeepSeek
+    accuracy       exact complexity-label accuracy
+    p50/p99        per-prompt classification latency
+
+The model is then re-thresholded to the heuristic's oracle recall (equal
+quality) and the traffic that moves from DeepSeek to Qwen is reported.
+
+Usage:
+    python scripts/evaluate_router.py --model complexity.npz --log routing_log.jsonl
+    python scripts/evaluate_router.py --model complexity.npz --log a.jsonl b.jsonl --save-threshold
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from agent.nodes.classification import HeuristicClassifier  # noqa: E402
+from agent.routing_model import (  # noqa: E402
+    RouteMetrics,
+    RoutingModel,
+    calibrate_threshold,
+    load_examples,
+    route_metrics,
+)
+
+
+@dataclass
+class BackendResult:
+    name: str
+    predicted: List[str]
+    metrics: RouteMetrics
+    latencies_us: List[float]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def run_backend(
+    name: str,
+    classify: Callable[[str, int], str],
+    rows: Sequence[Tuple[str, int]],
+    labels: Sequence[str],
+) -> BackendResult:
+    predicted, latencies = [], []
+    for prompt, ctx in rows:
+        start = time.perf_counter()
+        predicted.append(classify(prompt, ctx))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return BackendResult(name, predicted, route_metrics(predicted, labels), latencies)
+
+
+def compare(model: RoutingModel, rows: Sequence[Tuple[str, int]], labels: Sequence[str]) -> float:
+    """Print the comparison table; returns the equal-quality threshold."""
+    heuristic = HeuristicClassifier()
+    results = [
+        run_backend("heuristic", lambda p, c: heuristic.classify(p, c)[0].value, rows, labels),
+        run_backend(f"linear@{model.threshold:.2f}", lambda p, c: model.classify(p, c)[0], rows, labels),
+    ]
+
+    proba = model.predict_proba_batch(rows)
+    p_oracle = proba[:, [c in ("complex", "tool_heavy") for c in model.classes]].sum(axis=1)
+    baseline = results[0].metrics
+    threshold = calibrate_threshold(p_oracle, labels, baseline.oracle_recall)
+    matched = [model.decide(p, threshold)[0] for p in proba]
+    results.append(BackendResult(
+        f"linear@{threshold:.2f}", matched, route_metrics(matched, labels), results[1].latencies_us,
+    ))
+
+    need_oracle = sum(label in ("complex", "tool_heavy") for label in labels)
+    print(f"\n{len(rows)} labeled requests, {need_oracle} need the oracle\n")
+    print(f"{'backend':<16} {'oracle share':>13} {'oracle recall':>14} {'accuracy':>9} {'p50 us':>8} {'p99 us':>8}")
+    print("-" * 72)
+    for r in results:
+        m = r.metrics
+        print(
+            f"{r.name:<16} {m.oracle_share:>12.1%} {m.oracle_recall:>13.1%} {m.accuracy:>8.1%} "
+            f"{percentile(r.latencies_us, 50):>8.1f} {percentile(r.latencies_us, 99):>8.1f}"
+        )
+
+    moved = baseline.oracle_share - results[-1].metrics.oracle_share
+    print(
+        f"\nAt equal oracle recall ({baseline.oracle_recall:.1%}), threshold {threshold:.2f} moves "
+        f"{moved:.1%} of all requests from DeepSeek to Qwen"
+        + (f" ({moved / baseline.oracle_share:.1%} of DeepSeek traffic)" if baseline.oracle_share else "")
+    )
+    return threshold
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluate the learned routing classifier")
+    parser.add_argument("--model", required=True, help="Trained model (.npz from train_router.py)")
+    parser.add_argument("--log", nargs="+", required=True, help="Routing log JSONL file(s)")
+    parser.add_argument("--save-threshold", action="store_true",
+                        help="Write the equal-quality threshold back into the model file")
+    args = parser.parse_args()
+
+    model = RoutingModel.load(args.model)
+    rows, labels = load_examples(args.log)
+    if not rows:
+        print("No labeled records found")
+        return 1
+
+    threshold = compare(model, rows, labels)
+    if args.save_threshold:
+        model.threshold = threshold
+        model.save(args.model)
+        print(f"Saved threshold {threshold:.3f} to {args.model}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
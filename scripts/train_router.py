@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Routing Classifier Training
+
+Protocol OMNI - Trains the hashed n-gram complexity model (agent.routing_model)
+on logged routing outcomes (ROUTING_LOG_PATH JSONL). A held-out split is used
+to calibrate the oracle threshold to the keyword heuristic's oracle recall,
+so the saved model routes at equal quality; the evaluation table from
+evaluate_router.py is printed for the holdout.
+
+Usage:
+    python scripts/train_router.py --log /nvme/agent/state/routing_log.jsonl \\
+        --out /nvme/models/router/complexity.npz
+    python scripts/train_router.py --log a.jsonl b.jsonl --bits 16 --epochs 12
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import evaluate_router  # noqa: E402
+import numpy as np  # noqa: E402
+
+from agent.routing_model import load_examples, train  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train the learned routing classifier")
+    parser.add_argument("--log", nargs="+", required=True, help="Routing log JSONL file(s)")
+    parser.add_argument("--out", required=True, help="Output model path (.npz)")
+    parser.add_argument("--bits", type=int, default=18, help="Hash space size as a power of two")
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for calibration")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, labels = load_examples(args.log)
+    if len(rows) < 10:
+        print(f"Only {len(rows)} labeled records; need at least 10")
+        return 1
+
+    order = np.random.default_rng(args.seed).permutation(len(rows))
+    n_holdout = max(1, int(len(rows) * args.holdout))
+    test_idx, train_idx = order[:n_holdout], order[n_holdout:]
+
+    counts = {label: labels.count(label) for label in sorted(set(labels))}
+    print(f"{len(rows)} labeled records {counts}: {len(train_idx)} train, {len(test_idx)} holdout")
+
+    start = time.perf_counter()
+    model = train(
+        [rows[i] for i in train_idx],
+        [labels[i] for i in train_idx],
+        n_features=1 << args.bits,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        seed=args.seed,
+    )
+    print(f"Trained {model.classes} in {time.perf_counter() - start:.1f}s")
+
+    model.threshold = evaluate_router.compare(
+        model, [rows[i] for i in test_idx], [labels[i] for i in test_idx]
+    )
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.out)
+    print(f"Saved model to {args.out} (threshold {model.threshold:.3f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Admission Control (v16.4)
+
+Per-endpoint concurrency limits with a priority queue in front of the
+model pools.
+
+DeepSeek generates at ~11 tok/s and can serve only a handful of
+generations at once; sending every request immediately slows them all
+down together until load-balancer timeouts fire. Each endpoint instead
+admits at most max_concurrency requests. The rest wait in a priority
+queue: interactive traffic first, then background traffic (GEPA
+evaluation, external metacognition, history summaries), FIFO within a
+priority.
+
+A waiting request is rejected with AdmissionRejected when:
+
+    overflow   the queue is full (a queued background request is dropped
+               instead when an interactive one arrives)
+    timeout    it waited longer than its priority's queue deadline
+
+call_model / stream_model_response then overflow Oracle requests to the
+Executor (ADMISSION_OVERFLOW_ENDPOINT); anything else surfaces as HTTP 429.
+
+Limits come from agent_stack.yaml (cognitive_trinity.<role>.max_concurrency)
+or ORACLE_MAX_CONCURRENCY / EXECUTOR_MAX_CONCURRENCY; 0 means unlimited.
+All bookkeeping runs on the event loop, so no locks are needed.
+"""
+
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .context_budget import ENDPOINT_ROLES, load_trinity_config
+
+logger = logging.getLogger("omni.agent.admission")
+
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+# Seconds a request may wait for a slot, per priority
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "20"))
+ADMISSION_BACKGROUND_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_BACKGROUND_QUEUE_TIMEOUT", "120"))
+# Retry-After (seconds) sent with 429 responses
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+# Endpoint that takes rejected Oracle requests ("" disables overflow)
+ADMISSION_OVERFLOW_ENDPOINT = os.getenv("ADMISSION_OVERFLOW_ENDPOINT", "qwen")
+
+# Used when agent_stack.yaml has no max_concurrency
+DEFAULT_MAX_CONCURRENCY = {
+    "deepseek": 4,
+    "qwen": 16,
+}
+
+MAX_CONCURRENCY_ENV = {
+    "deepseek": "ORACLE_MAX_CONCURRENCY",
+    "qwen": "EXECUTOR_MAX_CONCURRENCY",
+}
+
+admission_queue_wait = Histogram(
+    "agent_admission_queue_wait_seconds",
+    "Time requests spent queued for an inference slot",
+    ["endpoint", "priority", "outcome"],  # admitted, overflow, timeout
+    buckets=(0.005, 0.05, 0.25, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+
+admission_in_flight = Gauge(
+    "agent_admission_in_flight",
+    "Requests holding an inference slot",
+    ["endpoint"]
+)
+
+admission_queue_depth = Gauge(
+    "agent_admission_queue_depth",
+    "Requests waiting for an inference slot",
+    ["endpoint"]
+)
+
+admission_rejected_total = Counter(
+    "agent_admission_rejected_total",
+    "Requests refused a slot",
+    ["endpoint", "priority", "reason"]  # overflow, timeout
+)
+
+
+class Priority(enum.IntEnum):
+    """Queue priority; lower values are admitted first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Priority":
+        """Priority from a request header/field; unknown values are interactive."""
+        if value and value.strip().lower() in ("background", "batch", "low"):
+            return cls.BACKGROUND
+        return cls.INTERACTIVE
+
+
+class AdmissionRejected(Exception):
+    """No inference slot could be granted in time."""
+
+    def __init__(self, endpoint: str, reason: str, retry_after: int = ADMISSION_RETRY_AFTER):
+        super().__init__(f"{endpoint} admission rejected: {reason}")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limit and priority queue for one endpoint.
+
+    Usage:
+        controller = get_admission("deepseek")
+        async with controller.slot(Priority.INTERACTIVE):
+            ...  # call the model
+    """
+
+    def __init__(
+        self,
+        key: str,
+        max_concurrency: int,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+    ):
+        self.key = key
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        # (priority, arrival, future) min-heap
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _timeout(self, priority: Priority) -> float:
+        if priority is Priority.BACKGROUND:
+            return ADMISSION_BACKGROUND_QUEUE_TIMEOUT
+        return ADMISSION_QUEUE_TIMEOUT
+
+    def _reject(self, priority: Priority, reason: str, waited: float) -> AdmissionRejected:
+        self._record_rejection(priority, reason, waited)
+        return AdmissionRejected(self.key, reason)
+
+    def _record_rejection(self, priority: Priority, reason: str, waited: float) -> None:
+        name = priority.name.lower()
+        admission_rejected_total.labels(endpoint=self.key, priority=name, reason=reason).inc()
+        admission_queue_wait.labels(
+            endpoint=self.key, priority=name, outcome=reason
+        ).observe(waited)
+
+    def _admitted(self, priority: Priority, waited: float) -> None:
+        admission_queue_wait.labels(
+            endpoint=self.key, priority=priority.name.lower(), outcome="admitted"
+        ).observe(waited)
+        admission_in_flight.labels(endpoint=self.key).set(self.active)
+
+    def _remove(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        admission_queue_depth.labels(endpoint=self.key).set(len(self._waiters))
+
+    async def acquire(
+        self, priority: Priority = Priority.INTERACTIVE, timeout: Optional[float] = None
+    ) -> float:
+        """Wait for a slot; returns seconds queued. Raises AdmissionRejected."""
+        free = self.active < self.max_concurrency and not self._waiters
+        if self.max_concurrency <= 0 or free:
+            self.active += 1
+            self._admitted(priority, 0.0)
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            # Full: an interactive request displaces the newest background waiter
+            worst = max(self._waiters) if self._waiters else None
+            if worst is None or worst[0] <= priority:
+                raise self._reject(priority, "overflow", 0.0)
+            self._remove(worst)
+            worst[2].set_exception(AdmissionRejected(self.key, "overflow"))
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._arrivals), future)
+        heapq.heappush(self._waiters, entry)
+        admission_queue_depth.labels(endpoint=self.key).set(len(self._waiters))
+
+        try:
+            await asyncio.wait_for(future, self._timeout(priority) if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            if entry in self._waiters:
+                self._remove(entry)
+            raise self._reject(priority, "timeout", time.perf_counter() - start)
+        except AdmissionRejected:
+            # Displaced from a full queue by an interactive request
+            self._record_rejection(priority, "overflow", time.perf_counter() - start)
+            raise
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._remove(entry)
+            elif future.done() and not future.cancelled() and future.exception() is None:
+                # Slot was handed over just as the caller went away
+                self.release()
+            raise
+
+        waited = time.perf_counter() - start
+        self._admitted(priority, waited)
+        return waited
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            admission_queue_depth.labels(endpoint=self.key).set(len(self._waiters))
+            if not future.done():
+                # The slot passes straight to the waiter; active is unchanged
+                future.set_result(None)
+                return
+        self.active = max(self.active - 1, 0)
+        admission_in_flight.labels(endpoint=self.key).set(self.active)
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: Priority = Priority.INTERACTIVE, timeout: Optional[float] = None
+    ) -> AsyncIterator[float]:
+        """Hold a slot for the duration of the block; yields seconds queued."""
+        waited = await self.acquire(priority, timeout)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+
+def load_concurrency_limits(path: Optional[str] = None) -> Dict[str, int]:
+    """Per-endpoint max_concurrency from agent_stack.yaml or env, with defaults."""
+    limits = dict(DEFAULT_MAX_CONCURRENCY)
+    trinity = load_trinity_config(path)
+    for key, role in ENDPOINT_ROLES.items():
+        model = trinity.get(role) or {}
+        if model.get("max_concurrency") is not None:
+            limits[key] = int(model["max_concurrency"])
+    for key, env in MAX_CONCURRENCY_ENV.items():
+        value = os.getenv(env)
+        if value:
+            limits[key] = int(value)
+    return limits
+
+
+_controllers: Optional[Dict[str, AdmissionController]] = None
+
+
+def get_admission(endpoint_key: str) -> AdmissionController:
+    """Get the shared controller for an ENDPOINTS key."""
+    global _controllers
+    if _controllers is None:
+        _controllers = {
+            key: AdmissionController(key, limit)
+            for key, limit in load_concurrency_limits().items()
+        }
+        logger.info(
+            "Admission limits: "
+            + ", ".join(f"{k}={c.max_concurrency or 'unlimited'}" for k, c in _controllers.items())
+        )
+    return _controllers[endpoint_key]
+
+
+def admission_snapshot() -> Dict[str, Dict[str, int]]:
+    """Slot usage per endpoint for /health/full."""
+    return {
+        key: {"active": c.active, "queued": c.queued, "max_concurrency": c.max_concurrency}
+        for key, c in (_controllers or {}).items()
+    }
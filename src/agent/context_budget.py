@@ -0,0 +1,406 @@
+"""
+Context Budget (v16.4)
+
+Token-budgeted prompt assembly. Each endpoint's context window comes from
+config/agent_stack.yaml (cognitive_trinity.<role>.context_size); the
+completion's max_tokens is reserved out of it and memory, code context and
+chat history are packed into what is left:
+
+    pinned   leading system messages and the latest message, always kept
+             (an oversized latest message is cut to fit, but keeps at least
+             CONTEXT_LATEST_MIN_SHARE of the budget; the system messages
+             are cut instead when they would leave it less)
+    memory   at most CONTEXT_MEMORY_SHARE of the remainder, trimmed by line
+    code     at most CONTEXT_CODE_SHARE of the remainder, trimmed by line
+    history  older turns, newest first, until the budget is spent
+
+Tokens are counted with the endpoint's own tokenizer.json (HuggingFace
+`tokenizers`, loaded from local disk, never downloaded). Without the
+package or the file a word-piece heuristic is used instead. Counts are
+cached per string, so re-packing the same history on every turn only
+tokenizes the new message.
+
+The reserve is capped at half the window, so a large max_tokens does not
+starve the prompt; completion_tokens() then lowers the outgoing max_tokens
+to what the packed prompt leaves of the window.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter
+
+logger = logging.getLogger("omni.agent.context_budget")
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    Tokenizer = None
+    TOKENIZERS_AVAILABLE = False
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+AGENT_STACK_PATH = os.getenv("AGENT_STACK_PATH", "/config/agent_stack.yaml")
+_REPO_STACK_PATH = Path(__file__).resolve().parents[2] / "config" / "agent_stack.yaml"
+
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "8192"))
+CONTEXT_MEMORY_SHARE = float(os.getenv("CONTEXT_MEMORY_SHARE", "0.25"))
+CONTEXT_CODE_SHARE = float(os.getenv("CONTEXT_CODE_SHARE", "0.25"))
+CONTEXT_LATEST_MIN_SHARE = float(os.getenv("CONTEXT_LATEST_MIN_SHARE", "0.25"))
+# Chat-template tokens per message (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# ENDPOINTS key -> cognitive_trinity role in agent_stack.yaml
+ENDPOINT_ROLES = {
+    "deepseek": "oracle",
+    "qwen": "executor",
+}
+
+# Used when agent_stack.yaml is missing or has no context_size
+DEFAULT_CONTEXT_SIZES = {
+    "deepseek": 8192,
+    "qwen": 16384,
+}
+
+# Per-endpoint overrides for the tokenizer.json path in agent_stack.yaml
+TOKENIZER_PATH_ENV = {
+    "deepseek": "ORACLE_TOKENIZER_PATH",
+    "qwen": "EXECUTOR_TOKENIZER_PATH",
+}
+
+TRUNCATION_MARKER = "... (truncated)"
+
+token_count_cache_requests_total = Counter(
+    "agent_token_count_cache_requests_total",
+    "Token count cache lookups",
+    ["result"]  # hit, miss
+)
+
+context_trimmed_total = Counter(
+    "agent_context_trimmed_total",
+    "Prompt parts trimmed or dropped to fit the endpoint context budget",
+    ["endpoint", "part"]  # memory, code, history, latest, system
+)
+
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def heuristic_token_count(text: str) -> int:
+    """BPE-like estimate: one token per punctuation mark, ~4 chars per word piece."""
+    return sum(math.ceil(len(piece) / 4) for piece in _WORD_PIECES.findall(text))
+
+
+@dataclass
+class EndpointContext:
+    """Context window settings for one endpoint."""
+    context_size: int
+    tokenizer_path: Optional[str] = None
+
+
+def load_trinity_config(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """The cognitive_trinity section of agent_stack.yaml ({} if it can't be read)."""
+    candidates = [Path(path)] if path else [Path(AGENT_STACK_PATH), _REPO_STACK_PATH]
+    stack_path = next((p for p in candidates if p.is_file()), None)
+    if yaml is None or stack_path is None:
+        logger.info("agent_stack.yaml not loaded, using defaults")
+        return {}
+    try:
+        with open(stack_path) as f:
+            return (yaml.safe_load(f) or {}).get("cognitive_trinity", {}) or {}
+    except Exception as e:
+        logger.warning(f"Failed to read {stack_path}: {e}")
+        return {}
+
+
+def load_endpoint_contexts(path: Optional[str] = None) -> Dict[str, EndpointContext]:
+    """Read per-endpoint context_size/tokenizer from agent_stack.yaml, with defaults."""
+    contexts = {key: EndpointContext(context_size=size) for key, size in DEFAULT_CONTEXT_SIZES.items()}
+
+    trinity = load_trinity_config(path)
+    for key, role in ENDPOINT_ROLES.items():
+        model = trinity.get(role) or {}
+        if model.get("context_size"):
+            contexts[key].context_size = int(model["context_size"])
+        contexts[key].tokenizer_path = model.get("tokenizer")
+
+    for key, env in TOKENIZER_PATH_ENV.items():
+        if os.getenv(env):
+            contexts[key].tokenizer_path = os.getenv(env)
+    return contexts
+
+
+class TokenCounter:
+    """Counts tokens with a local tokenizer (or the heuristic), caching per string."""
+
+    def __init__(self, tokenizer: Any = None, cache_size: int = TOKEN_COUNT_CACHE_SIZE):
+        self._tokenizer = tokenizer
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Optional[str], **kwargs) -> "TokenCounter":
+        """Load a tokenizer.json; falls back to the heuristic if it can't be loaded."""
+        tokenizer = None
+        if path and TOKENIZERS_AVAILABLE:
+            try:
+                tokenizer = Tokenizer.from_file(path)
+                logger.info(f"Loaded tokenizer from {path}")
+            except Exception as e:
+                logger.warning(f"Failed to load tokenizer {path}: {e}")
+        elif path:
+            logger.warning("tokenizers package not installed, using heuristic token counts")
+        return cls(tokenizer, **kwargs)
+
+    @property
+    def exact(self) -> bool:
+        return self._tokenizer is not None
+
+    def _count(self, text: str) -> int:
+        if self._tokenizer is None:
+            return heuristic_token_count(text)
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+        if cached is not None:
+            token_count_cache_requests_total.labels(result="hit").inc()
+            return cached
+
+        token_count_cache_requests_total.labels(result="miss").inc()
+        n = self._count(text)
+        with self._lock:
+            self._cache[text] = n
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return n
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        return self.count(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+    def fit_lines(self, text: str, max_tokens: int) -> str:
+        """
+        Keep whole leading lines of text within max_tokens.
+
+        A trailing closing tag line (e.g. </relevant_memories>) is kept so the
+        block stays well-formed; a marker line notes the truncation.
+        """
+        if max_tokens <= 0 or not text:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+
+        lines = text.split("\n")
+        tail = [lines.pop()] if len(lines) > 1 and lines[-1].startswith("</") else []
+        tail.insert(0, TRUNCATION_MARKER)
+        # Each line break is roughly one token
+        used = sum(self.count(line) + 1 for line in tail)
+
+        kept = []
+        for line in lines:
+            cost = self.count(line) + 1
+            if used + cost > max_tokens:
+                break
+            kept.append(line)
+            used += cost
+
+        if not kept:
+            return ""
+        return "\n".join(kept + tail)
+
+
+@dataclass
+class PackedContext:
+    """Result of packing one request into an endpoint's budget."""
+    messages: List[Dict[str, Any]]
+    memory_context: str
+    code_context: str
+    budget: int
+    prompt_tokens: int
+    dropped_messages: int = 0
+    trimmed: List[str] = field(default_factory=list)
+
+
+class ContextBudget:
+    """Per-endpoint token budgets and counters."""
+
+    def __init__(self, contexts: Optional[Dict[str, EndpointContext]] = None):
+        self.contexts = contexts if contexts is not None else load_endpoint_contexts()
+        self._counters: Dict[str, TokenCounter] = {}
+        self._lock = threading.Lock()
+
+    def context_size(self, endpoint_key: str) -> int:
+        context = self.contexts.get(endpoint_key)
+        return context.context_size if context else min(DEFAULT_CONTEXT_SIZES.values())
+
+    def counter(self, endpoint_key: str) -> TokenCounter:
+        with self._lock:
+            counter = self._counters.get(endpoint_key)
+            if counter is None:
+                context = self.contexts.get(endpoint_key)
+                counter = TokenCounter.from_file(context.tokenizer_path if context else None)
+                self._counters[endpoint_key] = counter
+            return counter
+
+    def prompt_budget(self, endpoint_key: str, max_tokens: int) -> int:
+        """Context size minus the completion reserve (at most half the window)."""
+        context_size = self.context_size(endpoint_key)
+        return context_size - min(max(max_tokens, 0), context_size // 2)
+
+    def completion_tokens(
+        self, endpoint_key: str, messages: List[Dict[str, Any]], max_tokens: int
+    ) -> int:
+        """max_tokens lowered so the outgoing messages plus completion fit the window."""
+        prompt_tokens = self.counter(endpoint_key).count_messages(messages)
+        available = self.context_size(endpoint_key) - prompt_tokens
+        return max(min(max_tokens, available), 1)
+
+    @staticmethod
+    def _fit_message(
+        counter: "TokenCounter", message: Dict[str, Any], max_tokens: int
+    ) -> Dict[str, Any]:
+        """message with its text cut to max_tokens: whole lines, or characters for one long line."""
+        content = message.get("content")
+        if not isinstance(content, str):
+            return message
+        allowance = max_tokens - MESSAGE_OVERHEAD_TOKENS
+        fitted = counter.fit_lines(content, allowance)
+        if not fitted and allowance > 0:
+            fitted = content
+            while fitted and counter.count(fitted) > allowance:
+                fitted = fitted[:int(len(fitted) * 0.9 * allowance / counter.count(fitted))]
+        return {**message, "content": fitted}
+
+    @classmethod
+    def _fit_messages(
+        cls, counter: "TokenCounter", messages: List[Dict[str, Any]], max_tokens: int
+    ) -> List[Dict[str, Any]]:
+        """Leading messages within max_tokens; the first that overflows is cut, the rest dropped."""
+        fitted: List[Dict[str, Any]] = []
+        left = max_tokens
+        for message in messages:
+            cost = counter.count_message(message)
+            if cost > left:
+                if left > MESSAGE_OVERHEAD_TOKENS:
+                    fitted.append(cls._fit_message(counter, message, left))
+                break
+            fitted.append(message)
+            left -= cost
+        return fitted
+
+    def pack(
+        self,
+        endpoint_key: str,
+        messages: List[Dict[str, Any]],
+        memory_context: str = "",
+        code_context: str = "",
+        max_tokens: int = 4096,
+    ) -> PackedContext:
+        """Fit memory, code context and history into the endpoint's prompt budget."""
+        counter = self.counter(endpoint_key)
+        budget = self.prompt_budget(endpoint_key, max_tokens)
+        trimmed = []
+
+        n_system = 0
+        while n_system < len(messages) and messages[n_system].get("role") == "system":
+            n_system += 1
+        system = list(messages[:n_system])
+        rest = messages[n_system:]
+        latest, history = rest[-1:], rest[:-1]
+
+        system_cost = counter.count_messages(system)
+        latest_cost = counter.count_messages(latest)
+        if latest and system_cost + latest_cost > budget:
+            # An oversized system prompt must not crowd out the question
+            allowance = max(budget - system_cost, int(budget * CONTEXT_LATEST_MIN_SHARE))
+            if latest_cost > allowance:
+                latest = [self._fit_message(counter, latest[0], allowance)]
+                trimmed.append("latest")
+                context_trimmed_total.labels(endpoint=endpoint_key, part="latest").inc()
+        used = counter.count_messages(latest)
+        if system_cost + used > budget:
+            system = self._fit_messages(counter, system, budget - used)
+            trimmed.append("system")
+            context_trimmed_total.labels(endpoint=endpoint_key, part="system").inc()
+        used += counter.count_messages(system)
+        remaining = max(budget - used, 0)
+
+        fitted_memory = counter.fit_lines(memory_context, int(remaining * CONTEXT_MEMORY_SHARE))
+        fitted_code = counter.fit_lines(code_context, int(remaining * CONTEXT_CODE_SHARE))
+        for part, original, fitted in (("memory", memory_context, fitted_memory),
+                                       ("code", code_context, fitted_code)):
+            if fitted != original:
+                trimmed.append(part)
+                context_trimmed_total.labels(endpoint=endpoint_key, part=part).inc()
+
+        if fitted_memory or fitted_code:
+            # Context joins the system message (or becomes one)
+            used += (counter.count(fitted_memory) + counter.count(fitted_code)
+                     + MESSAGE_OVERHEAD_TOKENS)
+            if fitted_code:
+                used += counter.count("<code_context>\n\n</code_context>")
+
+        kept: List[Dict[str, Any]] = []
+        for message in reversed(history):
+            cost = counter.count_message(message)
+            if used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+
+        dropped = len(history) - len(kept)
+        if dropped:
+            trimmed.append("history")
+            context_trimmed_total.labels(endpoint=endpoint_key, part="history").inc()
+
+        return PackedContext(
+            messages=system + kept + latest,
+            memory_context=fitted_memory,
+            code_context=fitted_code,
+            budget=budget,
+            prompt_tokens=used,
+            dropped_messages=dropped,
+            trimmed=trimmed,
+        )
+
+
+_context_budget: Optional[ContextBudget] = None
+_context_budget_lock = threading.Lock()
+
+
+def get_context_budget() -> ContextBudget:
+    """Get or create the process-wide ContextBudget."""
+    global _context_budget
+    if _context_budget is None:
+        with _context_budget_lock:
+            if _context_budget is None:
+                _context_budget = ContextBudget()
+    return _context_budget
+
+
+def count_tokens(text: str, endpoint_key: str = "deepseek") -> int:
+    """Token count of text under the endpoint's tokenizer."""
+    return get_context_budget().counter(endpoint_key).count(text)
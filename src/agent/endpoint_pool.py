@@ -0,0 +1,325 @@
+"""
+Endpoint Pools (v16.4)
+
+Load-balanced replica pools for the model tiers in ENDPOINTS.
+
+Each tier ("deepseek", "qwen") may run several replicas, e.g. one Qwen
+executor per CPU socket plus a hot spare for DeepSeek. An EndpointPool
+exposes the same post()/stream()/endpoint interface as a single
+InferenceTransport, and picks a replica per request:
+
+    least_outstanding  fewest requests in flight (ties go to the lower
+                       latency EWMA, then round-robin)
+    ewma               lowest latency EWMA weighted by (in flight + 1),
+                       so a slow replica sheds load before it queues
+
+Ejection is passive: connection errors, timeouts and 5xx responses feed a
+per-replica CircuitBreaker (health.py), and an open breaker takes the
+replica out of rotation until POOL_EJECT_SECONDS have passed, when one
+trial request is let through. Spares only receive traffic while every
+primary is ejected; if everything is ejected the pool fails open and
+keeps sending to the least-loaded replica.
+
+Replicas are read from agent_stack.yaml (cognitive_trinity.<role>.replicas,
+balancing) or from ORACLE_REPLICAS / EXECUTOR_REPLICAS (comma-separated
+URLs); a tier with neither keeps its single ENDPOINTS url.
+
+Lifecycle: main.py's lifespan calls open_pools() / close_pools().
+Pools are also created lazily so the graph works outside the API.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from .context_budget import ENDPOINT_ROLES, load_trinity_config
+from .health import CircuitBreaker
+from .nodes.state import ENDPOINTS, ModelEndpoint
+from .transport import InferenceTransport
+
+logger = logging.getLogger("omni.agent.endpoint_pool")
+
+BALANCING_STRATEGIES = ("least_outstanding", "ewma")
+POOL_BALANCING = os.getenv("POOL_BALANCING", "least_outstanding")
+# Consecutive failures that eject a replica
+POOL_EJECT_FAILURES = int(os.getenv("POOL_EJECT_FAILURES", "3"))
+# Seconds an ejected replica waits before a trial request
+POOL_EJECT_SECONDS = float(os.getenv("POOL_EJECT_SECONDS", "30"))
+# Weight of the newest latency sample in the EWMA
+POOL_EWMA_ALPHA = float(os.getenv("POOL_EWMA_ALPHA", "0.3"))
+
+# Per-tier replica URL overrides
+REPLICAS_ENV = {
+    "deepseek": "ORACLE_REPLICAS",
+    "qwen": "EXECUTOR_REPLICAS",
+}
+
+replica_in_flight = Gauge(
+    "agent_replica_in_flight",
+    "Requests in flight per model replica",
+    ["endpoint", "replica"]
+)
+
+replica_latency_ewma = Gauge(
+    "agent_replica_latency_ewma_seconds",
+    "Exponentially weighted request latency per model replica",
+    ["endpoint", "replica"]
+)
+
+replica_requests_total = Counter(
+    "agent_replica_requests_total",
+    "Requests per model replica by outcome",
+    ["endpoint", "replica", "outcome"]  # success, failure
+)
+
+
+@dataclass
+class ReplicaConfig:
+    """One configured replica of a model tier."""
+    url: str
+    spare: bool = False
+
+
+class Replica:
+    """A single model server: its pooled transport, load and passive health."""
+
+    def __init__(self, pool_key: str, name: str, endpoint: ModelEndpoint, spare: bool = False):
+        self.pool_key = pool_key
+        self.name = name
+        self.spare = spare
+        self.transport = InferenceTransport(name, endpoint)
+        self.breaker = CircuitBreaker(
+            f"replica:{name}",
+            failure_threshold=POOL_EJECT_FAILURES,
+            reset_timeout=POOL_EJECT_SECONDS,
+        )
+        self.in_flight = 0
+        self.ewma_ms: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        return self.transport.endpoint.url
+
+    @property
+    def ejected(self) -> bool:
+        return not self.breaker.ready()
+
+    def observe(self, latency_ms: float, ok: bool) -> None:
+        """Fold one request outcome into the latency EWMA and the breaker."""
+        if ok:
+            self.ewma_ms = latency_ms if self.ewma_ms is None else (
+                POOL_EWMA_ALPHA * latency_ms + (1 - POOL_EWMA_ALPHA) * self.ewma_ms
+            )
+            replica_latency_ewma.labels(endpoint=self.pool_key, replica=self.name).set(self.ewma_ms / 1000)
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        replica_requests_total.labels(
+            endpoint=self.pool_key, replica=self.name, outcome="success" if ok else "failure"
+        ).inc()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "spare": self.spare,
+            "in_flight": self.in_flight,
+            "latency_ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "circuit": self.breaker.state.value,
+        }
+
+
+@dataclass
+class Lease:
+    """A replica held for one request; set failed for 5xx responses."""
+    replica: Replica
+    failed: bool = False
+
+
+class EndpointPool:
+    """
+    Balanced pool of replicas for one ENDPOINTS key.
+
+    Usage:
+        pool = get_pool("qwen")
+        response = pool.post("/chat/completions", body)
+        with pool.stream("/chat/completions", body) as response:
+            for line in response.iter_lines(): ...
+    """
+
+    def __init__(
+        self,
+        key: str,
+        endpoint: ModelEndpoint,
+        replicas: List[ReplicaConfig],
+        balancing: str = POOL_BALANCING,
+    ):
+        if balancing not in BALANCING_STRATEGIES:
+            logger.warning(f"Unknown balancing '{balancing}' for {key}, using least_outstanding")
+            balancing = "least_outstanding"
+        self.key = key
+        self.endpoint = endpoint
+        self.balancing = balancing
+        configs = replicas or [ReplicaConfig(url=endpoint.url)]
+        # A lone replica keeps the tier's name so transport metrics stay comparable
+        self.replicas = [
+            Replica(
+                key,
+                key if len(configs) == 1 else f"{key}-{i}",
+                replace(endpoint, url=config.url.rstrip("/")),
+                spare=config.spare,
+            )
+            for i, config in enumerate(configs)
+        ]
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(r.in_flight for r in self.replicas)
+
+    def _score(self, replica: Replica) -> tuple:
+        ewma = replica.ewma_ms or 0.0
+        if self.balancing == "ewma":
+            return ((replica.in_flight + 1) * ewma, replica.in_flight)
+        return (replica.in_flight, ewma)
+
+    def _choose(self) -> Replica:
+        """Pick a replica and count it as in flight (caller holds the lock)."""
+        candidates = [r for r in self.replicas if not r.spare and not r.ejected]
+        if not candidates:
+            candidates = [r for r in self.replicas if r.spare and not r.ejected]
+        if not candidates:
+            # Everything ejected: fail open rather than refuse the request
+            candidates = self.replicas
+
+        # Rotate the starting point so ties spread across replicas
+        offset = next(self._rotation) % len(candidates)
+        ordered = candidates[offset:] + candidates[:offset]
+        replica = min(ordered, key=self._score)
+        replica.breaker.allow()  # claims the half-open trial, if any
+        replica.in_flight += 1
+        return replica
+
+    @contextmanager
+    def lease(self) -> Iterator[Lease]:
+        """Hold a replica for one request; transport errors count as failures."""
+        with self._lock:
+            replica = self._choose()
+        replica_in_flight.labels(endpoint=self.key, replica=replica.name).inc()
+        lease = Lease(replica)
+        start = time.perf_counter()
+        try:
+            yield lease
+        except httpx.TransportError:
+            lease.failed = True
+            raise
+        finally:
+            with self._lock:
+                replica.in_flight -= 1
+            replica_in_flight.labels(endpoint=self.key, replica=replica.name).dec()
+            replica.observe((time.perf_counter() - start) * 1000, ok=not lease.failed)
+
+    def post(self, path: str, json: Dict[str, Any]) -> httpx.Response:
+        """POST to the chosen replica over its pooled connection."""
+        with self.lease() as lease:
+            response = lease.replica.transport.post(path, json)
+            lease.failed = response.status_code >= 500
+            return response
+
+    @contextmanager
+    def stream(self, path: str, json: Dict[str, Any]) -> Iterator[httpx.Response]:
+        """Open a streaming POST on the chosen replica."""
+        with self.lease() as lease:
+            with lease.replica.transport.stream(path, json) as response:
+                lease.failed = response.status_code >= 500
+                yield response
+
+    def open(self) -> None:
+        for replica in self.replicas:
+            replica.transport.open()
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.transport.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "balancing": self.balancing,
+            "replicas": {r.name: r.to_dict() for r in self.replicas},
+        }
+
+
+def _parse_replicas(entries: Any) -> List[ReplicaConfig]:
+    """Replica list from yaml (urls or {url, spare} mappings) or a comma-separated string."""
+    if isinstance(entries, str):
+        entries = [e.strip() for e in entries.split(",") if e.strip()]
+    replicas = []
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            replicas.append(ReplicaConfig(url=str(entry["url"]), spare=bool(entry.get("spare", False))))
+        else:
+            replicas.append(ReplicaConfig(url=str(entry)))
+    return replicas
+
+
+def build_pools(path: Optional[str] = None) -> Dict[str, EndpointPool]:
+    """One pool per ENDPOINTS key, with replicas from agent_stack.yaml or env."""
+    trinity = load_trinity_config(path)
+    pools = {}
+    for key, endpoint in ENDPOINTS.items():
+        model = trinity.get(ENDPOINT_ROLES.get(key, ""), {}) or {}
+        env_replicas = os.getenv(REPLICAS_ENV.get(key, ""), "")
+        replicas = _parse_replicas(env_replicas or model.get("replicas"))
+        pool = EndpointPool(key, endpoint, replicas, model.get("balancing", POOL_BALANCING))
+        if len(pool) > 1:
+            logger.info(
+                f"Endpoint pool {key}: {len(pool)} replicas ({pool.balancing}): "
+                + ", ".join(f"{r.url}{' (spare)' if r.spare else ''}" for r in pool.replicas)
+            )
+        pools[key] = pool
+    return pools
+
+
+_pools: Optional[Dict[str, EndpointPool]] = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(endpoint_key: str) -> EndpointPool:
+    """Get the shared pool for an ENDPOINTS key, building all pools on first use."""
+    global _pools
+    if _pools is None:
+        with _pools_lock:
+            if _pools is None:
+                _pools = build_pools()
+    return _pools[endpoint_key]
+
+
+def open_pools() -> None:
+    """Open pooled clients for every replica (lifespan startup)."""
+    for key in ENDPOINTS:
+        get_pool(key).open()
+
+
+def close_pools() -> None:
+    """Close every replica's pooled client (lifespan shutdown)."""
+    global _pools
+    with _pools_lock:
+        pools, _pools = _pools, None
+    for pool in (pools or {}).values():
+        pool.close()
+
+
+def pools_snapshot() -> Dict[str, Any]:
+    """Per-replica load and ejection state for /health/full."""
+    return {key: pool.snapshot() for key, pool in (_pools or {}).items()}
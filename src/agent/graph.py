@@ -5,25 +5,45 @@ Defines the DAG-based cognitive routing workflow using LangGraph.
 Replaces custom CognitiveRouter with industry-standard graph execution.
 
 Graph Topology:
-    START → parse → memory → classify → {status | knowledge → model} → store → metacog → END
+    START → parse → compact → classify → {status | context(memory ∥ knowledge) → cache → {hit | model}}
+          → store → metacog → cache_response → END
     
 v16.3.3: Added status node for self-introspection queries (Operation Internalize Part 3)
+v16.4: Classification runs first (pure CPU); memory and knowledge retrieval run
+       concurrently in one context stage. Per-stage timings land in stage_timings.
+       Verified responses are cached; cache hits skip call_model entirely.
+       Older turns of long chats are compacted into a cached running summary
+       before classification. Borderline COMPLEX prompts can be hedged: the
+       executor answers first and the oracle only runs if the gates fail.
 """
 
+import asyncio
+import functools
+import json
 import logging
 import os
 import time
-from typing import Any, AsyncIterator, Dict, Literal
+from typing import Any, AsyncIterator, Callable, Dict, Literal
 
 from langgraph.graph import END, StateGraph
 
+from .nodes.cache import cache_response, check_response_cache
 from .nodes.classification import classify_complexity
+from .nodes.context import retrieve_context
+from .nodes.hedge import (
+    executor_first,
+    hedged_call,
+    record_oracle_dispatch,
+    record_oracle_win,
+    should_hedge,
+)
+from .nodes.history import compact_history
 from .nodes.inference import call_model, stream_model_response
-from .nodes.knowledge import retrieve_knowledge
-from .nodes.memory import retrieve_memory, store_memory
+from .nodes.memory import should_retrieve_memory, store_memory
 from .nodes.metacognition import metacog_verify, should_verify
-from .nodes.state import ComplexityLevel, GraphState
+from .nodes.state import ComplexityLevel, GraphState, merge_stage_timings
 from .nodes.status import handle_status
+from .routing_log import record_outcome
 
 logger = logging.getLogger("omni.agent.graph")
 
@@ -65,15 +85,10 @@ def should_use_memory(state: GraphState) -> Literal["retrieve", "skip"]:
     Determine if memory retrieval should run.
 
     Returns 'skip' for trivial greetings to reduce latency.
-    Memory is retrieved before classification to inform routing.
     """
-    prompt = state.get("prompt", "").lower()
-
-    trivial_greetings = ["hello", "hi", "hey", "thanks", "thank you", "bye"]
-    if any(g in prompt for g in trivial_greetings) and len(prompt) < 50:
-        return "skip"
-
-    return "retrieve"
+    if should_retrieve_memory(state):
+        return "retrieve"
+    return "skip"
 
 
 def route_by_complexity(state: GraphState) -> Literal["deepseek", "qwen"]:
@@ -88,7 +103,7 @@ def route_by_complexity(state: GraphState) -> Literal["deepseek", "qwen"]:
     return "qwen"
 
 
-def route_after_classify(state: GraphState) -> Literal["status", "knowledge"]:
+def route_after_classify(state: GraphState) -> Literal["status", "context"]:
     """
     Route after classification - status queries short-circuit to status node.
     
@@ -97,7 +112,20 @@ def route_after_classify(state: GraphState) -> Literal["status", "knowledge"]:
     if state.get("is_status_query", False):
         logger.info("Routing to status node (introspection query)")
         return "status"
-    return "knowledge"
+    return "context"
+
+
+def route_after_cache(state: GraphState) -> Literal["hit", "hedge", "miss"]:
+    """
+    Route after the response cache - hits skip inference and verification.
+
+    v16.4: Borderline prompts go to the hedged executor-first call.
+    """
+    if state.get("cache_hit", False):
+        return "hit"
+    if should_hedge(state):
+        return "hedge"
+    return "miss"
 
 
 def should_run_metacog(state: GraphState) -> Literal["verify", "skip"]:
@@ -132,11 +160,49 @@ def finalize_response(state: GraphState) -> Dict[str, Any]:
     start_time = state.get("start_time", time.perf_counter())
     latency_ms = (time.perf_counter() - start_time) * 1000
 
+    # v16.4: Training data for the learned classifier (ROUTING_LOG_PATH)
+    record_outcome(state)
+
     return {
         "latency_ms": latency_ms,
     }
 
 
+def timed(stage: str, node: Callable) -> Callable:
+    """
+    Wrap a node so its wall time is recorded as stage_timings[f"{stage}_ms"].
+
+    Timings reported by the node itself (e.g. memory_ms) are kept.
+    """
+    def _record(update: Dict[str, Any], start: float) -> Dict[str, Any]:
+        update = dict(update or {})
+        update["stage_timings"] = merge_stage_timings(
+            update.get("stage_timings"),
+            {f"{stage}_ms": (time.perf_counter() - start) * 1000},
+        )
+        return update
+
+    if asyncio.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state: GraphState) -> Dict[str, Any]:
+            start = time.perf_counter()
+            return _record(await node(state), start)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def sync_wrapper(state: GraphState) -> Dict[str, Any]:
+        start = time.perf_counter()
+        return _record(node(state), start)
+    return sync_wrapper
+
+
+def _apply_update(state: GraphState, update: Dict[str, Any]) -> None:
+    """Merge a node update into state the way the graph reducers would."""
+    timings = merge_stage_timings(state.get("stage_timings"), update.get("stage_timings"))
+    state.update(update)
+    state["stage_timings"] = timings
+
+
 def build_workflow() -> StateGraph:
     """
     Build the cognitive workflow graph.
@@ -146,52 +212,62 @@ def build_workflow() -> StateGraph:
     workflow = StateGraph(GraphState)
 
     workflow.add_node("parse", parse_request)
-    workflow.add_node("retrieve_memory", retrieve_memory)
-    workflow.add_node("classify", classify_complexity)
-    workflow.add_node("handle_status", handle_status)  # v16.3.3: Status node
-    workflow.add_node("retrieve_knowledge", retrieve_knowledge)
-    workflow.add_node("call_model", call_model)
-    workflow.add_node("store_memory", store_memory)
-    workflow.add_node("metacog", metacog_verify)
+    workflow.add_node("compact", timed("compact", compact_history))  # v16.4
+    workflow.add_node("classify", timed("classify", classify_complexity))
+    workflow.add_node("handle_status", timed("status", handle_status))  # v16.3.3: Status node
+    workflow.add_node("retrieve_context", timed("context", retrieve_context))  # v16.4: Fan-out
+    workflow.add_node("check_cache", timed("cache", check_response_cache))  # v16.4
+    workflow.add_node("call_model", timed("call_model", call_model))
+    workflow.add_node("hedged_call", timed("hedge", hedged_call))  # v16.4
+    workflow.add_node("store_memory", timed("store_memory", store_memory))
+    workflow.add_node("metacog", timed("metacog", metacog_verify))
+    workflow.add_node("cache_response", cache_response)
     workflow.add_node("finalize", finalize_response)
 
     workflow.set_entry_point("parse")
 
-    workflow.add_conditional_edges(
-        "parse",
-        should_use_memory,
-        {
-            "retrieve": "retrieve_memory",
-            "skip": "classify",
-        }
-    )
+    # v16.4: Compaction only reads cached summaries, so it never waits on a model
+    workflow.add_edge("parse", "compact")
 
-    workflow.add_edge("retrieve_memory", "classify")
+    # v16.4: Classification is pure CPU, so it runs before any retrieval
+    workflow.add_edge("compact", "classify")
 
     # v16.3.3: Conditional routing after classify
-    # Status queries short-circuit to handle_status, others go to knowledge
+    # Status queries short-circuit to handle_status, others fetch context
     workflow.add_conditional_edges(
         "classify",
         route_after_classify,
         {
             "status": "handle_status",
-            "knowledge": "retrieve_knowledge",
+            "context": "retrieve_context",
         }
     )
 
     # Status queries skip model call and go directly to store_memory
     workflow.add_edge("handle_status", "store_memory")
 
-    workflow.add_edge("retrieve_knowledge", "call_model")
+    workflow.add_edge("retrieve_context", "check_cache")
+
+    # v16.4: Cache hits were verified when stored, so they go straight out
+    workflow.add_conditional_edges(
+        "check_cache",
+        route_after_cache,
+        {
+            "hit": "finalize",
+            "hedge": "hedged_call",
+            "miss": "call_model",
+        }
+    )
 
     workflow.add_edge("call_model", "store_memory")
+    workflow.add_edge("hedged_call", "store_memory")
 
     workflow.add_conditional_edges(
         "store_memory",
         should_run_metacog,
         {
             "verify": "metacog",
-            "skip": "finalize",
+            "skip": "cache_response",
         }
     )
 
@@ -199,11 +275,13 @@ def build_workflow() -> StateGraph:
         "metacog",
         route_after_metacog,
         {
-            "respond": "finalize",
+            "respond": "cache_response",
             "retry": "call_model",
         }
     )
 
+    workflow.add_edge("cache_response", "finalize")
+
     workflow.add_edge("finalize", END)
 
     return workflow.compile()
@@ -221,6 +299,7 @@ async def invoke_graph(
     max_tokens: int = 4096,
     stream: bool = False,
     model: str = "auto",
+    priority: str = "interactive",
 ) -> Dict[str, Any]:
     """
     Invoke the cognitive graph with the given input.
@@ -228,6 +307,8 @@ async def invoke_graph(
     Args:
         model: Model override. Use "auto" for complexity-based routing,
                or specify "deepseek-v3.2", "qwen", etc. for manual override.
+        priority: Admission priority, "interactive" or "background"
+                  (GEPA/metacognition traffic queues behind users).
 
     Returns final state with response, usage, latency, etc.
     """
@@ -240,6 +321,7 @@ async def invoke_graph(
         "max_tokens": max_tokens,
         "stream": stream,
         "model": model,
+        "priority": priority,
     }
 
     if TRACING_ENABLED and tracer:
@@ -267,12 +349,13 @@ async def stream_graph(
     temperature: float = 0.7,
     max_tokens: int = 4096,
     model: str = "auto",
+    priority: str = "interactive",
 ) -> AsyncIterator[str]:
     """
     Stream response from the cognitive graph.
 
-    Runs classification, memory, and knowledge, then streams inference directly.
-    Yields SSE-formatted chunks.
+    Runs classification, then memory and knowledge concurrently, then streams
+    inference directly. Yields SSE-formatted chunks.
     """
 
     initial_state: GraphState = {
@@ -284,17 +367,17 @@ async def stream_graph(
         "max_tokens": max_tokens,
         "stream": True,
         "model": model,
+        "priority": priority,
     }
 
     parsed = parse_request(initial_state)
     initial_state.update(parsed)
 
-    if should_use_memory(initial_state) == "retrieve":
-        memory_result = await retrieve_memory(initial_state)
-        initial_state.update(memory_result)
+    compact_result = await timed("compact", compact_history)(initial_state)
+    _apply_update(initial_state, compact_result)
 
-    classify_result = classify_complexity(initial_state)
-    initial_state.update(classify_result)
+    classify_result = timed("classify", classify_complexity)(initial_state)
+    _apply_update(initial_state, classify_result)
 
     # v16.3.3: Handle status queries without streaming (instant response)
     if initial_state.get("is_status_query", False):
@@ -305,15 +388,55 @@ async def stream_graph(
         await store_memory(initial_state)
         return
 
-    knowledge_result = await retrieve_knowledge(initial_state)
-    initial_state.update(knowledge_result)
+    context_result = await timed("context", retrieve_context)(initial_state)
+    _apply_update(initial_state, context_result)
+
+    # v16.4: Serve cache hits as a single chunk. Streamed answers are not
+    # stored since they never pass through metacognition.
+    cache_result = await check_response_cache(initial_state)
+    if cache_result.get("cache_hit"):
+        yield _single_chunk(chat_id, cache_result.get("model_name", ""), cache_result["response"])
+        yield "data: [DONE]\n\n"
+        return
+
+    # v16.4: Hedged routing. An executor answer that passed the gates is sent
+    # whole; on escalation the oracle streams as usual.
+    hedge_start = None
+    if should_hedge(initial_state):
+        hedge_start = time.perf_counter()
+        hedged = await executor_first(initial_state)
+        _apply_update(initial_state, hedged)
+        if hedged.get("hedge_winner"):
+            yield _single_chunk(chat_id, hedged.get("model_name", ""), hedged["response"])
+            yield "data: [DONE]\n\n"
+            record_outcome(initial_state)
+            await store_memory(initial_state)
+            return
+        record_oracle_dispatch()
 
     async for line in stream_model_response(initial_state):
         yield line
 
+    # Only a completed oracle stream counts as an escalation win
+    if hedge_start is not None and not initial_state.get("overflowed"):
+        initial_state["hedge_winner"] = "deepseek"
+        record_oracle_win(hedge_start)
+
+    record_outcome(initial_state)
     await store_memory(initial_state)
 
 
+def _single_chunk(chat_id: str, model_name: str, content: str) -> str:
+    """A whole answer as one SSE chat.completion.chunk."""
+    chunk = {
+        "id": chat_id,
+        "object": "chat.completion.chunk",
+        "model": model_name,
+        "choices": [{"index": 0, "delta": {"content": content}}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
 def get_graph_health() -> Dict[str, Any]:
     """
     Get health status of the cognitive graph.
@@ -322,6 +445,7 @@ def get_graph_health() -> Dict[str, Any]:
         "status": "ok",
         "graph_compiled": cognitive_graph is not None,
         "tracing_enabled": TRACING_ENABLED,
-        "nodes": ["parse", "retrieve_memory", "classify", "handle_status",
-                  "retrieve_knowledge", "call_model", "store_memory", "metacog", "finalize"],
+        "nodes": ["parse", "compact", "classify", "handle_status", "retrieve_context", "check_cache",
+                  "call_model", "hedged_call", "store_memory", "metacog", "cache_response",
+                  "finalize"],
     }
@@ -0,0 +1,348 @@
+"""
+Health Registry (v16.4)
+
+Shared, background-refreshed health state for the agent's dependencies
+(Oracle, Executor, Mem0, Memgraph).
+
+Request-path nodes used to run a health check before every Mem0 search and
+Memgraph query, one of them a blocking Bolt round trip. They now ask the
+registry instead, an O(1) read of a circuit breaker:
+
+    CLOSED     -> requests allowed
+    OPEN       -> requests short-circuited until reset_timeout elapses
+    HALF_OPEN  -> one trial request allowed; success closes, failure re-opens
+
+Breakers are fed by the background refresher (every HEALTH_REFRESH_INTERVAL
+seconds) and by request-path failures reported through record_failure().
+
+Lifecycle: main.py's lifespan calls start_health_monitor() / stop_health_monitor().
+"""
+
+import asyncio
+import enum
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from prometheus_client import Gauge
+
+logger = logging.getLogger("omni.agent.health")
+
+HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# Consecutive failures that open a breaker
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+# Seconds an open breaker waits before allowing a trial request
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+component_up = Gauge(
+    "agent_component_up",
+    "Last background health check result (1 = healthy)",
+    ["component"]
+)
+
+circuit_state_gauge = Gauge(
+    "agent_circuit_state",
+    "Circuit breaker state (0 = closed, 1 = half-open, 2 = open)",
+    ["component"]
+)
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUE = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    allow() is O(1) and safe to call from the event loop and worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        circuit_state_gauge.labels(component=name).set(0)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def ready(self) -> bool:
+        """Like allow(), but without claiming the half-open trial."""
+        if self._state is CircuitState.CLOSED:
+            return True
+        return self._clock() - self._opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent to the component."""
+        if self._state is CircuitState.CLOSED:
+            return True
+        with self._lock:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            # Let one trial through; re-arm the timer so a lost trial
+            # does not block the component forever
+            self._set_state(CircuitState.HALF_OPEN)
+            self._opened_at = self._clock()
+            return True
+
+    def record_success(self) -> None:
+        if self._state is CircuitState.CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            self._failures = 0
+            if self._state is not CircuitState.CLOSED:
+                logger.info(f"Circuit closed for {self.name}")
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state is CircuitState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state is not CircuitState.OPEN:
+                    logger.warning(
+                        f"Circuit opened for {self.name} after {self._failures} failures"
+                    )
+                self._set_state(CircuitState.OPEN)
+                self._opened_at = self._clock()
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        circuit_state_gauge.labels(component=self.name).set(_STATE_VALUE[state])
+
+
+HealthCheck = Callable[[], Awaitable[bool]]
+
+
+@dataclass
+class ComponentHealth:
+    """Last known health of one dependency."""
+    name: str
+    check: HealthCheck
+    breaker: CircuitBreaker
+    endpoint: str = ""
+    critical: bool = True
+    status: str = "unknown"
+    latency_ms: float = 0.0
+    checked_at: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "status": self.status,
+            "latency_ms": round(self.latency_ms, 1),
+            "circuit": self.breaker.state.value,
+            "checked_at": int(self.checked_at) if self.checked_at else None,
+        }
+        if self.endpoint:
+            result["endpoint"] = self.endpoint
+        if self.error:
+            result["error"] = self.error
+        if not self.critical:
+            result["critical"] = False
+        return result
+
+
+@dataclass
+class HealthRegistry:
+    """
+    Registry of component health, refreshed by a background task.
+
+    Usage:
+        registry = get_health_registry()
+        if not registry.allow("memory"):
+            return empty_result
+    """
+    interval: float = HEALTH_REFRESH_INTERVAL
+    timeout: float = HEALTH_CHECK_TIMEOUT
+    components: Dict[str, ComponentHealth] = field(default_factory=dict)
+    last_refresh: float = 0.0
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def register(
+        self,
+        name: str,
+        check: HealthCheck,
+        endpoint: str = "",
+        critical: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.components[name] = ComponentHealth(
+            name=name,
+            check=check,
+            breaker=breaker or CircuitBreaker(name),
+            endpoint=endpoint,
+            critical=critical,
+        )
+
+    def allow(self, name: str) -> bool:
+        """O(1) request-path gate. Unknown components are always allowed."""
+        component = self.components.get(name)
+        return component is None or component.breaker.allow()
+
+    def record_failure(self, name: str) -> None:
+        """Report a request-path failure (timeout, connection error)."""
+        component = self.components.get(name)
+        if component is not None:
+            component.breaker.record_failure()
+
+    def record_success(self, name: str) -> None:
+        component = self.components.get(name)
+        if component is not None:
+            component.breaker.record_success()
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.last_refresh > 2 * self.interval
+
+    async def refresh(self) -> None:
+        """Run every registered check concurrently and update breakers."""
+        await asyncio.gather(*(self._refresh_one(c) for c in self.components.values()))
+        self.last_refresh = time.time()
+
+    async def _refresh_one(self, component: ComponentHealth) -> None:
+        start = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(component.check(), timeout=self.timeout)
+            error = None if healthy else "health check returned unhealthy"
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timed out after {self.timeout:.1f}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+
+        component.latency_ms = (time.perf_counter() - start) * 1000
+        component.checked_at = time.time()
+        component.status = "healthy" if healthy else "unhealthy"
+        component.error = error
+        component_up.labels(component=component.name).set(1 if healthy else 0)
+
+        if healthy:
+            component.breaker.record_success()
+        else:
+            component.breaker.record_failure()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Health refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background refresher on the running loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: c.to_dict() for name, c in self.components.items()}
+
+
+def _base_url(url: str) -> str:
+    """Strip a trailing /v1 so /health resolves on the server root."""
+    url = url.rstrip("/")
+    return url[:-3] if url.endswith("/v1") else url
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http_check(url: str) -> HealthCheck:
+    async def check() -> bool:
+        global _http_client
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.AsyncClient(timeout=HEALTH_CHECK_TIMEOUT)
+        response = await _http_client.get(url)
+        return response.status_code == 200
+    return check
+
+
+async def _memgraph_check() -> bool:
+    from .nodes.knowledge import _get_memgraph_client
+
+    client = _get_memgraph_client()
+    if client is None:
+        raise RuntimeError("Memgraph client unavailable")
+    return await client.health_check_async()
+
+
+def build_default_registry() -> HealthRegistry:
+    """Registry with the Oracle, Executor, Mem0 and Memgraph checks."""
+    registry = HealthRegistry()
+    for name, env_var, default in (
+        ("oracle", "ORACLE_ENDPOINT", "http://deepseek-v32:8000"),
+        ("executor", "EXECUTOR_ENDPOINT", "http://qwen-executor:8002"),
+        ("memory", "MEM0_URL", "http://mem0:8000"),
+    ):
+        url = f"{_base_url(os.getenv(env_var, default))}/health"
+        registry.register(name, _http_check(url), endpoint=url)
+
+    registry.register(
+        "knowledge",
+        _memgraph_check,
+        endpoint=os.getenv("MEMGRAPH_URI", "bolt://localhost:7687"),
+        critical=False,
+    )
+    return registry
+
+
+_registry: Optional[HealthRegistry] = None
+
+
+def get_health_registry() -> HealthRegistry:
+    """Get or create the process-wide registry."""
+    global _registry
+    if _registry is None:
+        _registry = build_default_registry()
+    return _registry
+
+
+async def start_health_monitor() -> None:
+    """Run one refresh, then keep refreshing in the background (lifespan startup)."""
+    registry = get_health_registry()
+    await registry.refresh()
+    registry.start()
+
+
+async def stop_health_monitor() -> None:
+    """Stop the refresher and close the shared HTTP client (lifespan shutdown)."""
+    global _http_client
+    if _registry is not None:
+        await _registry.stop()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -14,11 +14,22 @@ from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
 
+from .admission import AdmissionRejected, admission_snapshot
+from .context_budget import count_tokens
+from .endpoint_pool import close_pools, open_pools, pools_snapshot
 from .graph import get_graph_health, invoke_graph, stream_graph
+from .health import get_health_registry, start_health_monitor, stop_health_monitor
+from .nodes.history import stop_history_compaction
+from .nodes.knowledge import close_memgraph_client
+from .nodes.memory import drain_memory_writes
+from .nodes.state import ENDPOINTS
+from .response_cache import close_response_cache
+from .routing_log import close_routing_log
 
 logging.basicConfig(
     level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
@@ -97,6 +108,8 @@ class HealthResponse(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     _init_tracing()
+    open_pools()
+    await start_health_monitor()
 
     logger.info("Protocol OMNI v16.3.3 - LangGraph Cognitive Workflow initialized")
     logger.info(f"Tracing enabled: {os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT') is not None}")
@@ -104,6 +117,13 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Shutting down Agent Orchestrator")
+    await stop_health_monitor()
+    await close_memgraph_client()
+    await drain_memory_writes(timeout=float(os.getenv("MEMORY_WRITE_DRAIN_TIMEOUT", "10")))
+    await stop_history_compaction()
+    close_pools()
+    close_response_cache()
+    close_routing_log()
 
 
 app = FastAPI(
@@ -124,18 +144,27 @@ async def health():
     )
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (inference pool utilisation, connection reuse)."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health/full")
 async def health_full():
     """
     Comprehensive health check with OTEL tracing.
     
     Operation Internalize (v16.3.1): Replaces scripts/test_agent_connection.py
+    v16.4: Component status is read from the background health registry
+    (see health.py) instead of probing every service per call.
     
     Checks:
     - Graph: LangGraph compilation status
     - Oracle: DeepSeek-V3.2 at :8000
     - Executor: Qwen at :8002
     - Memory: Mem0 at :8000
+    - Knowledge: Memgraph (non-critical)
     - Routing: Mini test to verify TRIVIAL → Qwen routing
     """
     start_time = time.perf_counter()
@@ -145,53 +174,14 @@ async def health_full():
         "components": {},
         "routing_test": None,
     }
+    registry = get_health_registry()
     
-    def _get_base_url(env_var: str, default: str) -> str:
-        """Get base URL stripping /v1 or /v1/ suffix for health checks."""
-        url = os.getenv(env_var, default).rstrip("/")
-        if url.endswith("/v1"):
-            url = url[:-3]
-        return url
-    
-    oracle_url = _get_base_url("ORACLE_ENDPOINT", "http://deepseek-v32:8000")
-    executor_url = _get_base_url("EXECUTOR_ENDPOINT", "http://qwen-executor:8002")
-    mem0_url = _get_base_url("MEM0_URL", "http://mem0:8000")
-    
-    def _check_component(name: str, url: str) -> Dict[str, Any]:
-        """Check a component's health endpoint."""
-        health_endpoint = f"{url}/health"
-        component_start = time.perf_counter()
-        try:
-            with httpx.Client(timeout=10) as client:
-                resp = client.get(health_endpoint)
-                latency_ms = (time.perf_counter() - component_start) * 1000
-                if resp.status_code == 200:
-                    return {
-                        "status": "healthy",
-                        "latency_ms": round(latency_ms, 1),
-                        "endpoint": health_endpoint,
-                    }
-                return {
-                    "status": "degraded",
-                    "latency_ms": round(latency_ms, 1),
-                    "endpoint": health_endpoint,
-                    "error": f"HTTP {resp.status_code}",
-                }
-        except Exception as e:
-            latency_ms = (time.perf_counter() - component_start) * 1000
-            return {
-                "status": "unhealthy",
-                "latency_ms": round(latency_ms, 1),
-                "endpoint": health_endpoint,
-                "error": str(e),
-            }
-    
-    def _run_routing_test() -> Dict[str, Any]:
+    async def _run_routing_test() -> Dict[str, Any]:
         """Send trivial prompt to self, verify Qwen handles it."""
         test_start = time.perf_counter()
         try:
-            with httpx.Client(timeout=30) as client:
-                resp = client.post(
+            async with httpx.AsyncClient(timeout=30) as client:
+                resp = await client.post(
                     "http://localhost:8080/v1/chat/completions",
                     json={
                         "model": "auto",
@@ -228,9 +218,7 @@ async def health_full():
             }
     
     async def _run_all_checks():
-        """Run all health checks concurrently."""
-        loop = asyncio.get_event_loop()
-        
+        """Read component health from the registry and run the routing test."""
         graph_check = get_graph_health()
         results["components"]["graph"] = {
             "status": "healthy" if graph_check["graph_compiled"] else "unhealthy",
@@ -238,24 +226,22 @@ async def health_full():
             "nodes": len(graph_check.get("nodes", [])),
         }
         
-        oracle_result, executor_result, memory_result, routing_result = await asyncio.gather(
-            loop.run_in_executor(None, _check_component, "oracle", oracle_url),
-            loop.run_in_executor(None, _check_component, "executor", executor_url),
-            loop.run_in_executor(None, _check_component, "memory", mem0_url),
-            loop.run_in_executor(None, _run_routing_test),
-        )
+        # Registry not running (e.g. lifespan skipped): refresh inline once
+        if registry.stale:
+            await registry.refresh()
         
-        results["components"]["oracle"] = oracle_result
-        results["components"]["executor"] = executor_result
-        results["components"]["memory"] = memory_result
+        results["components"].update(registry.snapshot())
+        results["endpoint_pools"] = pools_snapshot()
+        results["admission"] = admission_snapshot()
+        routing_result = await _run_routing_test()
         results["routing_test"] = routing_result
         
         unhealthy = any(
-            c.get("status") == "unhealthy" 
+            c.get("status") == "unhealthy" and c.get("critical", True)
             for c in results["components"].values()
         )
         degraded = any(
-            c.get("status") == "degraded" 
+            c.get("status") in ("degraded", "unhealthy")
             for c in results["components"].values()
         )
         routing_failed = routing_result.get("status") == "fail"
@@ -267,9 +253,9 @@ async def health_full():
     
     if TRACING_ENABLED and tracer:
         with tracer.start_as_current_span("health_full") as span:
-            span.set_attribute("check.oracle_url", oracle_url)
-            span.set_attribute("check.executor_url", executor_url)
-            span.set_attribute("check.mem0_url", mem0_url)
+            for name, component in registry.components.items():
+                if component.endpoint:
+                    span.set_attribute(f"check.{name}_endpoint", component.endpoint)
             
             await _run_all_checks()
             
@@ -312,8 +298,27 @@ async def sovereign_status():
         return await asyncio.to_thread(get_sovereign_status)
 
 
+def _too_busy(e: AdmissionRejected) -> HTTPException:
+    """429 for a request that could not get an inference slot."""
+    logger.warning(str(e))
+    return HTTPException(
+        status_code=429,
+        detail=f"Model busy ({e.reason}), retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @app.post("/v1/chat/completions")
-async def chat_completions(request: ChatRequest):
+async def chat_completions(
+    request: ChatRequest,
+    x_request_priority: Optional[str] = Header(None),
+):
+    """
+    OpenAI-compatible chat completions.
+
+    v16.4: Background callers (GEPA, metacognition) send
+    X-Request-Priority: background to queue behind interactive traffic.
+    """
     user_message = next(
         (m.content for m in reversed(request.messages) if m.role == "user"),
         ""
@@ -325,16 +330,31 @@ async def chat_completions(request: ChatRequest):
     chat_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
     messages = [{"role": m.role, "content": m.content} for m in request.messages]
 
+    priority = x_request_priority or "interactive"
+
     if request.stream:
+        stream = stream_graph(
+            prompt=user_message,
+            messages=messages,
+            chat_id=chat_id,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            model=request.model or "auto",
+            priority=priority,
+        )
+        # Admission happens before the first chunk; a rejection must be a
+        # 429, so wait for it before the 200 headers go out
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except AdmissionRejected as e:
+            raise _too_busy(e)
+
         async def generate():
-            async for line in stream_graph(
-                prompt=user_message,
-                messages=messages,
-                chat_id=chat_id,
-                temperature=request.temperature,
-                max_tokens=request.max_tokens,
-                model=request.model or "auto",
-            ):
+            if first is not None:
+                yield first
+            async for line in stream:
                 yield line
 
         return StreamingResponse(
@@ -347,14 +367,18 @@ async def chat_completions(request: ChatRequest):
             },
         )
 
-    result = await invoke_graph(
-        prompt=user_message,
-        messages=messages,
-        chat_id=chat_id,
-        temperature=request.temperature,
-        max_tokens=request.max_tokens,
-        model=request.model or "auto",
-    )
+    try:
+        result = await invoke_graph(
+            prompt=user_message,
+            messages=messages,
+            chat_id=chat_id,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            model=request.model or "auto",
+            priority=priority,
+        )
+    except AdmissionRejected as e:
+        raise _too_busy(e)
 
     response_text = result.get("response", "")
     usage_data = result.get("usage", {})
@@ -376,15 +400,27 @@ async def chat_completions(request: ChatRequest):
                 finish_reason="stop",
             )
         ],
-        usage=Usage(
-            prompt_tokens=usage_data.get("prompt_tokens", len(user_message) // 4),
-            completion_tokens=usage_data.get("completion_tokens", len(response_text) // 4),
-            total_tokens=usage_data.get("total_tokens", (len(user_message) + len(response_text)) // 4),
-        ),
+        usage=_usage(usage_data, model_name, user_message, response_text),
         routing_reason=routing_reason,
     )
 
 
+def _usage(usage_data: Dict[str, Any], model_name: str, prompt: str, completion: str) -> Usage:
+    """Upstream usage, falling back to local tokenizer counts when it is missing."""
+    endpoint_key = next((k for k, e in ENDPOINTS.items() if model_name in (e.name, e.model_id)), "deepseek")
+    prompt_tokens = usage_data.get("prompt_tokens")
+    if prompt_tokens is None:
+        prompt_tokens = count_tokens(prompt, endpoint_key)
+    completion_tokens = usage_data.get("completion_tokens")
+    if completion_tokens is None:
+        completion_tokens = count_tokens(completion, endpoint_key)
+    return Usage(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=usage_data.get("total_tokens", prompt_tokens + completion_tokens),
+    )
+
+
 @app.get("/v1/models")
 async def list_models():
     return {
@@ -0,0 +1,280 @@
+"""
+Keyword Matcher (v16.4)
+
+Shared multi-pattern matcher for routing and gating. Every vocabulary the
+graph checks a prompt or response against (status keywords, trivial,
+sovereign and complex indicators, code indicators, metacognition markers)
+is compiled once at import, and one scan of the text returns every hit
+with its category.
+
+Literal vocabularies are compiled as one character-trie regex, so each
+position is tried once against the trie (not once per keyword) and the
+regex engine skips positions whose character starts no keyword. The trie
+yields the longest keyword starting at a position; every shorter keyword
+starting there is one of its prefixes (precomputed), and after keywords
+that another keyword can start inside of, the scan resumes one character
+on, so overlapping hits are all found. Matching is case-insensitive
+substring matching, same as the `kw in text.lower()` scans it replaces.
+
+Regex vocabularies (the metacognition markers) are compiled once, one
+pattern each: a joined alternation would try every marker at every
+position, while a separate search per marker lets the regex engine skip
+ahead to its literal prefix. scan() reports the first occurrence of each.
+
+Vocabularies are read from ROUTING_VOCABULARY_PATH
+(config/routing-vocabulary.yaml); categories missing there keep the
+defaults below.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger("omni.agent.matcher")
+
+ROUTING_VOCABULARY_PATH = os.getenv("ROUTING_VOCABULARY_PATH", "/config/routing-vocabulary.yaml")
+_REPO_VOCABULARY_PATH = Path(__file__).resolve().parents[2] / "config" / "routing-vocabulary.yaml"
+
+DEFAULT_VOCABULARY: Dict[str, List[str]] = {
+    # Sovereign Vocabulary (v15.2.1): hardware/shell topics → COMPLEX
+    "sovereign": [
+        "ssh", "root", "kernel", "admin", "system", "deploy",
+        "trace", "audit", "calculate", "math", "physics",
+        "efficiency", "ratio", "power", "voltage", "watt",
+        "gpu", "vram", "blackwell", "5090", "nvidia",
+        "check", "monitor", "connect", "execute",
+    ],
+    "complex": [
+        "analyze", "design", "architect", "implement",
+        "debug", "refactor", "optimize", "explain why",
+        "compare", "evaluate", "plan", "strategy",
+        "step by step", "reasoning", "prove",
+    ],
+    "trivial": [
+        "hello", "hi", "thanks", "thank you", "bye",
+        "what time", "who are you", "help",
+    ],
+    # Status/introspection (v16.3.3) → status node
+    "status": [
+        "status report", "system status", "sovereign status",
+        "how is your vram", "your vram", "your gpu",
+        "how much vram", "vram usage", "gpu status",
+        "memory status", "introspect", "self-check",
+        "health report", "your health", "how are you doing",
+    ],
+    # Broader status detection used by status.is_status_query
+    "status_query": [
+        "status", "vram", "gpu status", "memory status",
+        "health report", "system status", "how is your",
+        "how much vram", "gpu memory", "your vram",
+        "introspect", "self-check", "sovereign status",
+    ],
+    # Code-navigation prompts that warrant knowledge graph retrieval
+    "code": [
+        "function", "class", "method", "import", "file",
+        "where is", "find", "reference", "caller", "called",
+        "defined", "implement", "code", "source",
+    ],
+    # Metacognition gate 1: refusal/deflection phrases (regex)
+    "hallucination": [
+        r"as an ai",
+        r"i cannot",
+        r"i don't have access",
+        r"i'm unable to",
+        r"i apologize",
+        r"i can't help",
+        r"as a language model",
+    ],
+    # Metacognition gate 2: truncation markers (regex, on the stripped response)
+    "incomplete": [
+        r"\.{3,}$",
+        r"etc\.$",
+        r"and so on\.$",
+        r"to be continued",
+        r"\[incomplete\]",
+        r"\[truncated\]",
+    ],
+}
+
+PROMPT_CATEGORIES = ("status", "trivial", "sovereign", "complex", "code", "status_query")
+RESPONSE_CATEGORIES = ("hallucination", "incomplete")
+
+
+class Hit(NamedTuple):
+    """One pattern occurrence."""
+    category: str
+    pattern: str
+    start: int
+
+
+class Matches:
+    """Hits from one scan, grouped by category in text order."""
+
+    __slots__ = ("hits", "_by_category", "_rank")
+
+    def __init__(self, hits: List[Hit], rank: Optional[Mapping[Tuple[str, str], int]] = None):
+        self.hits = hits
+        self._rank = rank or {}
+        self._by_category: Dict[str, List[str]] = {}
+        for hit in hits:
+            self._by_category.setdefault(hit.category, []).append(hit.pattern)
+
+    def __contains__(self, category: str) -> bool:
+        return category in self._by_category
+
+    def get(self, category: str) -> List[str]:
+        return self._by_category.get(category, [])
+
+    def first(self, category: str) -> Optional[str]:
+        """The matched pattern listed first in the category's vocabulary."""
+        patterns = self._by_category.get(category)
+        if not patterns:
+            return None
+        return min(patterns, key=lambda p: self._rank.get((category, p), 0))
+
+    def categories(self) -> Dict[str, List[str]]:
+        return dict(self._by_category)
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex matching the longest of words at a position, via a character trie."""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        end = node.get("", False)
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if end:
+            # Greedy optional: prefer the longer word, fall back to this one
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Single-pass matcher over several named vocabularies."""
+
+    def __init__(self, vocabularies: Mapping[str, Sequence[str]], regex: bool = False):
+        self.vocabularies = {c: list(p) for c, p in vocabularies.items()}
+        self.regex = regex
+        # Vocabulary order, so first() reports what a keyword-by-keyword loop would
+        self._rank = {
+            (c, p if regex else p.lower()): i
+            for c, patterns in self.vocabularies.items()
+            for i, p in reversed(list(enumerate(patterns)))
+        }
+        # Literal mode: one trie regex; regex mode: one search per pattern
+        self._pattern: Optional[Pattern[str]] = None
+        self._compiled: List[Tuple[str, str, Callable[[str], Optional[re.Match]]]] = []
+        if regex:
+            self._compile_patterns()
+        else:
+            self._compile_literals()
+
+    def _compile_literals(self) -> None:
+        # keyword -> categories it belongs to (a keyword may be in several)
+        owners: Dict[str, List[str]] = {}
+        for category, words in self.vocabularies.items():
+            for word in words:
+                owners.setdefault(word.lower(), []).append(category)
+
+        # For the longest keyword at a position, every keyword that also starts there
+        self._expansions: Dict[str, List[Tuple[str, str]]] = {}
+        # Keywords that another keyword can start inside of; after one of these
+        # the scan resumes one character on instead of at the match end
+        self._overlapping = set()
+        for word in owners:
+            found = [(p, c) for p in owners if word.startswith(p) for c in owners[p]]
+            found.sort(key=lambda pc: len(pc[0]))
+            self._expansions[word] = found
+            for k in range(1, len(word)):
+                tail = word[k:]
+                if any(other.startswith(tail) or tail.startswith(other) for other in owners):
+                    self._overlapping.add(word)
+                    break
+
+        trie = _trie_regex(owners)
+        self._pattern = re.compile(trie) if trie else None
+
+    def _compile_patterns(self) -> None:
+        self._compiled = [
+            (category, pattern, re.compile(pattern).search)
+            for category, patterns in self.vocabularies.items()
+            for pattern in patterns
+        ]
+
+    def scan(self, text: str) -> Matches:
+        """All hits in text (matched lowercased), in order of position."""
+        hits: List[Hit] = []
+        if not text:
+            return Matches(hits, self._rank)
+
+        lowered = text.lower()
+        if self.regex:
+            for category, pattern, search_one in self._compiled:
+                m = search_one(lowered)
+                if m is not None:
+                    hits.append(Hit(category, pattern, m.start()))
+            hits.sort(key=lambda h: h.start)
+        elif self._pattern is not None:
+            # search() skips ahead at C speed between hits
+            search = self._pattern.search
+            m = search(lowered)
+            expansions, overlapping = self._expansions, self._overlapping
+            while m is not None:
+                start, word = m.start(), m.group()
+                for pattern, category in expansions[word]:
+                    hits.append(Hit(category, pattern, start))
+                m = search(lowered, start + 1 if word in overlapping else m.end())
+        return Matches(hits, self._rank)
+
+
+def load_vocabulary(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Defaults overlaid with the categories defined in routing-vocabulary.yaml."""
+    vocabulary = {c: list(p) for c, p in DEFAULT_VOCABULARY.items()}
+
+    candidates = [Path(path)] if path else [Path(ROUTING_VOCABULARY_PATH), _REPO_VOCABULARY_PATH]
+    vocab_path = next((p for p in candidates if p.is_file()), None)
+    if yaml is None or vocab_path is None:
+        return vocabulary
+
+    try:
+        with open(vocab_path) as f:
+            configured = (yaml.safe_load(f) or {}).get("vocabularies", {})
+        for category, patterns in configured.items():
+            vocabulary[category] = [str(p) for p in patterns]
+    except Exception as e:
+        logger.warning(f"Failed to read {vocab_path}, using default vocabulary: {e}")
+    return vocabulary
+
+
+VOCABULARY = load_vocabulary()
+
+prompt_matcher = KeywordMatcher({c: VOCABULARY[c] for c in PROMPT_CATEGORIES})
+response_matcher = KeywordMatcher({c: VOCABULARY[c] for c in RESPONSE_CATEGORIES}, regex=True)
@@ -4,7 +4,10 @@ LangGraph Node Implementations (Phase 4.3 + 4.4)
 Each node is a function that takes state and returns state updates.
 """
 
+from .cache import cache_response, check_response_cache
 from .classification import classify_complexity
+from .context import retrieve_context
+from .history import compact_history
 from .inference import call_model
 from .knowledge import retrieve_knowledge
 from .memory import retrieve_memory, store_memory
@@ -20,4 +23,8 @@ __all__ = [
     "call_model",
     "metacog_verify",
     "retrieve_knowledge",
+    "retrieve_context",
+    "compact_history",
+    "check_response_cache",
+    "cache_response",
 ]
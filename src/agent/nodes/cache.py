@@ -0,0 +1,113 @@
+"""
+Response Cache Nodes (v16.4)
+
+check_response_cache runs right before call_model and short-circuits the
+graph on a hit; cache_response stores the answer once metacognition has
+accepted it.
+"""
+
+import logging
+import os
+from typing import Any, Dict
+
+from ..response_cache import cache_requests_total, get_response_cache, make_cache_key
+from .inference import build_messages, select_endpoint_key
+from .state import ENDPOINTS, GraphState
+
+logger = logging.getLogger("omni.agent.nodes.cache")
+
+TRACING_ENABLED = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") is not None
+
+try:
+    from opentelemetry import trace
+    tracer = trace.get_tracer("omni.agent.nodes.cache") if TRACING_ENABLED else None
+except ImportError:
+    tracer = None
+
+
+async def check_response_cache(state: GraphState) -> Dict[str, Any]:
+    """
+    Look up a cached response for the outgoing request.
+
+    Returns: State update with cache_hit, and on a hit the cached response,
+    usage and model_name.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return {"cache_hit": False, "cache_key": ""}
+
+    temperature = state.get("temperature", 0.7)
+    bypass = cache.bypass_reason(temperature)
+    if bypass:
+        cache_requests_total.labels(result="bypass", tier=bypass).inc()
+        return {"cache_hit": False, "cache_key": ""}
+
+    model_id = ENDPOINTS[select_endpoint_key(state)].model_id
+    max_tokens = state.get("max_tokens", 4096)
+    messages = build_messages(state)
+
+    key = make_cache_key(messages, model_id, temperature, max_tokens)
+    scope = make_cache_key(messages[:-1], model_id, temperature, max_tokens)
+
+    entry, tier = await cache.lookup(key, scope=scope, prompt=state.get("prompt", ""))
+
+    if TRACING_ENABLED and tracer:
+        with tracer.start_as_current_span("check_response_cache") as span:
+            span.set_attribute("hit", entry is not None)
+            span.set_attribute("tier", tier)
+
+    if entry is None:
+        cache_requests_total.labels(result="miss", tier="none").inc()
+        return {"cache_hit": False, "cache_key": key, "cache_scope": scope}
+
+    cache_requests_total.labels(result="hit", tier=tier).inc()
+    logger.info(f"Response cache hit ({tier}) for {entry.model_name}")
+
+    return {
+        "cache_hit": True,
+        "cache_key": key,
+        "cache_scope": scope,
+        "response": entry.response,
+        "usage": entry.usage,
+        "model_name": entry.model_name,
+    }
+
+
+async def cache_response(state: GraphState) -> Dict[str, Any]:
+    """
+    Store a verified response in the cache.
+
+    Skips cache hits, errors, empty responses, bypassed requests,
+    responses that only passed metacognition after exhausting retries, and
+    Oracle requests answered by the Executor on admission overflow (the key
+    names the Oracle's model).
+    """
+    cache = get_response_cache()
+    key = state.get("cache_key", "")
+
+    if cache is None or not key or state.get("cache_hit"):
+        return {}
+
+    if state.get("error") or not state.get("response"):
+        return {}
+    if state.get("overflowed"):
+        return {}
+
+    if not state.get("metacog_passed", True):
+        return {}
+    if state.get("metacog_verdict", "").startswith("passed_after_max_retries"):
+        return {}
+
+    try:
+        await cache.store(
+            key,
+            state["response"],
+            state.get("model_name", ""),
+            usage=state.get("usage"),
+            scope=state.get("cache_scope", ""),
+            prompt=state.get("prompt", ""),
+        )
+    except Exception as e:
+        logger.error(f"Response cache store failed: {e}")
+
+    return {}
@@ -3,11 +3,19 @@ Classification Node (Phase 4.3 + v16.3.3 Operation Internalize)
 
 Estimates task complexity using Sovereign Vocabulary and heuristics.
 Detects status/introspection queries for short-circuit routing.
+
+v16.4: The complexity decision is a pluggable backend (CLASSIFIER_BACKEND):
+    heuristic  keyword and length rules below (default)
+    linear     hashed n-gram NumPy model trained offline on routing logs
+               (agent.routing_model); falls back to heuristic if it can't load
 """
 
 import logging
-from typing import Any, Dict
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
 
+from ..matcher import VOCABULARY, Matches, prompt_matcher
 from .state import ComplexityLevel, ENDPOINTS, GraphState
 
 try:
@@ -20,37 +28,25 @@ except ImportError:
 
 logger = logging.getLogger("omni.graph.classification")
 
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "heuristic")
+CLASSIFIER_MODEL_PATH = os.getenv("CLASSIFIER_MODEL_PATH", "/models/router/complexity.npz")
+# v16.4: p(oracle) within this of the threshold counts as borderline (hedged routing)
+HEDGE_MARGIN = float(os.getenv("HEDGE_MARGIN", "0.15"))
+
+# v16.4: Vocabularies are loaded by agent.matcher (config/routing-vocabulary.yaml)
+# and matched in one pass over the prompt; the lists are kept for reference.
+
 # Sovereign Vocabulary (v15.2.1)
 # Any prompt containing these keywords → COMPLEX routing
-SOVEREIGN_VOCABULARY = [
-    "ssh", "root", "kernel", "admin", "system", "deploy",
-    "trace", "audit", "calculate", "math", "physics",
-    "efficiency", "ratio", "power", "voltage", "watt",
-    "gpu", "vram", "blackwell", "5090", "nvidia",
-    "check", "monitor", "connect", "execute",
-]
-
-COMPLEX_INDICATORS = [
-    "analyze", "design", "architect", "implement",
-    "debug", "refactor", "optimize", "explain why",
-    "compare", "evaluate", "plan", "strategy",
-    "step by step", "reasoning", "prove",
-]
-
-TRIVIAL_INDICATORS = [
-    "hello", "hi", "thanks", "thank you", "bye",
-    "what time", "who are you", "help",
-]
+SOVEREIGN_VOCABULARY = VOCABULARY["sovereign"]
+
+COMPLEX_INDICATORS = VOCABULARY["complex"]
+
+TRIVIAL_INDICATORS = VOCABULARY["trivial"]
 
 # Status/Introspection Keywords (v16.3.3 - Operation Internalize)
 # Prompts containing these + asking about self → route to status node
-STATUS_KEYWORDS = [
-    "status report", "system status", "sovereign status",
-    "how is your vram", "your vram", "your gpu",
-    "how much vram", "vram usage", "gpu status",
-    "memory status", "introspect", "self-check",
-    "health report", "your health", "how are you doing",
-]
+STATUS_KEYWORDS = VOCABULARY["status"]
 
 # Valid model override aliases (v16.2.6)
 # Maps user-facing model names to endpoint keys in ENDPOINTS
@@ -63,6 +59,112 @@ MODEL_ALIASES = {
 }
 
 
+class HeuristicClassifier:
+    """Keyword and length rules (Sovereign Vocabulary, v15.2.1)."""
+
+    name = "heuristic"
+
+    def classify(
+        self,
+        prompt: str,
+        context_count: int,
+        matches: Optional[Matches] = None,
+    ) -> Tuple[ComplexityLevel, str]:
+        if matches is None:
+            matches = prompt_matcher.scan(prompt)
+
+        # Check for trivial indicators
+        if "trivial" in matches and len(prompt) < 50:
+            return ComplexityLevel.TRIVIAL, "Trivial greeting/command"
+
+        # Sovereign Vocabulary check
+        keyword = matches.first("sovereign")
+        if keyword is not None:
+            return ComplexityLevel.COMPLEX, f"Sovereign vocabulary: '{keyword}'"
+
+        # Complex indicators check
+        indicator = matches.first("complex")
+        if indicator is not None:
+            return ComplexityLevel.COMPLEX, f"Complex indicator: '{indicator}'"
+
+        # Length-based heuristics
+        if len(prompt) > 500 or context_count > 5:
+            return ComplexityLevel.COMPLEX, f"Long prompt ({len(prompt)} chars) or deep context ({context_count} messages)"
+
+        return ComplexityLevel.ROUTINE, "Default routine classification"
+
+    def is_borderline(self, prompt: str, context_count: int, matches: Optional[Matches] = None) -> bool:
+        """COMPLEX on the strength of a single keyword in a short, shallow prompt."""
+        if matches is None:
+            matches = prompt_matcher.scan(prompt)
+        keywords = set(matches.get("sovereign")) | set(matches.get("complex"))
+        return len(keywords) == 1 and len(prompt) <= 500 and context_count <= 5
+
+
+class LinearClassifier:
+    """Learned hashed n-gram model (see agent.routing_model)."""
+
+    name = "linear"
+
+    def __init__(self, model: Any):
+        self.model = model
+        # (prompt, context_count, p_oracle) of the last classify, for is_borderline
+        self._last: Optional[Tuple[str, int, float]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "LinearClassifier":
+        from ..routing_model import RoutingModel
+        return cls(RoutingModel.load(path))
+
+    def classify(
+        self,
+        prompt: str,
+        context_count: int,
+        matches: Optional[Matches] = None,
+    ) -> Tuple[ComplexityLevel, str]:
+        label, p_oracle = self.model.classify(prompt, context_count)
+        self._last = (prompt, context_count, p_oracle)
+        return ComplexityLevel(label), f"Routing model: p(oracle)={p_oracle:.2f}"
+
+    def is_borderline(
+        self, prompt: str, context_count: int, matches: Optional[Matches] = None
+    ) -> bool:
+        """p(oracle) only just above the threshold (reused from classify when it matches)."""
+        last = self._last
+        if last is not None and last[0] == prompt and last[1] == context_count:
+            p_oracle = last[2]
+        else:
+            _, p_oracle = self.model.classify(prompt, context_count)
+        return p_oracle < self.model.threshold + HEDGE_MARGIN
+
+
+_classifier: Optional[Any] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> Any:
+    """Get or create the configured classifier backend."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = _load_classifier(CLASSIFIER_BACKEND, CLASSIFIER_MODEL_PATH)
+    return _classifier
+
+
+def _load_classifier(backend: str, model_path: str) -> Any:
+    if backend == "linear":
+        try:
+            classifier = LinearClassifier.load(model_path)
+            logger.info(f"Loaded routing model from {model_path}")
+            return classifier
+        except Exception as e:
+            logger.warning(f"Routing model unavailable ({e}), using heuristic classifier")
+    elif backend != "heuristic":
+        logger.warning(f"Unknown CLASSIFIER_BACKEND '{backend}', using heuristic classifier")
+    return HeuristicClassifier()
+
+
 def classify_complexity(state: GraphState) -> Dict[str, Any]:
     """
     Classify task complexity based on prompt analysis.
@@ -105,50 +207,36 @@ def classify_complexity(state: GraphState) -> Dict[str, Any]:
                 "prompt": prompt,
             }
 
-    prompt_lower = prompt.lower()
+    # v16.4: One pass over the prompt for every vocabulary; later nodes reuse it
+    matches = prompt_matcher.scan(prompt)
+    keyword_hits = matches.categories()
 
     # v16.3.3: Check for status/introspection queries FIRST
     # These short-circuit to the status node instead of LLM
-    for keyword in STATUS_KEYWORDS:
-        if keyword in prompt_lower:
-            logger.info(f"Status query detected: '{keyword}'")
-            if TRACING_ENABLED and tracer:
-                with tracer.start_as_current_span("classify_complexity") as span:
-                    span.set_attribute("is_status_query", True)
-                    span.set_attribute("status_keyword", keyword)
-            return {
-                "complexity": ComplexityLevel.TRIVIAL,
-                "routing_reason": f"Status query: '{keyword}'",
-                "is_status_query": True,
-                "prompt": prompt,
-            }
+    keyword = matches.first("status")
+    if keyword is not None:
+        logger.info(f"Status query detected: '{keyword}'")
+        if TRACING_ENABLED and tracer:
+            with tracer.start_as_current_span("classify_complexity") as span:
+                span.set_attribute("is_status_query", True)
+                span.set_attribute("status_keyword", keyword)
+        return {
+            "complexity": ComplexityLevel.TRIVIAL,
+            "routing_reason": f"Status query: '{keyword}'",
+            "is_status_query": True,
+            "prompt": prompt,
+            "keyword_hits": keyword_hits,
+        }
 
-    def _classify() -> tuple[ComplexityLevel, str]:
-        # Check for trivial indicators
-        if any(ind in prompt_lower for ind in TRIVIAL_INDICATORS):
-            if len(prompt) < 50:
-                return ComplexityLevel.TRIVIAL, "Trivial greeting/command"
+    # v16.4: Only verbatim turns count; compacted history lives in the system message
+    context_count = sum(1 for m in state.get("messages", []) if m.get("role") != "system") - 1
 
+    def _classify() -> tuple[ComplexityLevel, str]:
         # Check for tool orchestration requirement (from state)
         if state.get("requires_tool_orchestration"):
             return ComplexityLevel.TOOL_HEAVY, "Requires tool orchestration"
 
-        # Sovereign Vocabulary check
-        for keyword in SOVEREIGN_VOCABULARY:
-            if keyword in prompt_lower:
-                return ComplexityLevel.COMPLEX, f"Sovereign vocabulary: '{keyword}'"
-
-        # Complex indicators check
-        for indicator in COMPLEX_INDICATORS:
-            if indicator in prompt_lower:
-                return ComplexityLevel.COMPLEX, f"Complex indicator: '{indicator}'"
-
-        # Length-based heuristics
-        context_count = len(state.get("messages", [])) - 1  # Exclude current message
-        if len(prompt) > 500 or context_count > 5:
-            return ComplexityLevel.COMPLEX, f"Long prompt ({len(prompt)} chars) or deep context ({context_count} messages)"
-
-        return ComplexityLevel.ROUTINE, "Default routine classification"
+        return get_classifier().classify(prompt, context_count, matches)
 
     if TRACING_ENABLED and tracer:
         with tracer.start_as_current_span("classify_complexity") as span:
@@ -156,10 +244,17 @@ def classify_complexity(state: GraphState) -> Dict[str, Any]:
             span.set_attribute("complexity", complexity.value)
             span.set_attribute("reason", reason)
             span.set_attribute("prompt_length", len(prompt))
+            span.set_attribute("classifier", get_classifier().name)
     else:
         complexity, reason = _classify()
 
-    logger.info(f"Classified as {complexity.value}: {reason}")
+    # v16.4: Borderline COMPLEX prompts may be hedged on the executor first
+    borderline = (
+        complexity == ComplexityLevel.COMPLEX
+        and get_classifier().is_borderline(prompt, context_count, matches)
+    )
+
+    logger.info(f"Classified as {complexity.value}{' (borderline)' if borderline else ''}: {reason}")
 
     # Determine model and endpoint based on complexity
     if complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY):
@@ -175,4 +270,6 @@ def classify_complexity(state: GraphState) -> Dict[str, Any]:
         "model_name": model_name,
         "endpoint": endpoint,
         "prompt": prompt,  # Ensure prompt is set
+        "keyword_hits": keyword_hits,
+        "borderline": borderline,
     }
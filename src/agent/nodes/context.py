@@ -0,0 +1,99 @@
+"""
+Context Node (v16.4)
+
+Fan-out retrieval stage: Mem0 memories and Memgraph code context are fetched
+concurrently after classification, each under its own deadline, so context
+assembly costs max(mem0, memgraph) instead of their sum.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Dict, Tuple
+
+from ..health import get_health_registry
+from .knowledge import retrieve_knowledge
+from .memory import retrieve_memory, should_retrieve_memory
+from .state import GraphState
+
+logger = logging.getLogger("omni.agent.nodes.context")
+
+TRACING_ENABLED = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") is not None
+
+try:
+    from opentelemetry import trace
+    tracer = trace.get_tracer("omni.agent.nodes.context") if TRACING_ENABLED else None
+except ImportError:
+    tracer = None
+
+# Per-source deadlines (seconds); a late source contributes empty context
+MEMORY_DEADLINE = float(os.getenv("MEMORY_RETRIEVAL_DEADLINE", "2.0"))
+KNOWLEDGE_DEADLINE = float(os.getenv("KNOWLEDGE_RETRIEVAL_DEADLINE", "2.0"))
+
+_EMPTY_MEMORY = {"memories": [], "memory_context": ""}
+_EMPTY_KNOWLEDGE = {"code_context": ""}
+
+
+async def retrieve_context(state: GraphState) -> Dict[str, Any]:
+    """
+    Retrieve memory and knowledge context concurrently.
+
+    Returns: State update with memories, memory_context, code_context and
+    per-source stage_timings (memory_ms, knowledge_ms).
+    """
+    if TRACING_ENABLED and tracer:
+        with tracer.start_as_current_span("retrieve_context") as span:
+            result = await _retrieve_context_impl(state)
+            timings = result["stage_timings"]
+            span.set_attribute("memory_ms", timings["memory_ms"])
+            span.set_attribute("knowledge_ms", timings["knowledge_ms"])
+            return result
+    return await _retrieve_context_impl(state)
+
+
+async def _retrieve_context_impl(state: GraphState) -> Dict[str, Any]:
+    """Internal implementation of the fan-out stage."""
+    if should_retrieve_memory(state):
+        memory_source = retrieve_memory(state)
+    else:
+        memory_source = _skip(_EMPTY_MEMORY)
+
+    (memory_result, memory_ms), (knowledge_result, knowledge_ms) = await asyncio.gather(
+        _with_deadline("memory", memory_source, MEMORY_DEADLINE, _EMPTY_MEMORY),
+        _with_deadline("knowledge", retrieve_knowledge(state), KNOWLEDGE_DEADLINE, _EMPTY_KNOWLEDGE),
+    )
+
+    return {
+        **memory_result,
+        **knowledge_result,
+        "stage_timings": {
+            "memory_ms": memory_ms,
+            "knowledge_ms": knowledge_ms,
+        },
+    }
+
+
+async def _skip(result: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(result)
+
+
+async def _with_deadline(
+    source: str,
+    coro: Awaitable[Dict[str, Any]],
+    deadline: float,
+    fallback: Dict[str, Any],
+) -> Tuple[Dict[str, Any], float]:
+    """Await a retrieval source, returning the fallback if it misses its deadline."""
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(coro, timeout=deadline)
+    except asyncio.TimeoutError:
+        logger.warning(f"{source} retrieval exceeded {deadline:.1f}s deadline, skipping")
+        # A missed deadline counts against the source's circuit breaker
+        get_health_registry().record_failure(source)
+        result = dict(fallback)
+    except Exception as e:
+        logger.error(f"{source} retrieval failed: {e}")
+        result = dict(fallback)
+    return result, (time.perf_counter() - start) * 1000
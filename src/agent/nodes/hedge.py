@@ -0,0 +1,236 @@
+"""
+Hedged Routing Node (v16.4)
+
+Speculative dispatch for borderline-complexity prompts.
+
+A prompt that only just classifies as COMPLEX (one keyword in a short
+prompt, or p(oracle) within HEDGE_MARGIN of the routing model's threshold)
+often gets a good answer from Qwen in ~2s, while DeepSeek takes ~60s.
+With HEDGED_ROUTING_ENABLED, such prompts start on the Executor at once;
+its answer goes through the metacognition gates as soon as it arrives,
+and the request escalates to the Oracle only if a gate fails (or the
+Executor errors or exceeds HEDGE_EXECUTOR_TIMEOUT).
+
+With HEDGE_ORACLE_DELAY >= 0 the Oracle is also dispatched that many
+seconds after the Executor, if Qwen has not answered yet, so an escalation
+does not start from zero. Whichever request loses is cancelled, which
+closes its upstream stream and frees its admission slot.
+
+Per-route win rates: agent_hedge_wins_total{route} / agent_hedge_dispatch_total{route}.
+Routing log records carry qwen_passed, the training label for the learned
+classifier (routing_model.label_from_outcome). It is only set from a gate
+verdict; an Executor timeout or error (including admission rejection) is
+a capacity problem, not evidence that the prompt needs the Oracle, and
+leaves it None.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Histogram
+
+from ..admission import AdmissionRejected
+from .inference import generate
+from .metacognition import GATE_NAMES, check_gates
+from .state import ENDPOINTS, ComplexityLevel, GraphState
+
+logger = logging.getLogger("omni.agent.nodes.hedge")
+
+HEDGED_ROUTING_ENABLED = os.getenv("HEDGED_ROUTING_ENABLED", "false").lower() == "true"
+# Seconds after the Executor before the Oracle is dispatched too; negative = only on escalation
+HEDGE_ORACLE_DELAY = float(os.getenv("HEDGE_ORACLE_DELAY", "-1"))
+# Executor answers slower than this are abandoned and the request escalates
+HEDGE_EXECUTOR_TIMEOUT = float(os.getenv("HEDGE_EXECUTOR_TIMEOUT", "20"))
+
+EXECUTOR_KEY = "qwen"
+ORACLE_KEY = "deepseek"
+
+# Escalation causes that carry no verdict on the Executor's answer
+_NO_VERDICT = ("timeout", "error")
+
+hedge_dispatch_total = Counter(
+    "agent_hedge_dispatch_total",
+    "Model requests started by hedged routing",
+    ["route"]  # qwen, deepseek
+)
+
+hedge_wins_total = Counter(
+    "agent_hedge_wins_total",
+    "Hedged requests answered by each route",
+    ["route"]
+)
+
+hedge_cancelled_total = Counter(
+    "agent_hedge_cancelled_total",
+    "Losing hedged model requests cancelled in flight",
+    ["route"]
+)
+
+hedge_escalations_total = Counter(
+    "agent_hedge_escalations_total",
+    "Hedged requests escalated to the Oracle, by cause",
+    ["cause"]  # gate name, error, timeout
+)
+
+hedge_latency = Histogram(
+    "agent_hedge_latency_seconds",
+    "Time to the final answer of a hedged request",
+    ["route"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+
+
+def _escalated(cause: str) -> Optional[bool]:
+    """Count an escalation; returns qwen_passed for it (None without a gate verdict)."""
+    hedge_escalations_total.labels(cause=cause).inc()
+    logger.info(f"Hedge: escalating to {ENDPOINTS[ORACLE_KEY].name} ({cause})")
+    return None if cause in _NO_VERDICT else False
+
+
+def record_oracle_dispatch() -> None:
+    """Count an Oracle request started for an escalated hedge."""
+    hedge_dispatch_total.labels(route=ORACLE_KEY).inc()
+
+
+def record_oracle_win(start: float) -> None:
+    """Count an escalated hedge the Oracle answered; start is the hedge's perf_counter()."""
+    hedge_wins_total.labels(route=ORACLE_KEY).inc()
+    hedge_latency.labels(route=ORACLE_KEY).observe(time.perf_counter() - start)
+
+
+def should_hedge(state: GraphState) -> bool:
+    """First attempt at a borderline COMPLEX prompt, with hedging enabled."""
+    return (
+        HEDGED_ROUTING_ENABLED
+        and bool(state.get("borderline"))
+        and state.get("complexity") == ComplexityLevel.COMPLEX
+        and not state.get("retry_count")
+    )
+
+
+def _dispatch(endpoint_key: str, state: GraphState) -> asyncio.Task:
+    if endpoint_key == ORACLE_KEY:
+        record_oracle_dispatch()
+    else:
+        hedge_dispatch_total.labels(route=endpoint_key).inc()
+    return asyncio.ensure_future(generate(endpoint_key, state))
+
+
+async def _cancel(task: Optional[asyncio.Task], route: str) -> None:
+    if task is None or task.done():
+        return
+    task.cancel()
+    hedge_cancelled_total.labels(route=route).inc()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+async def _executor_verdict(
+    executor: asyncio.Task, prompt: str, timeout: float
+) -> tuple[Optional[Dict[str, Any]], str]:
+    """(executor result, escalation cause); cause is "" when the answer passed the gates."""
+    try:
+        result = await asyncio.wait_for(asyncio.shield(executor), max(timeout, 0))
+    except asyncio.TimeoutError:
+        return None, "timeout"
+    except AdmissionRejected:
+        return None, "error"
+
+    if result.get("error") or not result.get("response"):
+        return result, "error"
+    gate, _, reason = check_gates(result["response"], prompt)
+    if gate:
+        logger.info(f"Hedge: executor answer failed gate {gate} ({GATE_NAMES[gate]}): {reason}")
+        return result, GATE_NAMES[gate].lower()
+    return result, ""
+
+
+async def hedged_call(state: GraphState) -> Dict[str, Any]:
+    """
+    Answer a borderline prompt from the Executor if it passes the gates,
+    otherwise from the Oracle.
+
+    Returns: State update with response, usage, latency and hedge_winner
+    """
+    start = time.perf_counter()
+    prompt = state.get("prompt", "")
+    reason = state.get("routing_reason", "")
+    executor = _dispatch(EXECUTOR_KEY, state)
+    oracle: Optional[asyncio.Task] = None
+
+    try:
+        timeout = HEDGE_EXECUTOR_TIMEOUT
+        if 0 <= HEDGE_ORACLE_DELAY < HEDGE_EXECUTOR_TIMEOUT:
+            done, _ = await asyncio.wait({executor}, timeout=HEDGE_ORACLE_DELAY)
+            if not done:
+                oracle = _dispatch(ORACLE_KEY, state)
+            timeout -= time.perf_counter() - start
+
+        result, cause = await _executor_verdict(executor, prompt, timeout)
+        if not cause:
+            await _cancel(oracle, ORACLE_KEY)
+            hedge_wins_total.labels(route=EXECUTOR_KEY).inc()
+            hedge_latency.labels(route=EXECUTOR_KEY).observe(time.perf_counter() - start)
+            return {
+                **result,
+                "hedge_winner": EXECUTOR_KEY,
+                "qwen_passed": True,
+                "routing_reason": f"{reason} (hedged: executor passed gates)".strip(),
+            }
+
+        await _cancel(executor, EXECUTOR_KEY)
+        qwen_passed = _escalated(cause)
+        if oracle is None:
+            oracle = _dispatch(ORACLE_KEY, state)
+
+        try:
+            oracle_result = await oracle
+        except AdmissionRejected:
+            # Oracle saturated: a gated-out executor answer beats a 429
+            if result and result.get("response"):
+                logger.warning("Hedge: oracle rejected, keeping the executor answer")
+                return {**result, "hedge_winner": EXECUTOR_KEY, "qwen_passed": qwen_passed}
+            raise
+
+        record_oracle_win(start)
+        return {
+            **oracle_result,
+            "hedge_winner": ORACLE_KEY,
+            "qwen_passed": qwen_passed,
+            "routing_reason": f"{reason} (hedged: escalated, {cause})".strip(),
+        }
+    finally:
+        # Client went away or an error escaped: stop both generations
+        await _cancel(executor, EXECUTOR_KEY)
+        await _cancel(oracle, ORACLE_KEY)
+
+
+async def executor_first(state: GraphState) -> Dict[str, Any]:
+    """
+    Streaming variant: the Executor's answer if it passes the gates.
+
+    Returns: State update with the answer and hedge_winner, or on escalation
+    only qwen_passed. The caller then streams the Oracle as usual (no
+    parallel dispatch, since its tokens go straight to the client) and
+    reports it with record_oracle_dispatch() / record_oracle_win().
+    """
+    start = time.perf_counter()
+    executor = _dispatch(EXECUTOR_KEY, state)
+    try:
+        result, cause = await _executor_verdict(
+            executor, state.get("prompt", ""), HEDGE_EXECUTOR_TIMEOUT
+        )
+    finally:
+        await _cancel(executor, EXECUTOR_KEY)
+
+    if cause:
+        return {"qwen_passed": _escalated(cause)}
+
+    hedge_wins_total.labels(route=EXECUTOR_KEY).inc()
+    hedge_latency.labels(route=EXECUTOR_KEY).observe(time.perf_counter() - start)
+    return {**result, "hedge_winner": EXECUTOR_KEY, "qwen_passed": True}
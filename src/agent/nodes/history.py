@@ -0,0 +1,235 @@
+"""
+History Compaction Node (v16.4)
+
+Keeps long multi-turn chats cheap. The latest message and the
+HISTORY_KEEP_RECENT messages before it stay verbatim; everything older is
+replaced by a running summary written by the Qwen executor and carried in
+the system message.
+
+Older history is summarized in aligned blocks of HISTORY_COMPACTION_CHUNK
+messages. A summary is cached under a rolling hash of the exact messages it
+covers, so it is computed once per conversation prefix and every later turn
+of the same chat reuses it. Extending a summary only sends the previous
+summary plus the new block to Qwen, never the full history.
+
+Summarization runs in the background: a turn uses the longest summary that
+is already cached (plus the remaining messages verbatim) and schedules the
+missing one for the next turn, so no request waits on the executor here.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from ..admission import Priority, get_admission
+from ..context_budget import get_context_budget
+from ..endpoint_pool import get_pool
+from .state import GraphState
+
+logger = logging.getLogger("omni.agent.nodes.history")
+
+HISTORY_COMPACTION_ENABLED = os.getenv("HISTORY_COMPACTION_ENABLED", "true").lower() == "true"
+HISTORY_KEEP_RECENT = int(os.getenv("HISTORY_KEEP_RECENT", "2"))
+HISTORY_COMPACTION_CHUNK = int(os.getenv("HISTORY_COMPACTION_CHUNK", "4"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "384"))
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "2048"))
+HISTORY_SUMMARY_ENDPOINT = "qwen"
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Merge the previous summary with the new messages. Keep facts, decisions, names, "
+    "file paths, code identifiers, constraints and open questions. Drop pleasantries. "
+    "Reply with the updated summary only."
+)
+
+history_compactions_total = Counter(
+    "agent_history_compactions_total",
+    "History compaction outcomes per request",
+    ["result"]  # compacted, partial, verbatim
+)
+
+history_summaries_total = Counter(
+    "agent_history_summaries_total",
+    "Background history summarization calls",
+    ["status"]  # success, error
+)
+
+history_summary_duration = Histogram(
+    "agent_history_summary_duration_seconds",
+    "Executor latency for one history summarization",
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60)
+)
+
+
+class SummaryCache:
+    """LRU of conversation-prefix hash -> summary text (thread-safe)."""
+
+    def __init__(self, max_entries: int = HISTORY_SUMMARY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_summary_cache = SummaryCache()
+_pending: Dict[str, asyncio.Task] = {}
+
+
+def prefix_keys(messages: List[Dict[str, Any]], chunk: int) -> List[str]:
+    """Rolling hash after every chunk boundary: keys[i] covers messages[:(i + 1) * chunk]."""
+    keys = []
+    digest = b""
+    for i, message in enumerate(messages[:len(messages) - len(messages) % chunk]):
+        h = hashlib.sha256(digest)
+        h.update(str(message.get("role", "")).encode())
+        h.update(b"\x00")
+        h.update(str(message.get("content", "")).encode())
+        digest = h.digest()
+        if (i + 1) % chunk == 0:
+            keys.append(digest.hex())
+    return keys
+
+
+def _split(messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Leading system messages, then the conversation."""
+    n_system = 0
+    while n_system < len(messages) and messages[n_system].get("role") == "system":
+        n_system += 1
+    return list(messages[:n_system]), list(messages[n_system:])
+
+
+def _with_summary(system: List[Dict[str, Any]], summary: str) -> List[Dict[str, Any]]:
+    block = f"<conversation_summary>\n{summary}\n</conversation_summary>"
+    if system:
+        first = system[0]
+        return [{**first, "content": f"{first['content']}\n\n{block}"}] + system[1:]
+    return [{"role": "system", "content": block}]
+
+
+def _transcript(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+
+
+def _summarize_sync(previous: str, messages: List[Dict[str, Any]]) -> str:
+    """One executor call that folds messages into the previous summary."""
+    budget = get_context_budget()
+    counter = budget.counter(HISTORY_SUMMARY_ENDPOINT)
+    room = budget.prompt_budget(HISTORY_SUMMARY_ENDPOINT, HISTORY_SUMMARY_MAX_TOKENS)
+    room -= counter.count(SUMMARY_INSTRUCTIONS) + counter.count(previous) + 64
+
+    content = (
+        f"Previous summary:\n{previous or '(none)'}\n\n"
+        f"New messages:\n{counter.fit_lines(_transcript(messages), room)}"
+    )
+    pool = get_pool(HISTORY_SUMMARY_ENDPOINT)
+    response = pool.post("/chat/completions", {
+        "model": pool.endpoint.model_id,
+        "messages": [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": content},
+        ],
+        "temperature": 0.2,
+        "max_tokens": HISTORY_SUMMARY_MAX_TOKENS,
+        "stream": False,
+    })
+    response.raise_for_status()
+    data = response.json()
+    return data["choices"][0]["message"]["content"].strip()
+
+
+async def _summarize(key: str, previous: str, messages: List[Dict[str, Any]]) -> None:
+    start = time.perf_counter()
+    try:
+        # Queues behind interactive traffic for an Executor slot
+        async with get_admission(HISTORY_SUMMARY_ENDPOINT).slot(Priority.BACKGROUND):
+            summary = await asyncio.to_thread(_summarize_sync, previous, messages)
+        if not summary:
+            raise ValueError("empty summary")
+        _summary_cache.put(key, summary)
+        history_summaries_total.labels(status="success").inc()
+        logger.info(f"Summarized {len(messages)} history messages in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        history_summaries_total.labels(status="error").inc()
+        logger.warning(f"History summarization failed: {e}")
+    finally:
+        history_summary_duration.observe(time.perf_counter() - start)
+        _pending.pop(key, None)
+
+
+def _schedule(key: str, previous: str, messages: List[Dict[str, Any]]) -> None:
+    if key in _pending:
+        return
+    _pending[key] = asyncio.get_running_loop().create_task(_summarize(key, previous, messages))
+
+
+async def compact_history(state: GraphState) -> Dict[str, Any]:
+    """
+    Replace older turns with the cached running summary.
+
+    Returns: State update with compacted messages (empty when nothing changed)
+    """
+    if not HISTORY_COMPACTION_ENABLED:
+        return {}
+
+    system, conversation = _split(state.get("messages", []))
+    older = conversation[:max(len(conversation) - 1 - HISTORY_KEEP_RECENT, 0)]
+    keys = prefix_keys(older, HISTORY_COMPACTION_CHUNK)
+    if not keys:
+        return {}
+
+    # Longest summarized prefix already cached
+    covered, summary = 0, ""
+    for i in range(len(keys) - 1, -1, -1):
+        cached = _summary_cache.get(keys[i])
+        if cached is not None:
+            covered, summary = (i + 1) * HISTORY_COMPACTION_CHUNK, cached
+            break
+
+    target = len(keys) * HISTORY_COMPACTION_CHUNK
+    if covered < target:
+        _schedule(keys[-1], summary, conversation[covered:target])
+
+    if not covered:
+        history_compactions_total.labels(result="verbatim").inc()
+        return {}
+
+    history_compactions_total.labels(result="compacted" if covered == target else "partial").inc()
+    logger.debug(f"Compacted {covered} of {len(conversation)} messages into a summary")
+    return {"messages": _with_summary(system, summary) + conversation[covered:]}
+
+
+async def stop_history_compaction() -> None:
+    """Cancel in-flight summarizations (before transports close)."""
+    tasks = list(_pending.values())
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    _pending.clear()
@@ -8,14 +8,19 @@ issue with llama.cpp server returning 400 errors. Wrapped with asyncio.to_thread
 """
 
 import asyncio
+import concurrent.futures
 import json as json_mod
 import logging
 import os
+import threading
 import time
-from typing import Any, AsyncIterator, Dict
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
 import httpx
 
+from ..admission import ADMISSION_OVERFLOW_ENDPOINT, AdmissionRejected, Priority, get_admission
+from ..context_budget import get_context_budget
+from ..endpoint_pool import EndpointPool, get_pool
 from .state import ENDPOINTS, ComplexityLevel, GraphState
 
 logger = logging.getLogger("omni.agent.nodes.inference")
@@ -28,6 +33,9 @@ try:
 except ImportError:
     tracer = None
 
+# Max SSE lines buffered between the upstream reader thread and the client
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "64"))
+
 
 async def call_model(state: GraphState) -> Dict[str, Any]:
     """
@@ -36,34 +44,112 @@ async def call_model(state: GraphState) -> Dict[str, Any]:
     Uses streaming internally for COMPLEX/TOOL_HEAVY tasks to prevent
     load balancer idle timeouts (5-minute rule for 671B models).
 
+    v16.4: Waits for an admission slot first; Oracle requests that can't get
+    one overflow to the Executor, otherwise AdmissionRejected propagates
+    (HTTP 429).
+
     Returns: State update with response, usage, and latency
     """
     complexity = state.get("complexity", ComplexityLevel.ROUTINE)
-    endpoint_key = "deepseek" if complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY) else "qwen"
+    requested_key = select_endpoint_key(state)
+    endpoint_key, queued = await _admit(requested_key, state)
     endpoint = ENDPOINTS[endpoint_key]
 
+    try:
+        messages = build_messages(state, endpoint_key)
+
+        use_streaming = complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY)
+
+        if TRACING_ENABLED and tracer:
+            with tracer.start_as_current_span("call_model") as span:
+                span.set_attribute("model", endpoint.name)
+                span.set_attribute("complexity", complexity.value if complexity else "unknown")
+                span.set_attribute("streaming", use_streaming)
+                span.set_attribute("endpoint", endpoint.url)
+                span.set_attribute("queue_ms", queued * 1000)
+                result = await _call_model_impl(endpoint_key, messages, state, use_streaming, span)
+        else:
+            result = await _call_model_impl(endpoint_key, messages, state, use_streaming, None)
+    finally:
+        get_admission(endpoint_key).release()
+
+    result["stage_timings"] = {"queue_ms": queued * 1000}
+    if endpoint_key != requested_key:
+        result["overflowed"] = True
+        result["routing_reason"] = f"{state.get('routing_reason', '')} (overflow: {requested_key} busy)".strip()
+    return result
+
+
+async def _admit(endpoint_key: str, state: GraphState) -> tuple[str, float]:
+    """
+    Wait for an inference slot; returns (admitted endpoint key, seconds queued).
+
+    A rejected Oracle request retries once on ADMISSION_OVERFLOW_ENDPOINT.
+    """
+    priority = Priority.parse(state.get("priority"))
+    try:
+        return endpoint_key, await get_admission(endpoint_key).acquire(priority)
+    except AdmissionRejected as e:
+        overflow = ADMISSION_OVERFLOW_ENDPOINT
+        if not overflow or overflow == endpoint_key or overflow not in ENDPOINTS:
+            raise
+        logger.warning(f"{e}; overflowing to {overflow}")
+        return overflow, await get_admission(overflow).acquire(priority)
+
+
+async def generate(endpoint_key: str, state: GraphState) -> Dict[str, Any]:
+    """
+    One streamed completion from a specific endpoint, without overflow.
+
+    Cancelling the awaiting task gives up the admission slot (or queue
+    place) and closes the upstream stream, so the model stops generating.
+    Used by hedged routing (nodes/hedge.py).
+    """
+    async with get_admission(endpoint_key).slot(Priority.parse(state.get("priority"))):
+        messages = build_messages(state, endpoint_key)
+        return await _call_model_impl(endpoint_key, messages, state, True, None)
+
+
+def select_endpoint_key(state: GraphState) -> str:
+    """Pick the ENDPOINTS key for the state's complexity."""
+    complexity = state.get("complexity", ComplexityLevel.ROUTINE)
+    if complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY):
+        return "deepseek"
+    return "qwen"
+
+
+def build_messages(state: GraphState, endpoint_key: Optional[str] = None) -> list:
+    """
+    Build the outgoing message list, with memory/code context injected.
+
+    v16.4: History and context are packed into the target endpoint's
+    token budget (agent_stack.yaml context_size minus max_tokens); the
+    target defaults to the one selected for the state's complexity.
+    """
     messages = state.get("messages", [])
     prompt = state.get("prompt", "")
-    memory_context = state.get("memory_context", "")
-    code_context = state.get("code_context", "")
 
     if prompt and not messages:
         messages = [{"role": "user", "content": prompt}]
 
-    if memory_context or code_context:
-        messages = _inject_context(messages, memory_context, code_context)
+    packed = get_context_budget().pack(
+        endpoint_key or select_endpoint_key(state),
+        messages,
+        memory_context=state.get("memory_context", ""),
+        code_context=state.get("code_context", ""),
+        max_tokens=state.get("max_tokens", 4096),
+    )
+    if packed.trimmed:
+        logger.info(
+            f"Packed prompt to {packed.prompt_tokens}/{packed.budget} tokens "
+            f"(trimmed: {', '.join(packed.trimmed)}, dropped {packed.dropped_messages} messages)"
+        )
 
-    use_streaming = complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY)
+    messages = packed.messages
+    if packed.memory_context or packed.code_context:
+        messages = _inject_context(messages, packed.memory_context, packed.code_context)
 
-    if TRACING_ENABLED and tracer:
-        with tracer.start_as_current_span("call_model") as span:
-            span.set_attribute("model", endpoint.name)
-            span.set_attribute("complexity", complexity.value if complexity else "unknown")
-            span.set_attribute("streaming", use_streaming)
-            span.set_attribute("endpoint", endpoint.url)
-            return await _call_model_impl(endpoint, messages, state, use_streaming, span)
-    else:
-        return await _call_model_impl(endpoint, messages, state, use_streaming, None)
+    return messages
 
 
 def _inject_context(
@@ -98,7 +184,7 @@ def _inject_context(
 
 
 async def _call_model_impl(
-    endpoint,
+    endpoint_key: str,
     messages: list,
     state: GraphState,
     use_streaming: bool,
@@ -108,30 +194,38 @@ async def _call_model_impl(
     
     Uses synchronous httpx.Client wrapped in asyncio.to_thread() because
     AsyncClient has compatibility issues with llama.cpp server (returns 400).
+    v16.4: The endpoint pool picks a replica and its keep-alive client.
     """
     start_time = time.perf_counter()
+    pool = get_pool(endpoint_key)
+    endpoint = pool.endpoint
 
     request_body = {
         "model": endpoint.model_id,
         "messages": messages,
         "temperature": state.get("temperature", 0.7),
-        "max_tokens": state.get("max_tokens", 4096),
+        "max_tokens": get_context_budget().completion_tokens(
+            endpoint_key, messages, state.get("max_tokens", 4096)
+        ),
         "stream": use_streaming,
     }
 
-    logger.info(f"[PAYLOAD AUDIT] Target: {endpoint.url}/chat/completions")
+    logger.info(f"[PAYLOAD AUDIT] Target: {endpoint_key} pool ({len(pool)} replicas)/chat/completions")
     logger.debug(f"[PAYLOAD AUDIT] Body: {json_mod.dumps(request_body, default=str)[:500]}")
 
+    # Set on cancellation so the reader thread drops the upstream stream
+    stop = threading.Event()
+
     try:
         if use_streaming:
             # Streaming: use sync client in thread for compatibility
             response_text, usage = await asyncio.to_thread(
-                _handle_streaming_sync, endpoint.url, request_body, endpoint.timeout
+                _handle_streaming_sync, pool, request_body, stop
             )
         else:
             # Non-streaming: use sync client in thread
             response_text, usage = await asyncio.to_thread(
-                _handle_non_streaming_sync, endpoint.url, request_body, endpoint.timeout
+                _handle_non_streaming_sync, pool, request_body
             )
 
         latency_ms = (time.perf_counter() - start_time) * 1000
@@ -157,6 +251,12 @@ async def _call_model_impl(
             "model_name": endpoint.name,
         }
 
+    except asyncio.CancelledError:
+        # v16.4: e.g. the losing side of a hedged request
+        stop.set()
+        logger.info(f"Model call cancelled: {endpoint.name}")
+        raise
+
     except httpx.TimeoutException as e:
         latency_ms = (time.perf_counter() - start_time) * 1000
         error_msg = f"Model timeout after {latency_ms:.0f}ms: {e}"
@@ -209,75 +309,69 @@ async def _call_model_impl(
 
 
 def _handle_streaming_sync(
-    url: str,
+    pool: EndpointPool,
     request_body: dict,
-    timeout: float
+    stop: Optional[threading.Event] = None,
 ) -> tuple[str, dict]:
-    """Handle streaming response synchronously (for asyncio.to_thread compatibility)."""
+    """
+    Handle streaming response synchronously (for asyncio.to_thread compatibility).
+
+    Returns early, closing the upstream connection, once `stop` is set.
+    """
     chunks = []
     usage = {}
 
-    with httpx.Client(timeout=timeout) as client:
-        with client.stream(
-            "POST",
-            f"{url}/chat/completions",
-            json=request_body,
-            headers={"Content-Type": "application/json"},
-        ) as response:
-            if response.status_code >= 400:
-                body = response.read()
-                logger.error(f"[STREAMING ERROR] HTTP {response.status_code}: {body.decode()[:500]}")
-                response.raise_for_status()
-
-            for line in response.iter_lines():
-                if not line or not line.startswith("data: "):
-                    continue
-
-                data = line[6:]
-                if data == "[DONE]":
-                    break
-
-                try:
-                    chunk = json_mod.loads(data)
-
-                    if "choices" in chunk and chunk["choices"]:
-                        delta = chunk["choices"][0].get("delta", {})
-                        content = delta.get("content", "")
-                        if content:
-                            chunks.append(content)
-
-                    if "usage" in chunk:
-                        usage = chunk["usage"]
-
-                except json_mod.JSONDecodeError:
-                    continue
+    with pool.stream("/chat/completions", request_body) as response:
+        if response.status_code >= 400:
+            body = response.read()
+            logger.error(f"[STREAMING ERROR] HTTP {response.status_code}: {body.decode()[:500]}")
+            response.raise_for_status()
+
+        for line in response.iter_lines():
+            if stop is not None and stop.is_set():
+                break
+            if not line or not line.startswith("data: "):
+                continue
+
+            data = line[6:]
+            if data == "[DONE]":
+                break
+
+            try:
+                chunk = json_mod.loads(data)
+
+                if "choices" in chunk and chunk["choices"]:
+                    delta = chunk["choices"][0].get("delta", {})
+                    content = delta.get("content", "")
+                    if content:
+                        chunks.append(content)
+
+                if "usage" in chunk:
+                    usage = chunk["usage"]
+
+            except json_mod.JSONDecodeError:
+                continue
 
     return "".join(chunks), usage
 
 
 def _handle_non_streaming_sync(
-    url: str,
+    pool: EndpointPool,
     request_body: dict,
-    timeout: float
 ) -> tuple[str, dict]:
     """Handle non-streaming response synchronously."""
-    with httpx.Client(timeout=timeout) as client:
-        response = client.post(
-            f"{url}/chat/completions",
-            json=request_body,
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
+    response = pool.post("/chat/completions", request_body)
+    response.raise_for_status()
 
-        data = response.json()
+    data = response.json()
 
-        content = ""
-        if "choices" in data and data["choices"]:
-            content = data["choices"][0].get("message", {}).get("content", "")
+    content = ""
+    if "choices" in data and data["choices"]:
+        content = data["choices"][0].get("message", {}).get("content", "")
 
-        usage = data.get("usage", {})
+    usage = data.get("usage", {})
 
-        return content, usage
+    return content, usage
 
 
 async def stream_model_response(state: GraphState) -> AsyncIterator[str]:
@@ -286,50 +380,132 @@ async def stream_model_response(state: GraphState) -> AsyncIterator[str]:
 
     This is used when the client requests streaming (stream: true).
     Returns an async iterator of SSE-formatted chunks.
-    
-    Uses synchronous httpx.Client in a thread due to AsyncClient compatibility
-    issues with llama.cpp server.
+
+    Uses synchronous httpx.Client in a worker thread due to AsyncClient
+    compatibility issues with llama.cpp server. Each upstream line is handed
+    to the event loop through a bounded queue as soon as it arrives, so
+    time-to-first-token matches the model instead of the full generation.
+
+    v16.4: The admission slot is taken before the first chunk (so a
+    rejection can still become a 429) and held until the stream ends.
     """
-    complexity = state.get("complexity", ComplexityLevel.ROUTINE)
-    endpoint_key = "deepseek" if complexity in (ComplexityLevel.COMPLEX, ComplexityLevel.TOOL_HEAVY) else "qwen"
-    endpoint = ENDPOINTS[endpoint_key]
+    requested_key = select_endpoint_key(state)
+    endpoint_key, _ = await _admit(requested_key, state)
+    if endpoint_key != requested_key:
+        state["overflowed"] = True
+    try:
+        async for line in _stream_endpoint(endpoint_key, state):
+            yield line
+    finally:
+        get_admission(endpoint_key).release()
 
-    messages = state.get("messages", [])
-    prompt = state.get("prompt", "")
-    memory_context = state.get("memory_context", "")
-    code_context = state.get("code_context", "")
 
-    if prompt and not messages:
-        messages = [{"role": "user", "content": prompt}]
+async def _stream_endpoint(endpoint_key: str, state: GraphState) -> AsyncIterator[str]:
+    pool = get_pool(endpoint_key)
+    endpoint = pool.endpoint
 
-    if memory_context or code_context:
-        messages = _inject_context(messages, memory_context, code_context)
+    messages = build_messages(state, endpoint_key)
 
     request_body = {
         "model": endpoint.model_id,
         "messages": messages,
         "temperature": state.get("temperature", 0.7),
-        "max_tokens": state.get("max_tokens", 4096),
+        "max_tokens": get_context_budget().completion_tokens(
+            endpoint_key, messages, state.get("max_tokens", 4096)
+        ),
         "stream": True,
     }
 
-    # Use sync client in thread for SSE streaming
-    def stream_sync():
-        lines = []
-        with httpx.Client(timeout=endpoint.timeout) as client:
-            with client.stream(
-                "POST",
-                f"{endpoint.url}/chat/completions",
-                json=request_body,
-                headers={"Content-Type": "application/json"},
-            ) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        lines.append(line + "\n")
-        return lines
-
-    # Run in thread and yield results
-    lines = await asyncio.to_thread(stream_sync)
-    for line in lines:
+    def produce(emit: Callable[[str], None], stop: threading.Event) -> None:
+        _stream_lines_sync(pool, request_body, emit, stop)
+
+    async for line in _iterate_in_thread(produce):
         yield line
+
+
+def _stream_lines_sync(
+    pool: EndpointPool,
+    request_body: dict,
+    emit: Callable[[str], None],
+    stop: threading.Event,
+) -> None:
+    """
+    Forward raw SSE lines from the model server as they arrive.
+
+    Blank lines are kept so upstream event framing reaches the client intact.
+    Returns early (closing the upstream connection) once `stop` is set, which
+    lets llama.cpp abort the generation when the client disconnects.
+    """
+    with pool.stream("/chat/completions", request_body) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if stop.is_set():
+                return
+            emit(line + "\n")
+
+
+class _StreamCancelled(Exception):
+    """Raised inside the worker thread when the consumer has gone away."""
+
+
+_STREAM_END = object()
+
+
+async def _iterate_in_thread(
+    produce: Callable[[Callable[[str], None], threading.Event], None],
+    maxsize: int = STREAM_QUEUE_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Run a blocking producer in a thread and yield its items incrementally.
+
+    The producer receives `emit(item)` and a stop event. `emit` blocks while
+    the bounded queue is full, so a slow client applies backpressure to the
+    upstream read instead of buffering the whole generation in memory.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def emit(item: str) -> None:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    raise _StreamCancelled()
+
+    def worker() -> None:
+        outcome: Any = _STREAM_END
+        try:
+            produce(emit, stop)
+        except _StreamCancelled:
+            return
+        except BaseException as e:
+            outcome = e
+        if stop.is_set():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(queue.put(outcome), loop).result()
+        except Exception:
+            pass
+
+    task = asyncio.ensure_future(asyncio.to_thread(worker))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Free queue slots so a producer blocked in emit() can observe stop.
+        while not queue.empty():
+            queue.get_nowait()
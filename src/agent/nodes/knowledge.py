@@ -8,6 +8,9 @@ import logging
 import os
 from typing import Any, Dict
 
+from ..context_budget import get_context_budget
+from ..health import get_health_registry
+from ..matcher import prompt_matcher
 from .state import ComplexityLevel, GraphState
 
 logger = logging.getLogger("omni.agent.nodes.knowledge")
@@ -20,6 +23,9 @@ try:
 except ImportError:
     tracer = None
 
+# Upper bound before the prompt packer fits code context into the endpoint budget
+CODE_CONTEXT_MAX_TOKENS = int(os.getenv("CODE_CONTEXT_MAX_TOKENS", "1000"))
+
 _memgraph_client = None
 
 
@@ -36,6 +42,14 @@ def _get_memgraph_client():
     return _memgraph_client
 
 
+async def close_memgraph_client() -> None:
+    """Close the Memgraph drivers (lifespan shutdown)."""
+    global _memgraph_client
+    if _memgraph_client is not None:
+        await _memgraph_client.aclose()
+        _memgraph_client = None
+
+
 def should_retrieve_knowledge(state: GraphState) -> bool:
     """
     Determine if knowledge graph retrieval should run.
@@ -47,15 +61,12 @@ def should_retrieve_knowledge(state: GraphState) -> bool:
     if complexity != ComplexityLevel.TOOL_HEAVY:
         return False
 
-    prompt = state.get("prompt", "").lower()
-
-    code_indicators = [
-        "function", "class", "method", "import", "file",
-        "where is", "find", "reference", "caller", "called",
-        "defined", "implement", "code", "source",
-    ]
+    # v16.4: Reuse the classifier's single keyword pass when available
+    hits = state.get("keyword_hits")
+    if hits is None:
+        hits = prompt_matcher.scan(state.get("prompt", "")).categories()
 
-    return any(ind in prompt for ind in code_indicators)
+    return "code" in hits
 
 
 async def retrieve_knowledge(state: GraphState) -> Dict[str, Any]:
@@ -87,13 +98,19 @@ async def _retrieve_knowledge_impl(prompt: str, span: Any) -> Dict[str, Any]:
             logger.warning("Memgraph client unavailable")
             return {"code_context": ""}
 
-        if not client.health_check():
-            logger.warning("Memgraph unhealthy, skipping knowledge retrieval")
+        # v16.4: O(1) circuit-breaker read instead of a blocking Bolt health check
+        if not get_health_registry().allow("knowledge"):
+            logger.warning("Memgraph circuit open, skipping knowledge retrieval")
             return {"code_context": ""}
 
-        context = client.get_code_context(prompt, limit=10)
+        # v16.4: async driver, one batched query; never blocks the event loop
+        context = await client.get_code_context_async(prompt, limit=10)
 
-        code_context = context.to_prompt_context(max_chars=2000)
+        # Knowledge retrieval only runs for oracle-routed tasks
+        code_context = context.to_prompt_context(
+            count_tokens=get_context_budget().counter("deepseek").count,
+            max_tokens=CODE_CONTEXT_MAX_TOKENS,
+        )
 
         if span:
             span.set_attribute("symbols_found", len(context.symbols))
@@ -105,4 +122,5 @@ async def _retrieve_knowledge_impl(prompt: str, span: Any) -> Dict[str, Any]:
 
     except Exception as e:
         logger.error(f"Knowledge retrieval failed: {e}")
+        get_health_registry().record_failure("knowledge")
         return {"code_context": ""}
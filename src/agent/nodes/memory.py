@@ -6,8 +6,10 @@ Retrieve and store memories via Mem0.
 
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
+from ..context_budget import get_context_budget
+from ..health import get_health_registry
 from .state import ComplexityLevel, GraphState
 
 try:
@@ -20,8 +22,14 @@ except ImportError:
 
 logger = logging.getLogger("omni.graph.memory")
 
+# v16.4: Queue Mem0 writes instead of awaiting them on the request path
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"
+# Upper bound before the prompt packer fits memories into the endpoint budget
+MEMORY_CONTEXT_MAX_TOKENS = int(os.getenv("MEMORY_CONTEXT_MAX_TOKENS", "1000"))
+
 # Lazy import to avoid circular dependencies
 _mem0_client = None
+_write_queue = None
 
 
 def _get_mem0_client():
@@ -29,13 +37,49 @@ def _get_mem0_client():
     global _mem0_client
     if _mem0_client is None:
         from memory.mem0_client import Mem0Client
+        from memory.retrieval_cache import RETRIEVAL_CACHE_ENABLED, RetrievalCache
         # v16.2.4: Internal Docker port is 8000, external is 8050
+        # v16.4: Follow-ups within MEMORY_RETRIEVAL_CACHE_TTL reuse the last search
         _mem0_client = Mem0Client(
-            base_url=os.getenv("MEM0_URL", "http://mem0:8000")
+            base_url=os.getenv("MEM0_URL", "http://mem0:8000"),
+            retrieval_cache=RetrievalCache() if RETRIEVAL_CACHE_ENABLED else None,
         )
     return _mem0_client
 
 
+def _get_write_queue():
+    """Get or create the write-behind queue singleton."""
+    global _write_queue
+    if _write_queue is None:
+        from memory.write_behind import WriteBehindQueue
+        _write_queue = WriteBehindQueue(_get_mem0_client())
+    return _write_queue
+
+
+async def drain_memory_writes(timeout: float = 10.0) -> None:
+    """Flush pending memory writes (lifespan shutdown)."""
+    if _write_queue is not None:
+        await _write_queue.drain(timeout=timeout)
+
+
+# Greetings never benefit from memory lookups
+TRIVIAL_GREETINGS = ["hello", "hi", "hey", "thanks", "thank you", "bye"]
+
+
+def should_retrieve_memory(state: GraphState) -> bool:
+    """
+    Determine if memory retrieval should run.
+
+    Skips short trivial greetings to reduce latency.
+    """
+    prompt = state.get("prompt", "").lower()
+
+    if any(g in prompt for g in TRIVIAL_GREETINGS) and len(prompt) < 50:
+        return False
+
+    return True
+
+
 async def retrieve_memory(state: GraphState) -> Dict[str, Any]:
     """
     Retrieve relevant memories from Mem0.
@@ -66,15 +110,15 @@ async def retrieve_memory(state: GraphState) -> Dict[str, Any]:
 async def _retrieve_memory_impl(prompt: str, user_id: str, span: Any) -> Dict[str, Any]:
     """Internal implementation of memory retrieval."""
     try:
-        client = _get_mem0_client()
-
-        # Check health first
-        if not await client.health_check():
-            logger.warning("Mem0 unhealthy, skipping memory retrieval")
+        # v16.4: O(1) circuit-breaker read instead of a /health round trip
+        if not get_health_registry().allow("memory"):
+            logger.warning("Mem0 circuit open, skipping memory retrieval")
             if span:
                 span.set_attribute("mem0_available", False)
             return {"memories": [], "memory_context": ""}
 
+        client = _get_mem0_client()
+
         # Search for relevant memories
         result = await client.search_memory(
             query=prompt,
@@ -91,7 +135,12 @@ async def _retrieve_memory_impl(prompt: str, user_id: str, span: Any) -> Dict[st
         # Build context string
         if result.memories:
             from memory.mem0_client import format_memories_for_context
-            memory_context = format_memories_for_context(result.memories)
+            # Retrieval only runs for oracle-routed tasks; count with its tokenizer
+            memory_context = format_memories_for_context(
+                result.memories,
+                max_tokens=MEMORY_CONTEXT_MAX_TOKENS,
+                count_tokens=get_context_budget().counter("deepseek").count,
+            )
         else:
             memory_context = ""
 
@@ -119,6 +168,9 @@ async def store_memory(state: GraphState) -> Dict[str, Any]:
 
     Only runs for COMPLEX and TOOL_HEAVY tasks with successful responses.
 
+    With MEMORY_WRITE_BEHIND (default) the write is queued and delivered
+    by a background worker, so graph latency never includes the Mem0 POST.
+
     Returns:
         Empty state update (memory storage is fire-and-forget)
     """
@@ -137,30 +189,61 @@ async def store_memory(state: GraphState) -> Dict[str, Any]:
     if TRACING_ENABLED and tracer:
         with tracer.start_as_current_span("store_memory") as span:
             span.set_attribute("user_id", user_id)
-            await _store_memory_impl(prompt, response, user_id, span)
+            span.set_attribute("write_behind", MEMORY_WRITE_BEHIND)
+            if MEMORY_WRITE_BEHIND:
+                _enqueue_memory(prompt, response, user_id, span)
+            else:
+                await _store_memory_impl(prompt, response, user_id, span)
+    elif MEMORY_WRITE_BEHIND:
+        _enqueue_memory(prompt, response, user_id, None)
     else:
         await _store_memory_impl(prompt, response, user_id, None)
 
     return {}
 
 
+def _memory_payload(prompt: str, response: str) -> Tuple[str, Dict[str, Any]]:
+    """Build the memory content and metadata for an interaction."""
+    # Mem0 will extract relevant facts automatically
+    content = f"User asked: {prompt[:500]}\n\nAssistant response summary: {response[:500]}"
+    metadata = {
+        "source": "cognitive_graph",
+        "prompt_length": len(prompt),
+        "response_length": len(response),
+    }
+    return content, metadata
+
+
+def _enqueue_memory(prompt: str, response: str, user_id: str, span: Any) -> None:
+    """Hand the interaction to the write-behind queue (never blocks)."""
+    try:
+        from memory.write_behind import MemoryWrite
+
+        content, metadata = _memory_payload(prompt, response)
+        queued = _get_write_queue().enqueue(
+            MemoryWrite(content=content, user_id=user_id, metadata=metadata)
+        )
+        if span:
+            span.set_attribute("queued", queued)
+
+    except Exception as e:
+        logger.error(f"Memory enqueue failed: {e}")
+        if span:
+            span.set_attribute("error", str(e))
+
+
 async def _store_memory_impl(prompt: str, response: str, user_id: str, span: Any) -> None:
-    """Internal implementation of memory storage."""
+    """Internal implementation of inline memory storage."""
     try:
         client = _get_mem0_client()
 
         # Store the interaction as a memory
-        # Mem0 will extract relevant facts automatically
-        content = f"User asked: {prompt[:500]}\n\nAssistant response summary: {response[:500]}"
+        content, metadata = _memory_payload(prompt, response)
 
         memory_id = await client.store_memory(
             content=content,
             user_id=user_id,
-            metadata={
-                "source": "cognitive_graph",
-                "prompt_length": len(prompt),
-                "response_length": len(response),
-            },
+            metadata=metadata,
         )
 
         if span:
@@ -8,8 +8,9 @@ Implements the metacognition protocol from Protocol OMNI v15.2.
 import logging
 import os
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
+from ..matcher import VOCABULARY, Matches, response_matcher
 from .state import ComplexityLevel, GraphState
 
 logger = logging.getLogger("omni.agent.nodes.metacognition")
@@ -23,24 +24,11 @@ except ImportError:
     tracer = None
 
 
-GATE_1_HALLUCINATION_MARKERS = [
-    r"as an ai",
-    r"i cannot",
-    r"i don't have access",
-    r"i'm unable to",
-    r"i apologize",
-    r"i can't help",
-    r"as a language model",
-]
-
-GATE_2_INCOMPLETE_MARKERS = [
-    r"\.{3,}$",
-    r"etc\.$",
-    r"and so on\.$",
-    r"to be continued",
-    r"\[incomplete\]",
-    r"\[truncated\]",
-]
+# v16.4: Marker vocabularies live in agent.matcher (config/routing-vocabulary.yaml)
+# and are matched in one pass over the response
+GATE_1_HALLUCINATION_MARKERS = VOCABULARY["hallucination"]
+
+GATE_2_INCOMPLETE_MARKERS = VOCABULARY["incomplete"]
 
 GATE_3_MIN_LENGTH = 50
 
@@ -109,34 +97,12 @@ def _run_gates(
     span: Any
 ) -> Dict[str, Any]:
     """Run all verification gates."""
-
-    gate_1_passed, gate_1_reason = _gate_1_hallucination(response)
-    if not gate_1_passed:
-        logger.warning(f"Gate 1 (Hallucination) failed: {gate_1_reason}")
-        if span:
-            span.set_attribute("failed_gate", 1)
-        return _handle_failure("hallucination", gate_1_reason, retry_count)
-
-    gate_2_passed, gate_2_reason = _gate_2_completeness(response)
-    if not gate_2_passed:
-        logger.warning(f"Gate 2 (Completeness) failed: {gate_2_reason}")
-        if span:
-            span.set_attribute("failed_gate", 2)
-        return _handle_failure("incomplete", gate_2_reason, retry_count)
-
-    gate_3_passed, gate_3_reason = _gate_3_length(response)
-    if not gate_3_passed:
-        logger.warning(f"Gate 3 (Length) failed: {gate_3_reason}")
-        if span:
-            span.set_attribute("failed_gate", 3)
-        return _handle_failure("too_short", gate_3_reason, retry_count)
-
-    gate_4_passed, gate_4_reason = _gate_4_coherence(response, prompt)
-    if not gate_4_passed:
-        logger.warning(f"Gate 4 (Coherence) failed: {gate_4_reason}")
+    gate, failure_type, reason = check_gates(response, prompt)
+    if gate:
+        logger.warning(f"Gate {gate} ({GATE_NAMES[gate]}) failed: {reason}")
         if span:
-            span.set_attribute("failed_gate", 4)
-        return _handle_failure("incoherent", gate_4_reason, retry_count)
+            span.set_attribute("failed_gate", gate)
+        return _handle_failure(failure_type, reason, retry_count)
 
     logger.info("Metacognition: All 4 gates passed")
     return {
@@ -145,32 +111,58 @@ def _run_gates(
     }
 
 
-def _gate_1_hallucination(response: str) -> tuple[bool, str]:
+GATE_NAMES = {1: "Hallucination", 2: "Completeness", 3: "Length", 4: "Coherence"}
+
+
+def check_gates(response: str, prompt: str) -> Tuple[int, str, str]:
+    """
+    Run gates 1-4 in order, without retry bookkeeping.
+
+    Returns (failed gate number, failure type, reason); gate 0 means all passed.
+    """
+    markers = response_matcher.scan(response.strip())
+    gates = (
+        (1, "hallucination", lambda: _gate_1_hallucination(response, markers)),
+        (2, "incomplete", lambda: _gate_2_completeness(response, markers)),
+        (3, "too_short", lambda: _gate_3_length(response)),
+        (4, "incoherent", lambda: _gate_4_coherence(response, prompt)),
+    )
+    for gate, failure_type, run in gates:
+        passed, reason = run()
+        if not passed:
+            return gate, failure_type, reason
+    return 0, "", ""
+
+
+def _gate_1_hallucination(response: str, markers: Optional[Matches] = None) -> tuple[bool, str]:
     """
     Gate 1: Detect AI hallucination/cop-out phrases.
 
     These indicate the model is refusing or deflecting rather than answering.
     """
-    response_lower = response.lower()
+    if markers is None:
+        markers = response_matcher.scan(response.strip())
 
-    for pattern in GATE_1_HALLUCINATION_MARKERS:
-        if re.search(pattern, response_lower):
-            return False, f"Detected hallucination marker: '{pattern}'"
+    pattern = markers.first("hallucination")
+    if pattern is not None:
+        return False, f"Detected hallucination marker: '{pattern}'"
 
     return True, "No hallucination markers detected"
 
 
-def _gate_2_completeness(response: str) -> tuple[bool, str]:
+def _gate_2_completeness(response: str, markers: Optional[Matches] = None) -> tuple[bool, str]:
     """
     Gate 2: Check for incomplete/truncated responses.
 
     Looks for trailing ellipses, "etc.", or explicit truncation markers.
     """
     response_stripped = response.strip()
+    if markers is None:
+        markers = response_matcher.scan(response_stripped)
 
-    for pattern in GATE_2_INCOMPLETE_MARKERS:
-        if re.search(pattern, response_stripped, re.IGNORECASE):
-            return False, f"Detected incompleteness marker: '{pattern}'"
+    pattern = markers.first("incomplete")
+    if pattern is not None:
+        return False, f"Detected incompleteness marker: '{pattern}'"
 
     if response_stripped and not re.match(r'[.!?`"\'\]\)>]$', response_stripped[-1]):
         if len(response_stripped) > 500:
@@ -4,9 +4,10 @@ Graph State Definition (Phase 4.3)
 Defines the state schema that flows through the LangGraph workflow.
 """
 
+import os
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
 
 class ComplexityLevel(str, Enum):
@@ -17,6 +18,14 @@ class ComplexityLevel(str, Enum):
     TOOL_HEAVY = "tool_heavy"
 
 
+def merge_stage_timings(
+    left: Optional[Dict[str, float]],
+    right: Optional[Dict[str, float]],
+) -> Dict[str, float]:
+    """Reducer that accumulates per-stage timings across nodes."""
+    return {**(left or {}), **(right or {})}
+
+
 class GraphState(TypedDict, total=False):
     """
     State that flows through the cognitive graph.
@@ -32,6 +41,7 @@ class GraphState(TypedDict, total=False):
     max_tokens: int
     stream: bool
     model: str  # v16.2.6: Manual model override (default "auto")
+    priority: str  # v16.4: Admission priority ("interactive" or "background")
 
     # Routing
     complexity: ComplexityLevel
@@ -39,6 +49,11 @@ class GraphState(TypedDict, total=False):
     model_name: str
     endpoint: str
     is_status_query: bool  # v16.3.3: Flag for status/introspection queries
+    keyword_hits: Dict[str, List[str]]  # v16.4: matcher category -> keywords found in prompt
+    overflowed: bool  # v16.4: Oracle was saturated, answered by the Executor
+    borderline: bool  # v16.4: COMPLEX by a narrow margin (hedged routing candidate)
+    hedge_winner: str  # v16.4: Endpoint key that answered a hedged request
+    qwen_passed: bool  # v16.4: Executor answer passed the gates (hedged requests)
 
     # Memory
     memories: List[Dict[str, Any]]
@@ -47,6 +62,11 @@ class GraphState(TypedDict, total=False):
     # Knowledge Graph
     code_context: str
 
+    # Response Cache (v16.4)
+    cache_key: str
+    cache_scope: str
+    cache_hit: bool
+
     # Response
     response: str
     usage: Dict[str, int]
@@ -60,6 +80,7 @@ class GraphState(TypedDict, total=False):
     # Metadata
     start_time: float
     latency_ms: float
+    stage_timings: Annotated[Dict[str, float], merge_stage_timings]  # v16.4: stage -> ms
     error: Optional[str]
 
 
@@ -70,6 +91,8 @@ class ModelEndpoint:
     url: str
     model_id: str
     timeout: float = 300.0
+    max_connections: int = 32  # Pooled connections shared by all requests
+    max_keepalive: int = 16  # Idle keep-alive connections kept warm
 
 
 # Model endpoint configurations
@@ -79,11 +102,15 @@ ENDPOINTS = {
         url="http://deepseek-v32:8000/v1",
         model_id="deepseek-v3.2",
         timeout=300.0,
+        max_connections=int(os.getenv("ORACLE_POOL_MAX_CONNECTIONS", "16")),
+        max_keepalive=int(os.getenv("ORACLE_POOL_MAX_KEEPALIVE", "8")),
     ),
     "qwen": ModelEndpoint(
         name="qwen-executor",
         url="http://qwen-executor:8002/v1",
         model_id="qwen2.5-coder-7b",
         timeout=60.0,
+        max_connections=int(os.getenv("EXECUTOR_POOL_MAX_CONNECTIONS", "32")),
+        max_keepalive=int(os.getenv("EXECUTOR_POOL_MAX_KEEPALIVE", "16")),
     ),
 }
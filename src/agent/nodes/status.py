@@ -10,6 +10,7 @@ import logging
 import os
 from typing import Any, Dict
 
+from ..matcher import prompt_matcher
 from ..tools.status import get_sovereign_status, format_status_for_agent
 
 logger = logging.getLogger("omni.graph.nodes.status")
@@ -62,17 +63,4 @@ def is_status_query(prompt: str) -> bool:
     Returns True if the prompt contains status-related keywords and appears
     to be asking for introspection rather than general knowledge.
     """
-    prompt_lower = prompt.lower()
-    
-    status_keywords = [
-        "status", "vram", "gpu status", "memory status",
-        "health report", "system status", "how is your",
-        "how much vram", "gpu memory", "your vram",
-        "introspect", "self-check", "sovereign status",
-    ]
-    
-    for keyword in status_keywords:
-        if keyword in prompt_lower:
-            return True
-    
-    return False
+    return "status_query" in prompt_matcher.scan(prompt)
@@ -0,0 +1,431 @@
+"""
+Response Cache (v16.4)
+
+Caches verified model responses so repeated prompts (status-like questions,
+"explain X", health probes) skip inference entirely.
+
+Keys are a hash of the normalized outgoing messages (after context
+injection), the model and the sampling parameters. Sampled requests
+(temperature above RESPONSE_CACHE_MAX_TEMPERATURE) bypass the cache.
+
+Tiers:
+    memory    In-process LRU with TTL and entry/byte bounds (always on)
+    disk      Optional SQLite backend so warm entries survive restarts
+    semantic  Optional near-duplicate lookup on prompt embeddings from an
+              OpenAI-compatible /embeddings endpoint
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger("omni.agent.response_cache")
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "900"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Requests sampled hotter than this are never cached (0.0 = greedy only)
+RESPONSE_CACHE_MAX_TEMPERATURE = float(os.getenv("RESPONSE_CACHE_MAX_TEMPERATURE", "0.0"))
+# "memory" or "sqlite"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "/state/response_cache.db")
+# Near-duplicate mode: set an OpenAI-compatible base URL serving /embeddings
+RESPONSE_CACHE_EMBEDDINGS_URL = os.getenv("RESPONSE_CACHE_EMBEDDINGS_URL", "")
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))
+RESPONSE_CACHE_SEMANTIC_ENTRIES = int(os.getenv("RESPONSE_CACHE_SEMANTIC_ENTRIES", "512"))
+
+cache_requests_total = Counter(
+    "agent_response_cache_requests_total",
+    "Response cache lookups by result (hit/miss/bypass) and tier",
+    ["result", "tier"]
+)
+
+cache_evictions_total = Counter(
+    "agent_response_cache_evictions_total",
+    "Response cache evictions by reason",
+    ["reason"]
+)
+
+cache_entries = Gauge(
+    "agent_response_cache_entries",
+    "Entries held in the in-process response cache"
+)
+
+
+@dataclass
+class CachedResponse:
+    """A cached, verified model response."""
+    response: str
+    model_name: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    created_at: float = 0.0
+    expires_at: float = 0.0
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+    def size(self) -> int:
+        return len(self.response.encode("utf-8"))
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "CachedResponse":
+        return cls(**json.loads(data))
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivial variations share a key."""
+    return " ".join(str(text).split()).casefold()
+
+
+def make_cache_key(
+    messages: List[Dict[str, Any]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Hash normalized messages plus sampling parameters into a cache key."""
+    canonical = json.dumps(
+        {
+            "messages": [
+                [m.get("role", ""), normalize_text(m.get("content", ""))] for m in messages
+            ],
+            "model": model,
+            "temperature": round(float(temperature), 3),
+            "max_tokens": int(max_tokens),
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage backend for cached responses."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the live entry for key, or None."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """Store an entry, evicting as needed."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU bounded by entry count and total response bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.is_expired():
+                self._remove(key)
+                cache_evictions_total.labels(reason="ttl").inc()
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if entry.size() > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size()
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                cache_evictions_total.labels(reason="lru").inc()
+            cache_entries.set(len(self._entries))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size()
+        cache_entries.set(len(self._entries))
+
+
+class SQLiteBackend(CacheBackend):
+    """On-disk backend (WAL mode) so warm entries survive restarts."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache(accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                cache_evictions_total.labels(reason="ttl").inc()
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return CachedResponse.from_json(row[0])
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, entry.to_json(), entry.expires_at, now),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingClient:
+    """
+    Fetches prompt embeddings from an OpenAI-compatible /embeddings endpoint.
+
+    Uses the sync httpx.Client in a thread, like the inference node, for
+    llama.cpp compatibility.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 5.0):
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(timeout=timeout)
+
+    def _embed_sync(self, text: str) -> List[float]:
+        response = self._client.post(f"{self.base_url}/embeddings", json={"input": text})
+        response.raise_for_status()
+        return response.json()["data"][0]["embedding"]
+
+    async def embed(self, text: str) -> List[float]:
+        return await asyncio.to_thread(self._embed_sync, text)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class ResponseCache:
+    """
+    Two-tier exact cache plus an optional near-duplicate index.
+
+    The semantic index only compares prompts that share a scope (everything
+    but the final user turn: model, sampling, system/context and history),
+    so a near-duplicate can never borrow another user's memory context.
+    """
+
+    def __init__(
+        self,
+        memory: CacheBackend,
+        disk: Optional[CacheBackend] = None,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_temperature: float = RESPONSE_CACHE_MAX_TEMPERATURE,
+        embedder: Optional[EmbeddingClient] = None,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+        semantic_entries: int = RESPONSE_CACHE_SEMANTIC_ENTRIES,
+    ):
+        self.memory = memory
+        self.disk = disk
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.embedder = embedder
+        self.similarity = similarity
+        self._semantic: Deque[Tuple[str, List[float], str]] = deque(maxlen=semantic_entries)
+
+    def bypass_reason(self, temperature: float) -> Optional[str]:
+        """Return why a request must skip the cache, or None if cacheable."""
+        if temperature > self.max_temperature:
+            return "temperature"
+        return None
+
+    async def lookup(
+        self,
+        key: str,
+        scope: str = "",
+        prompt: str = "",
+    ) -> Tuple[Optional[CachedResponse], str]:
+        """Look up a response; returns (entry, tier) with tier 'none' on miss."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry, "memory"
+
+        if self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self.memory.set(key, entry)
+                return entry, "disk"
+
+        if self.embedder is not None and prompt:
+            entry = await self._lookup_semantic(scope, prompt)
+            if entry is not None:
+                return entry, "semantic"
+
+        return None, "none"
+
+    async def store(
+        self,
+        key: str,
+        response: str,
+        model_name: str,
+        usage: Optional[Dict[str, int]] = None,
+        scope: str = "",
+        prompt: str = "",
+    ) -> None:
+        """Store a verified response in every configured tier."""
+        now = time.time()
+        entry = CachedResponse(
+            response=response,
+            model_name=model_name,
+            usage=usage or {},
+            created_at=now,
+            expires_at=now + self.ttl,
+        )
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, entry)
+        if self.embedder is not None and prompt:
+            try:
+                vector = _unit(await self.embedder.embed(normalize_text(prompt)))
+                self._semantic.append((scope, vector, key))
+            except Exception as e:
+                logger.warning(f"Response cache embedding failed: {e}")
+
+    async def _lookup_semantic(self, scope: str, prompt: str) -> Optional[CachedResponse]:
+        candidates = [(v, k) for s, v, k in self._semantic if s == scope]
+        if not candidates:
+            return None
+        try:
+            query = _unit(await self.embedder.embed(normalize_text(prompt)))
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed: {e}")
+            return None
+
+        best_key, best_score = None, self.similarity
+        for vector, key in candidates:
+            score = sum(a * b for a, b in zip(query, vector))
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+
+        entry = self.memory.get(best_key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, best_key)
+        return entry
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+        if self.embedder is not None:
+            self.embedder.close()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get or create the process-wide response cache (None when disabled)."""
+    global _response_cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        disk = None
+        if RESPONSE_CACHE_BACKEND == "sqlite":
+            try:
+                disk = SQLiteBackend(RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_ENTRIES * 8)
+                logger.info(f"Response cache disk tier: {RESPONSE_CACHE_PATH}")
+            except Exception as e:
+                logger.error(f"Failed to open response cache at {RESPONSE_CACHE_PATH}: {e}")
+        embedder = None
+        if RESPONSE_CACHE_EMBEDDINGS_URL:
+            embedder = EmbeddingClient(RESPONSE_CACHE_EMBEDDINGS_URL)
+        _response_cache = ResponseCache(
+            memory=MemoryBackend(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES),
+            disk=disk,
+            embedder=embedder,
+        )
+    return _response_cache
+
+
+def close_response_cache() -> None:
+    """Close the disk tier and embedder (lifespan shutdown)."""
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
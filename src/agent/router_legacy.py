@@ -18,6 +18,8 @@ from typing import Any, Dict, Optional, Tuple
 
 import httpx
 
+from .matcher import prompt_matcher
+
 try:
     from opentelemetry import trace
     tracer = trace.get_tracer("omni.router")
@@ -53,34 +55,16 @@ class AgentRequest:
 
     def estimate_complexity(self) -> ComplexityLevel:
         """Estimate task complexity based on heuristics."""
-        prompt_lower = self.prompt.lower()
+        matches = prompt_matcher.scan(self.prompt)
 
-        trivial_indicators = [
-            "hello", "hi", "thanks", "thank you", "bye",
-            "what time", "who are you", "help",
-        ]
-        if any(ind in prompt_lower for ind in trivial_indicators):
-            if len(self.prompt) < 50:
-                return ComplexityLevel.TRIVIAL
+        if "trivial" in matches and len(self.prompt) < 50:
+            return ComplexityLevel.TRIVIAL
 
         if self.requires_tool_orchestration:
             return ComplexityLevel.TOOL_HEAVY
 
         # Sovereign Vocabulary (v15.2.1) - Any prompt touching hardware/shell → COMPLEX
-        complex_indicators = [
-            # Original indicators
-            "analyze", "design", "architect", "implement",
-            "debug", "refactor", "optimize", "explain why",
-            "compare", "evaluate", "plan", "strategy",
-            "step by step", "reasoning", "prove",
-            # v15.2.1: Sovereign Industrial Node vocabulary
-            "ssh", "root", "kernel", "admin", "system", "deploy",
-            "trace", "audit", "calculate", "math", "physics",
-            "efficiency", "ratio", "power", "voltage", "watt",
-            "gpu", "vram", "blackwell", "5090", "nvidia",
-            "check", "monitor", "connect", "execute",
-        ]
-        if any(ind in prompt_lower for ind in complex_indicators):
+        if "complex" in matches or "sovereign" in matches:
             return ComplexityLevel.COMPLEX
 
         if len(self.prompt) > 500 or len(self.context) > 5:
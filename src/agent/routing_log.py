@@ -0,0 +1,91 @@
+"""
+Routing Outcome Log (v16.4)
+
+Appends one JSON line per completed request with the prompt, how it was
+routed and how the answer fared (metacognition verdict, retries). These
+records are the training data for the learned complexity classifier
+(scripts/train_router.py). Disabled unless ROUTING_LOG_PATH is set.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("omni.agent.routing_log")
+
+ROUTING_LOG_PATH = os.getenv("ROUTING_LOG_PATH", "")
+
+
+class RoutingLog:
+    """Thread-safe JSON-lines appender."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_routing_log: Optional[RoutingLog] = None
+
+
+def _get_routing_log() -> Optional[RoutingLog]:
+    global _routing_log
+    if _routing_log is None and ROUTING_LOG_PATH:
+        try:
+            _routing_log = RoutingLog(ROUTING_LOG_PATH)
+        except OSError as e:
+            logger.warning(f"Routing log disabled, cannot open {ROUTING_LOG_PATH}: {e}")
+    return _routing_log
+
+
+def record_outcome(state: Dict[str, Any]) -> None:
+    """Log the routing outcome of a finished request (no-op when disabled)."""
+    log = _get_routing_log()
+    if log is None or state.get("is_status_query") or state.get("cache_hit"):
+        return
+
+    complexity = state.get("complexity")
+    level = str(getattr(complexity, "value", complexity))
+    endpoint = "deepseek" if level in ("complex", "tool_heavy") else "qwen"
+    if state.get("overflowed") or state.get("hedge_winner") == "qwen":
+        endpoint = "qwen"
+    messages = state.get("messages", [])
+    routing_reason = state.get("routing_reason", "")
+    try:
+        log.write({
+            "timestamp": time.time(),
+            "prompt": state.get("prompt", ""),
+            "context_messages": max(sum(1 for m in messages if m.get("role") != "system") - 1, 0),
+            "complexity": getattr(complexity, "value", complexity),
+            "routing_reason": routing_reason,
+            "endpoint": endpoint,
+            "model": state.get("model", "auto"),
+            # classify_complexity took the manual override branch
+            "override": str(routing_reason).startswith("Manual override"),
+            "metacog_passed": state.get("metacog_passed"),
+            "retry_count": state.get("retry_count", 0),
+            "error": state.get("error"),
+            "qwen_passed": state.get("qwen_passed"),
+        })
+    except Exception as e:
+        logger.warning(f"Failed to write routing log: {e}")
+
+
+def close_routing_log() -> None:
+    global _routing_log
+    if _routing_log is not None:
+        _routing_log.close()
+        _routing_log = None
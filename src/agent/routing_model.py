@@ -0,0 +1,272 @@
+"""
+Routing Model (v16.4)
+
+Learned complexity classifier: hashed word n-gram features and a NumPy
+multinomial linear model, trained offline on logged routing outcomes
+(scripts/train_router.py) and scored in memory in well under a millisecond.
+
+Features are the CRC32 hashes of lowercased word unigrams and bigrams plus
+prompt-length and context-depth buckets, folded into n_features buckets.
+Scoring gathers and sums one weight row per feature, so cost is linear in
+prompt length and independent of the vocabulary.
+
+A prompt goes to the oracle when the probability mass on the oracle classes
+(complex, tool_heavy) reaches the model's threshold; the threshold is
+calibrated at training time so routing quality matches the heuristic.
+
+Training data is routing log JSONL (agent.routing_log); label_from_outcome
+turns each record into a complexity label.
+"""
+
+import json
+import math
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+N_FEATURES = 1 << 18
+MAX_WORDS = 512
+LABELS = ("trivial", "routine", "complex", "tool_heavy")
+ORACLE_LABELS = ("complex", "tool_heavy")
+
+_WORDS = re.compile(r"[a-z0-9_]+|[^\sa-z0-9_]")
+
+
+def features(prompt: str, context_messages: int = 0, n_features: int = N_FEATURES) -> np.ndarray:
+    """Hashed feature indices for one prompt (duplicates count twice)."""
+    words = _WORDS.findall(prompt.lower())[:MAX_WORDS]
+    grams = [f"w:{w}" for w in words]
+    grams.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    grams.append(f"len:{min(int(math.log2(len(prompt) + 1)), 16)}")
+    grams.append(f"ctx:{min(context_messages, 8)}")
+    return np.fromiter(
+        (zlib.crc32(g.encode()) % n_features for g in grams),
+        dtype=np.int64,
+        count=len(grams),
+    )
+
+
+def _batch(
+    rows: Sequence[Tuple[str, int]], n_features: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(row ids, feature ids) for a batch, as flat parallel arrays."""
+    feats = [features(prompt, ctx, n_features) for prompt, ctx in rows]
+    row_ids = np.repeat(np.arange(len(feats)), [len(f) for f in feats])
+    return row_ids, np.concatenate(feats) if feats else np.zeros(0, dtype=np.int64)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+@dataclass
+class RoutingModel:
+    """Multinomial linear model over hashed n-grams."""
+    weights: np.ndarray  # (n_features, n_classes) float32
+    bias: np.ndarray  # (n_classes,) float32
+    classes: Tuple[str, ...]
+    threshold: float = 0.5
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    def _oracle_mask(self) -> np.ndarray:
+        return np.array([c in ORACLE_LABELS for c in self.classes])
+
+    def predict_proba(self, prompt: str, context_messages: int = 0) -> np.ndarray:
+        idx = features(prompt, context_messages, self.n_features)
+        return _softmax(self.weights[idx].sum(axis=0) + self.bias)
+
+    def predict_proba_batch(self, rows: Sequence[Tuple[str, int]]) -> np.ndarray:
+        row_ids, feat_ids = _batch(rows, self.n_features)
+        logits = np.tile(self.bias, (len(rows), 1))
+        np.add.at(logits, row_ids, self.weights[feat_ids])
+        return _softmax(logits)
+
+    def decide(self, proba: np.ndarray, threshold: Optional[float] = None) -> Tuple[str, float]:
+        """(label, p_oracle) for one probability row."""
+        threshold = self.threshold if threshold is None else threshold
+        mask = self._oracle_mask()
+        p_oracle = float(proba[mask].sum())
+        candidates = mask if p_oracle >= threshold else ~mask
+        best = int(np.argmax(np.where(candidates, proba, -1.0)))
+        return self.classes[best], p_oracle
+
+    def classify(self, prompt: str, context_messages: int = 0) -> Tuple[str, float]:
+        return self.decide(self.predict_proba(prompt, context_messages))
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            classes=np.array(self.classes),
+            threshold=np.array(self.threshold),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoutingModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                weights=data["weights"].astype(np.float32),
+                bias=data["bias"].astype(np.float32),
+                classes=tuple(str(c) for c in data["classes"]),
+                threshold=float(data["threshold"]),
+            )
+
+
+def train(
+    rows: Sequence[Tuple[str, int]],
+    labels: Sequence[str],
+    n_features: int = N_FEATURES,
+    epochs: int = 8,
+    batch_size: int = 256,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6,
+    seed: int = 0,
+) -> RoutingModel:
+    """Mini-batch AdaGrad on softmax cross-entropy with class-balanced weights."""
+    classes = tuple(c for c in LABELS if c in set(labels))
+    if len(classes) < 2:
+        raise ValueError(f"Need at least two classes to train, got {classes}")
+    index = {c: i for i, c in enumerate(classes)}
+    y = np.array([index[label] for label in labels])
+
+    counts = np.bincount(y, minlength=len(classes))
+    class_weight = (len(y) / (len(classes) * np.maximum(counts, 1))).astype(np.float32)
+
+    weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    g2_w = np.full_like(weights, 1e-8)
+    g2_b = np.full_like(bias, 1e-8)
+
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(rows))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            row_ids, feat_ids = _batch([rows[i] for i in batch], n_features)
+
+            logits = np.tile(bias, (len(batch), 1))
+            np.add.at(logits, row_ids, weights[feat_ids])
+            grad = _softmax(logits)
+            grad[np.arange(len(batch)), y[batch]] -= 1.0
+            grad *= class_weight[y[batch]][:, None] / len(batch)
+
+            uniq, inverse = np.unique(feat_ids, return_inverse=True)
+            grad_w = np.zeros((len(uniq), len(classes)), dtype=np.float32)
+            np.add.at(grad_w, inverse, grad[row_ids])
+            grad_w += l2 * weights[uniq]
+            grad_b = grad.sum(axis=0)
+
+            g2_w[uniq] += grad_w ** 2
+            g2_b += grad_b ** 2
+            weights[uniq] -= learning_rate * grad_w / np.sqrt(g2_w[uniq])
+            bias -= learning_rate * grad_b / np.sqrt(g2_b)
+
+    return RoutingModel(weights=weights, bias=bias, classes=classes)
+
+
+def label_from_outcome(record: Dict[str, Any]) -> Optional[str]:
+    """
+    Training label for a routing log record, or None if it can't be judged.
+
+    An explicit "label" wins; "qwen_passed" (from replaying the prompt on the
+    executor) says whether the cheap model sufficed. Otherwise executor
+    answers that passed metacognition are routine, executor answers that
+    failed it needed the oracle, and oracle answers keep their logged level.
+    Requests the manual override routed by hand say nothing about the
+    prompt and are skipped unless explicitly labeled. An unrecognised model
+    name falls through to auto routing, so it is still judged.
+    """
+    label = record.get("label")
+    if label in ("qwen", "executor"):
+        return "routine"
+    if label in ("deepseek", "oracle"):
+        return "complex"
+    if label in LABELS:
+        return label
+
+    override = record.get(
+        "override", str(record.get("routing_reason", "")).startswith("Manual override")
+    )
+    if record.get("error") or override:
+        return None
+
+    complexity = record.get("complexity")
+    if record.get("qwen_passed") is not None:
+        if record["qwen_passed"]:
+            return complexity if complexity in ("trivial", "routine") else "routine"
+        return complexity if complexity in ORACLE_LABELS else "complex"
+
+    if record.get("endpoint") == "qwen":
+        if record.get("metacog_passed") is False:
+            return "complex"
+        return complexity if complexity in ("trivial", "routine") else "routine"
+    if record.get("endpoint") == "deepseek" and complexity in ORACLE_LABELS:
+        return complexity
+    return None
+
+
+def load_examples(paths: Iterable[str]) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """(prompt, context_messages) rows and labels from routing log JSONL files."""
+    rows, labels = [], []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                label = label_from_outcome(record)
+                if label is None or not record.get("prompt"):
+                    continue
+                rows.append((record["prompt"], int(record.get("context_messages", 0))))
+                labels.append(label)
+    return rows, labels
+
+
+@dataclass
+class RouteMetrics:
+    """Oracle share and quality of a set of routing decisions."""
+    oracle_share: float  # fraction of traffic sent to DeepSeek
+    oracle_recall: float  # fraction of oracle-needing prompts sent to DeepSeek
+    accuracy: float  # exact complexity-label accuracy
+
+
+def route_metrics(predicted: Sequence[str], labels: Sequence[str]) -> RouteMetrics:
+    pred_oracle = np.array([p in ORACLE_LABELS for p in predicted])
+    true_oracle = np.array([t in ORACLE_LABELS for t in labels])
+    needed = max(int(true_oracle.sum()), 1)
+    return RouteMetrics(
+        oracle_share=float(pred_oracle.mean()) if len(predicted) else 0.0,
+        oracle_recall=float((pred_oracle & true_oracle).sum() / needed),
+        accuracy=(
+            float(np.mean([p == t for p, t in zip(predicted, labels)])) if len(predicted) else 0.0
+        ),
+    )
+
+
+def calibrate_threshold(
+    p_oracle: np.ndarray,
+    labels: Sequence[str],
+    target_recall: float,
+    max_threshold: float = 0.5,
+) -> float:
+    """
+    Highest threshold whose oracle recall still reaches target_recall.
+
+    Capped at max_threshold so a small, cleanly separated calibration set
+    can't push the cut-off to the edge of the oracle score distribution.
+    """
+    true_oracle = np.array([t in ORACLE_LABELS for t in labels])
+    scores = np.sort(p_oracle[true_oracle])[::-1]
+    if len(scores) == 0:
+        return max_threshold
+    needed = min(len(scores), max(1, math.ceil(target_recall * len(scores) - 1e-9)))
+    return min(float(scores[needed - 1]), max_threshold)
@@ -0,0 +1,171 @@
+"""
+Inference Transport (v16.4)
+
+Pooled HTTP clients for the model endpoints in ENDPOINTS.
+
+One keep-alive httpx.Client per model server is shared by every request, so
+inference calls reuse warm TCP connections instead of paying a fresh
+handshake each time. The sync client is kept (see inference.py NOTE on
+AsyncClient + llama.cpp); httpx.Client is safe to share across the worker
+threads used by asyncio.to_thread().
+
+Each replica in an endpoint pool (endpoint_pool.py) owns one transport;
+the pools handle lifecycle and replica selection.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from .nodes.state import ModelEndpoint
+
+logger = logging.getLogger("omni.agent.transport")
+
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_EXPIRY = float(os.getenv("INFERENCE_KEEPALIVE_EXPIRY", "120"))
+# Max seconds a request waits for a free pooled connection
+POOL_TIMEOUT = float(os.getenv("INFERENCE_POOL_TIMEOUT", "30"))
+
+inference_in_flight = Gauge(
+    "agent_inference_in_flight",
+    "Inference requests currently holding a pooled connection",
+    ["endpoint"]
+)
+
+inference_pool_max_connections = Gauge(
+    "agent_inference_pool_max_connections",
+    "Configured connection pool size per endpoint",
+    ["endpoint"]
+)
+
+inference_pool_saturated_total = Counter(
+    "agent_inference_pool_saturated_total",
+    "Requests that started while every pooled connection was busy",
+    ["endpoint"]
+)
+
+inference_connections_total = Counter(
+    "agent_inference_connections_total",
+    "Inference requests by connection reuse (reused=false means a new TCP connect)",
+    ["endpoint", "reused"]
+)
+
+
+class _ConnectProbe:
+    """httpcore trace hook that notices whether a request opened a new connection."""
+
+    def __init__(self):
+        self.connected = False
+
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self.connected = True
+
+
+class InferenceTransport:
+    """
+    Pooled, keep-alive HTTP transport for a single model endpoint.
+
+    Usage:
+        transport = InferenceTransport("qwen", ENDPOINTS["qwen"])
+        response = transport.post("/chat/completions", body)
+        with transport.stream("/chat/completions", body) as response:
+            for line in response.iter_lines(): ...
+    """
+
+    def __init__(self, key: str, endpoint: ModelEndpoint):
+        self.key = key
+        self.endpoint = endpoint
+        self.limits = httpx.Limits(
+            max_connections=endpoint.max_connections,
+            max_keepalive_connections=endpoint.max_keepalive,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def client(self) -> httpx.Client:
+        """Get or create the pooled client."""
+        if self._client is None or self._client.is_closed:
+            with self._lock:
+                if self._client is None or self._client.is_closed:
+                    self.open()
+        return self._client
+
+    def open(self) -> None:
+        """Create the pooled client (idempotent)."""
+        if self._client is not None and not self._client.is_closed:
+            return
+        self._client = httpx.Client(
+            timeout=httpx.Timeout(self.endpoint.timeout, pool=POOL_TIMEOUT),
+            limits=self.limits,
+            headers={"Content-Type": "application/json"},
+        )
+        inference_pool_max_connections.labels(endpoint=self.key).set(
+            self.endpoint.max_connections
+        )
+        logger.info(
+            f"Opened inference pool for {self.endpoint.name}: "
+            f"max_connections={self.endpoint.max_connections}, "
+            f"max_keepalive={self.endpoint.max_keepalive}"
+        )
+
+    def close(self) -> None:
+        """Close the pooled client and drop idle connections."""
+        with self._lock:
+            if self._client is not None and not self._client.is_closed:
+                self._client.close()
+                logger.info(f"Closed inference pool for {self.endpoint.name}")
+            self._client = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def _track(self) -> Iterator[_ConnectProbe]:
+        """Account in-flight requests, saturation and connection reuse."""
+        with self._lock:
+            if self._in_flight >= self.endpoint.max_connections:
+                inference_pool_saturated_total.labels(endpoint=self.key).inc()
+            self._in_flight += 1
+        inference_in_flight.labels(endpoint=self.key).inc()
+
+        probe = _ConnectProbe()
+        try:
+            yield probe
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            inference_in_flight.labels(endpoint=self.key).dec()
+            inference_connections_total.labels(
+                endpoint=self.key, reused=str(not probe.connected).lower()
+            ).inc()
+
+    def post(self, path: str, json: Dict[str, Any]) -> httpx.Response:
+        """POST a JSON body to the endpoint over a pooled connection."""
+        with self._track() as probe:
+            return self.client.post(
+                f"{self.endpoint.url}{path}",
+                json=json,
+                extensions={"trace": probe},
+            )
+
+    @contextmanager
+    def stream(self, path: str, json: Dict[str, Any]) -> Iterator[httpx.Response]:
+        """Open a streaming POST; the connection returns to the pool on exit."""
+        with self._track() as probe:
+            with self.client.stream(
+                "POST",
+                f"{self.endpoint.url}{path}",
+                json=json,
+                extensions={"trace": probe},
+            ) as response:
+                yield response
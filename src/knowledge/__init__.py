@@ -5,5 +5,6 @@ Memgraph-based code knowledge graph for semantic code queries.
 """
 
 from .memgraph_client import CodeContext, CodeSymbol, MemgraphClient
+from .symbol_index import SymbolIndex, build_symbol_index
 
-__all__ = ["MemgraphClient", "CodeSymbol", "CodeContext"]
+__all__ = ["MemgraphClient", "CodeSymbol", "CodeContext", "SymbolIndex", "build_symbol_index"]
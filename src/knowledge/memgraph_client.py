@@ -7,8 +7,9 @@ Provides semantic code queries via Memgraph graph database.
 
 import logging
 import os
+import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 logger = logging.getLogger("omni.knowledge.memgraph")
 
@@ -41,8 +42,18 @@ class CodeContext:
     relationships: List[Dict[str, Any]] = field(default_factory=list)
     query: str = ""
 
-    def to_prompt_context(self, max_chars: int = 2000) -> str:
-        """Format code context for injection into prompt."""
+    def to_prompt_context(
+        self,
+        max_chars: int = 2000,
+        count_tokens: Optional[Callable[[str], int]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """
+        Format code context for injection into prompt.
+
+        With count_tokens and max_tokens, whole lines are kept up to the token
+        limit instead of cutting the text at max_chars.
+        """
         if not self.symbols:
             return ""
 
@@ -65,6 +76,18 @@ class CodeContext:
 
         lines.append("</code_knowledge_graph>")
 
+        if count_tokens is not None and max_tokens is not None:
+            closing = lines.pop()
+            used = count_tokens(closing) + count_tokens("... (truncated)") + 2
+            for i, line in enumerate(lines):
+                used += count_tokens(line) + 1
+                if used > max_tokens:
+                    if i <= 1:
+                        return ""
+                    lines = lines[:i] + ["... (truncated)"]
+                    break
+            return "\n".join(lines + [closing])
+
         result = "\n".join(lines)
         if len(result) > max_chars:
             result = result[:max_chars - 20] + "\n... (truncated)"
@@ -72,12 +95,93 @@ class CodeContext:
         return result
 
 
+_SEARCH_TERM_PATTERN = re.compile(r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)*|[a-z_][a-z0-9_]+)\b')
+
+_KEYWORDS_TO_SKIP = {
+    "the", "this", "that", "what", "where", "when", "how", "why",
+    "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did",
+    "will", "would", "could", "should", "may", "might",
+    "can", "find", "get", "set", "all", "any", "some",
+    "function", "class", "method", "file", "code", "implement",
+}
+
+# One round trip for every search term: each term keeps its own top-20,
+# results come back in term order so ranking matches the old per-term loop.
+_BATCH_SYMBOL_QUERY = """
+UNWIND range(0, size($terms) - 1) AS idx
+WITH idx, $terms[idx] AS term
+MATCH (s)
+WHERE (s:Class OR s:Function) AND s.name CONTAINS term
+OPTIONAL MATCH (f:File)-[:CONTAINS*]->(s)
+WITH idx, collect({s: s, kind: labels(s)[0], file_path: f.path})[..20] AS hits
+UNWIND hits AS hit
+RETURN idx, hit.s AS s, hit.kind AS kind, hit.file_path AS file_path
+ORDER BY idx
+"""
+
+
+def _extract_search_terms(query: str, max_terms: int = 5) -> List[str]:
+    """Pick likely symbol names (CamelCase or snake_case words) out of a query."""
+    terms = []
+    for name in _SEARCH_TERM_PATTERN.findall(query):
+        if name.lower() in _KEYWORDS_TO_SKIP or len(name) <= 2 or name in terms:
+            continue
+        terms.append(name)
+        if len(terms) == max_terms:
+            break
+    return terms
+
+
+def _to_symbol(s: Any, kind: Optional[str], file_path: Optional[str]) -> CodeSymbol:
+    """Build a CodeSymbol from a graph node."""
+    return CodeSymbol(
+        name=s.get("name", ""),
+        qualified_name=s.get("qualified_name", ""),
+        kind=kind or "Symbol",
+        signature=s.get("signature", ""),
+        docstring=s.get("docstring", ""),
+        file_path=file_path or "",
+        line_start=s.get("line_start", 0),
+        line_end=s.get("line_end", 0),
+    )
+
+
+def _build_context(query: str, records: List[Any], limit: int) -> CodeContext:
+    """Deduplicate batched symbol records into a CodeContext."""
+    symbols = [_to_symbol(r["s"], r["kind"], r["file_path"]) for r in records]
+    return _dedupe_context(query, symbols, limit)
+
+
+def _dedupe_context(query: str, symbols: List[CodeSymbol], limit: int) -> CodeContext:
+    """Keep the first occurrence of each qualified name."""
+    seen = set()
+    unique_symbols = []
+    for symbol in symbols:
+        if symbol.qualified_name not in seen:
+            seen.add(symbol.qualified_name)
+            unique_symbols.append(symbol)
+
+    return CodeContext(
+        symbols=unique_symbols[:limit],
+        relationships=[],
+        query=query,
+    )
+
+
 class MemgraphClient:
     """
     Client for querying Memgraph code knowledge graph.
 
     Connects to Memgraph via Bolt protocol and provides semantic
     code queries (find references, get dependencies, etc.).
+
+    The *_async methods use the neo4j async driver (its own connection
+    pool) so callers on the event loop never block on Bolt I/O.
+
+    When a local symbol index is configured (MEMGRAPH_SYMBOL_INDEX, written
+    by scripts/index_code.py --symbol-index), name lookups are answered from
+    it in-process and only relationship traversals use Bolt.
     """
 
     def __init__(
@@ -85,11 +189,16 @@ class MemgraphClient:
         uri: Optional[str] = None,
         user: Optional[str] = None,
         password: Optional[str] = None,
+        symbol_index_path: Optional[str] = None,
     ):
         self.uri = uri or os.getenv("MEMGRAPH_URI", "bolt://localhost:7687")
         self.user = user or os.getenv("MEMGRAPH_USER", "")
         self.password = password or os.getenv("MEMGRAPH_PASSWORD", "")
+        self.symbol_index_path = symbol_index_path or os.getenv("MEMGRAPH_SYMBOL_INDEX", "")
         self._driver = None
+        self._async_driver = None
+        self._symbol_index = None
+        self._symbol_index_mtime = 0.0
 
     def _get_driver(self):
         """Lazy initialization of database driver."""
@@ -108,12 +217,58 @@ class MemgraphClient:
                 raise
         return self._driver
 
+    def _get_async_driver(self):
+        """Lazy initialization of the async (pooled) database driver."""
+        if self._async_driver is None:
+            try:
+                from neo4j import AsyncGraphDatabase
+                self._async_driver = AsyncGraphDatabase.driver(
+                    self.uri,
+                    auth=(self.user, self.password) if self.user else None
+                )
+            except ImportError:
+                logger.error("neo4j driver not installed")
+                raise
+            except Exception as e:
+                logger.error(f"Failed to connect to Memgraph: {e}")
+                raise
+        return self._async_driver
+
+    def _get_symbol_index(self):
+        """Open (or reopen after a rebuild) the local symbol index, if configured."""
+        if not self.symbol_index_path:
+            return None
+        try:
+            mtime = os.stat(self.symbol_index_path).st_mtime
+        except OSError:
+            return None
+        if self._symbol_index is None or mtime != self._symbol_index_mtime:
+            try:
+                from .symbol_index import SymbolIndex
+                index = SymbolIndex.open(self.symbol_index_path)
+            except Exception as e:
+                logger.error(f"Failed to open symbol index {self.symbol_index_path}: {e}")
+                return None
+            if self._symbol_index is not None:
+                self._symbol_index.close()
+            self._symbol_index = index
+            self._symbol_index_mtime = mtime
+            logger.info(f"Loaded symbol index with {len(index)} symbols")
+        return self._symbol_index
+
     def close(self):
         """Close the database connection."""
         if self._driver:
             self._driver.close()
             self._driver = None
 
+    async def aclose(self):
+        """Close both the async and sync database connections."""
+        if self._async_driver:
+            await self._async_driver.close()
+            self._async_driver = None
+        self.close()
+
     def health_check(self) -> bool:
         """Check if Memgraph is accessible."""
         try:
@@ -125,6 +280,18 @@ class MemgraphClient:
             logger.warning(f"Memgraph health check failed: {e}")
             return False
 
+    async def health_check_async(self) -> bool:
+        """Check if Memgraph is accessible without blocking the event loop."""
+        try:
+            driver = self._get_async_driver()
+            async with driver.session() as session:
+                result = await session.run("RETURN 1 as n")
+                record = await result.single()
+                return record["n"] == 1
+        except Exception as e:
+            logger.warning(f"Memgraph health check failed: {e}")
+            return False
+
     def find_symbol(self, name: str, kind: Optional[str] = None) -> List[CodeSymbol]:
         """
         Find symbols by name.
@@ -145,6 +312,10 @@ class MemgraphClient:
 
     def _find_symbol_impl(self, name: str, kind: Optional[str]) -> List[CodeSymbol]:
         """Internal implementation of find_symbol."""
+        index = self._get_symbol_index()
+        if index is not None:
+            return index.find(name, kind=kind, limit=20)
+
         try:
             driver = self._get_driver()
 
@@ -362,38 +533,75 @@ class MemgraphClient:
 
     def _get_code_context_impl(self, query: str, limit: int) -> CodeContext:
         """Internal implementation of get_code_context."""
-        import re
-
-        potential_names = re.findall(r'\b([A-Z][a-z]+(?:[A-Z][a-z]+)*|[a-z_][a-z0-9_]+)\b', query)
-
-        keywords_to_skip = {
-            "the", "this", "that", "what", "where", "when", "how", "why",
-            "is", "are", "was", "were", "be", "been", "being",
-            "have", "has", "had", "do", "does", "did",
-            "will", "would", "could", "should", "may", "might",
-            "can", "find", "get", "set", "all", "any", "some",
-            "function", "class", "method", "file", "code", "implement",
-        }
-
-        search_terms = [
-            name for name in potential_names
-            if name.lower() not in keywords_to_skip and len(name) > 2
-        ]
-
-        all_symbols = []
-        for term in search_terms[:5]:
-            symbols = self.find_symbol(term)
-            all_symbols.extend(symbols)
-
-        seen = set()
-        unique_symbols = []
-        for s in all_symbols:
-            if s.qualified_name not in seen:
-                seen.add(s.qualified_name)
-                unique_symbols.append(s)
-
-        return CodeContext(
-            symbols=unique_symbols[:limit],
-            relationships=[],
-            query=query,
-        )
+        search_terms = _extract_search_terms(query)
+        if not search_terms:
+            return CodeContext(query=query)
+
+        index = self._get_symbol_index()
+        if index is not None:
+            return self._code_context_from_index(index, query, search_terms, limit)
+
+        try:
+            driver = self._get_driver()
+            with driver.session() as session:
+                records = list(session.run(_BATCH_SYMBOL_QUERY, terms=search_terms))
+        except Exception as e:
+            logger.error(f"get_code_context failed: {e}")
+            return CodeContext(query=query)
+
+        return _build_context(query, records, limit)
+
+    async def get_code_context_async(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> CodeContext:
+        """
+        Async get_code_context: one batched Cypher round trip on the async driver.
+
+        Args:
+            query: Natural language query about code
+            limit: Maximum symbols to return
+
+        Returns:
+            CodeContext with relevant symbols
+
+        Raises:
+            Exception: Driver or query errors propagate so callers can feed
+                       their circuit breaker.
+        """
+        if TRACING_ENABLED and tracer:
+            with tracer.start_as_current_span("memgraph_get_code_context_async") as span:
+                span.set_attribute("query", query[:100])
+                return await self._get_code_context_async_impl(query, limit)
+        return await self._get_code_context_async_impl(query, limit)
+
+    async def _get_code_context_async_impl(self, query: str, limit: int) -> CodeContext:
+        """Internal implementation of get_code_context_async."""
+        search_terms = _extract_search_terms(query)
+        if not search_terms:
+            return CodeContext(query=query)
+
+        index = self._get_symbol_index()
+        if index is not None:
+            return self._code_context_from_index(index, query, search_terms, limit)
+
+        driver = self._get_async_driver()
+        async with driver.session() as session:
+            result = await session.run(_BATCH_SYMBOL_QUERY, terms=search_terms)
+            records = [record async for record in result]
+
+        return _build_context(query, records, limit)
+
+    def _code_context_from_index(
+        self,
+        index: Any,
+        query: str,
+        search_terms: List[str],
+        limit: int,
+    ) -> CodeContext:
+        """Answer a code-context lookup from the local symbol index (no Bolt)."""
+        symbols = []
+        for term in search_terms:
+            symbols.extend(index.find(term, limit=20))
+        return _dedupe_context(query, symbols, limit)
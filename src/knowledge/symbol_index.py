@@ -0,0 +1,258 @@
+"""
+Local Symbol Index (v16.4)
+
+Compact, memory-mapped symbol table written by scripts/index_code.py
+(--symbol-index). It answers the name lookups behind get_code_context
+in-process, in microseconds, instead of a Bolt round trip to Memgraph.
+Relationship traversals (callers, imports, inheritance) still go to
+Memgraph.
+
+File layout (little-endian):
+
+    header    magic "OMSI", version, n_symbols, n_trigrams,
+              records_off, trigrams_off, postings_off, strings_off
+    records   n_symbols fixed-size records sorted by (name.lower(), name):
+              (off, len) pairs for name, qualified_name, signature,
+              docstring and file_path into the string blob, then
+              line_start, line_end, kind
+    trigrams  sorted (trigram, postings_start, count) over the lowercased
+              UTF-8 bytes of each name (loaded into a dict on open)
+    postings  u32 record indices per trigram, ascending
+    strings   deduplicated UTF-8 blob
+
+Usage:
+    build_symbol_index(symbols, "/state/symbols.idx")
+    index = SymbolIndex.open("/state/symbols.idx")
+    index.find("parse_request")       # CONTAINS semantics, like Cypher
+    index.prefix("Graph")             # case-insensitive prefix, sorted table
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .memgraph_client import CodeSymbol
+
+logger = logging.getLogger("omni.knowledge.symbol_index")
+
+MAGIC = b"OMSI"
+VERSION = 1
+KINDS = ("Class", "Function")
+
+_HEADER = struct.Struct("<4sIIIQQQQ")
+_RECORD = struct.Struct("<13I")
+_TRIGRAM = struct.Struct("<III")
+
+
+def _trigrams(name: str) -> List[int]:
+    """Distinct trigram keys of a name (lowercased UTF-8 bytes packed into u32)."""
+    data = name.lower().encode("utf-8")
+    return sorted({int.from_bytes(data[i:i + 3], "little") for i in range(len(data) - 2)})
+
+
+def build_symbol_index(symbols: Iterable[CodeSymbol], path: str) -> int:
+    """
+    Write a symbol index file atomically.
+
+    Args:
+        symbols: Symbols to index (kind must be "Class" or "Function")
+        path: Destination file
+
+    Returns:
+        Number of symbols written
+    """
+    unique: Dict[str, CodeSymbol] = {}
+    for symbol in symbols:
+        if symbol.kind in KINDS:
+            unique[symbol.qualified_name] = symbol
+    ordered = sorted(unique.values(), key=lambda s: (s.name.lower(), s.name, s.qualified_name))
+
+    blob = bytearray()
+    interned: Dict[str, Tuple[int, int]] = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        ref = interned.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = (len(blob), len(data))
+            blob.extend(data)
+            interned[text] = ref
+        return ref
+
+    records = bytearray()
+    postings_by_trigram: Dict[int, List[int]] = {}
+    for idx, s in enumerate(ordered):
+        fields = []
+        for text in (s.name, s.qualified_name, s.signature, s.docstring, s.file_path):
+            fields.extend(intern(text or ""))
+        fields.extend([s.line_start or 0, s.line_end or 0, KINDS.index(s.kind)])
+        records.extend(_RECORD.pack(*fields))
+        for key in _trigrams(s.name):
+            postings_by_trigram.setdefault(key, []).append(idx)
+
+    trigram_table = bytearray()
+    postings = bytearray()
+    start = 0
+    for key in sorted(postings_by_trigram):
+        ids = postings_by_trigram[key]
+        trigram_table.extend(_TRIGRAM.pack(key, start, len(ids)))
+        postings.extend(struct.pack(f"<{len(ids)}I", *ids))
+        start += len(ids)
+
+    records_off = _HEADER.size
+    trigrams_off = records_off + len(records)
+    postings_off = trigrams_off + len(trigram_table)
+    strings_off = postings_off + len(postings)
+    header = _HEADER.pack(
+        MAGIC, VERSION, len(ordered), len(postings_by_trigram),
+        records_off, trigrams_off, postings_off, strings_off,
+    )
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(records)
+        f.write(trigram_table)
+        f.write(postings)
+        f.write(blob)
+    os.replace(tmp, path)
+
+    logger.info(f"Wrote symbol index: {len(ordered)} symbols, {len(postings_by_trigram)} trigrams -> {path}")
+    return len(ordered)
+
+
+class SymbolIndex:
+    """Read-only, memory-mapped symbol index."""
+
+    def __init__(self, path: str, mm: mmap.mmap):
+        self.path = path
+        self._mm = mm
+        (
+            magic, version, self.n_symbols, self.n_trigrams,
+            self._records_off, self._trigrams_off, self._postings_off, self._strings_off,
+        ) = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} symbol index")
+
+        # Names and the trigram directory are small and hit on every query,
+        # so decode them once; records, postings and strings stay in the mmap.
+        self._name_list = []
+        kinds = bytearray()
+        for i in range(self.n_symbols):
+            r = self._record(i)
+            self._name_list.append(self._string(r[0], r[1]))
+            kinds.append(r[12])
+        self._kinds = bytes(kinds)
+        self._lower_names = [name.lower() for name in self._name_list]
+        self._symbols: Dict[int, CodeSymbol] = {}
+        self._trigram_dir = {
+            key: (start, count)
+            for key, start, count in _TRIGRAM.iter_unpack(
+                mm[self._trigrams_off:self._trigrams_off + self.n_trigrams * _TRIGRAM.size]
+            )
+        }
+
+    @classmethod
+    def open(cls, path: str) -> "SymbolIndex":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(path, mm)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.n_symbols
+
+    def _string(self, off: int, length: int) -> str:
+        start = self._strings_off + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _record(self, i: int) -> Tuple[int, ...]:
+        return _RECORD.unpack_from(self._mm, self._records_off + i * _RECORD.size)
+
+    def symbol(self, i: int) -> CodeSymbol:
+        """Materialize record i as a CodeSymbol (memoized; treat as read-only)."""
+        cached = self._symbols.get(i)
+        if cached is not None:
+            return cached
+        r = self._record(i)
+        symbol = self._symbols[i] = CodeSymbol(
+            name=self._string(r[0], r[1]),
+            qualified_name=self._string(r[2], r[3]),
+            signature=self._string(r[4], r[5]),
+            docstring=self._string(r[6], r[7]),
+            file_path=self._string(r[8], r[9]),
+            line_start=r[10],
+            line_end=r[11],
+            kind=KINDS[r[12]],
+        )
+        return symbol
+
+    def _kind(self, i: int) -> str:
+        return KINDS[self._kinds[i]]
+
+    def _postings(self, key: int) -> Tuple[int, ...]:
+        entry = self._trigram_dir.get(key)
+        if entry is None:
+            return ()
+        start, count = entry
+        return struct.unpack_from(f"<{count}I", self._mm, self._postings_off + start * 4)
+
+    def prefix(self, prefix: str, kind: Optional[str] = None, limit: int = 20) -> List[CodeSymbol]:
+        """Symbols whose name starts with prefix (case-insensitive), via the sorted table."""
+        if kind and kind not in KINDS:
+            return []
+        needle = prefix.lower()
+        results = []
+        i = bisect.bisect_left(self._lower_names, needle)
+        while i < self.n_symbols and len(results) < limit:
+            if not self._lower_names[i].startswith(needle):
+                break
+            if not kind or self._kind(i) == kind:
+                results.append(self.symbol(i))
+            i += 1
+        return results
+
+    def lookup(self, name: str, kind: Optional[str] = None) -> List[CodeSymbol]:
+        """Symbols named exactly name."""
+        return [
+            s for s in self.prefix(name, kind=kind, limit=self.n_symbols)
+            if s.name == name
+        ]
+
+    def find(self, term: str, kind: Optional[str] = None, limit: int = 20) -> List[CodeSymbol]:
+        """
+        Symbols whose name contains term, matching Cypher CONTAINS (case-sensitive).
+
+        Exact matches rank first, then prefix matches, then shorter names.
+        Kinds the index does not hold (e.g. "Method") match nothing, as in Memgraph.
+        """
+        if kind and kind not in KINDS:
+            return []
+        keys = _trigrams(term)
+        if keys:
+            # Every match contains every trigram of the term, so the rarest
+            # trigram's postings bound the candidates; names verify the rest.
+            counts = [self._trigram_dir.get(k, (0, 0))[1] for k in keys]
+            rarest = keys[counts.index(min(counts))]
+            candidates = self._postings(rarest)
+        else:
+            # Terms shorter than a trigram: fall back to a full scan
+            candidates = range(self.n_symbols)
+
+        names = self._name_list
+        kind_id = KINDS.index(kind) if kind else None
+        matches = []
+        for i in candidates:
+            name = names[i]
+            if term not in name or (kind_id is not None and self._kinds[i] != kind_id):
+                continue
+            rank = 0 if name == term else 1 if name.startswith(term) else 2
+            matches.append((rank, len(name), name, i))
+
+        matches.sort()
+        return [self.symbol(i) for _, _, _, i in matches[:limit]]
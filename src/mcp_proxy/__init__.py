@@ -4,8 +4,23 @@ MCP Security Proxy - Default Deny Gateway
 Protocol OMNI v16.2 - Concrete Bunker Doctrine
 """
 
-from .allowlist import ToolAllowlist, ToolPermission
+from .allowlist import Decision, DecisionTable, ToolAllowlist, ToolPermission
 from .audit import AuditLogger
+from .audit_store import AuditStore
+from .ratelimit import RateLimiter, SQLiteRateLimiter, create_rate_limiter
+from .upstream import UpstreamError, UpstreamPool
 
-__all__ = ["ToolAllowlist", "ToolPermission", "AuditLogger"]
+__all__ = [
+    "Decision",
+    "DecisionTable",
+    "ToolAllowlist",
+    "ToolPermission",
+    "AuditLogger",
+    "AuditStore",
+    "RateLimiter",
+    "SQLiteRateLimiter",
+    "create_rate_limiter",
+    "UpstreamError",
+    "UpstreamPool",
+]
 __version__ = "16.2.0"
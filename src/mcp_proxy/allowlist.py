@@ -2,17 +2,36 @@
 Tool Allowlist - YAML-based Default Deny configuration.
 
 All tools are denied unless explicitly listed in the allowlist.
+
+The YAML compiles into an immutable DecisionTable (pre-parsed rate limits,
+wildcards resolved, memoized (tool, method) verdicts). ToolAllowlist holds a
+single reference to the current table; reloads build a new table and swap
+the reference, so the read path never takes a lock.
 """
 
 import logging
+import os
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
 
 import yaml
+from prometheus_client import Counter
 
 logger = logging.getLogger(__name__)
 
+ALLOWLIST_RELOAD_INTERVAL = float(os.getenv("ALLOWLIST_RELOAD_INTERVAL", "5"))
+# Verdict cache bound per table; cleared wholesale when full
+DECISION_CACHE_SIZE = 4096
+
+mcp_allowlist_reloads_total = Counter(
+    "mcp_allowlist_reloads_total",
+    "Allowlist hot reloads",
+    ["result"]
+)
+
 
 @dataclass
 class ToolPermission:
@@ -20,6 +39,7 @@ class ToolPermission:
     name: str
     methods: Set[str] = field(default_factory=set)
     rate_limit: str = "60/min"
+    burst: Optional[int] = None
     audit: bool = True
 
     def allows_method(self, method: str) -> bool:
@@ -33,6 +53,84 @@ class ToolPermission:
         return int(count), period_seconds
 
 
+@dataclass(frozen=True)
+class Decision:
+    """Verdict for one (tool, method) pair, with the tool's pre-parsed limit."""
+    allowed: bool
+    permission: Optional[ToolPermission] = None
+    limit: int = 0
+    window: int = 0
+    burst: Optional[int] = None
+
+
+DENY = Decision(allowed=False)
+ALLOW_UNLIMITED = Decision(allowed=True)
+
+
+@dataclass(frozen=True)
+class DecisionTable:
+    """Compiled, read-only allowlist."""
+    policy: str = "deny"
+    permissions: Mapping[str, ToolPermission] = field(default_factory=lambda: MappingProxyType({}))
+    denied: FrozenSet[str] = frozenset()
+    methods: Mapping[str, Optional[FrozenSet[str]]] = field(default_factory=lambda: MappingProxyType({}))
+    limits: Mapping[str, Tuple[int, int]] = field(default_factory=lambda: MappingProxyType({}))
+    _cache: Dict[Tuple[str, str], Decision] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def compile(cls, config: dict) -> "DecisionTable":
+        permissions: Dict[str, ToolPermission] = {}
+        methods: Dict[str, Optional[FrozenSet[str]]] = {}
+        limits: Dict[str, Tuple[int, int]] = {}
+
+        for tool_name, tool_config in (config.get("allowed_tools") or {}).items():
+            tool_config = tool_config or {}
+            permission = ToolPermission(
+                name=tool_name,
+                methods=set(tool_config.get("methods", ["*"])),
+                rate_limit=tool_config.get("rate_limit", "60/min"),
+                burst=tool_config.get("burst"),
+                audit=tool_config.get("audit", True),
+            )
+            permissions[tool_name] = permission
+            # None means wildcard: any method
+            methods[tool_name] = None if "*" in permission.methods else frozenset(permission.methods)
+            limits[tool_name] = permission.parse_rate_limit()
+
+        return cls(
+            policy=config.get("policy", "deny"),
+            permissions=MappingProxyType(permissions),
+            denied=frozenset(config.get("denied_tools") or []),
+            methods=MappingProxyType(methods),
+            limits=MappingProxyType(limits),
+        )
+
+    def decide(self, tool_name: str, method: str) -> Decision:
+        key = (tool_name, method)
+        decision = self._cache.get(key)
+        if decision is None:
+            decision = self._decide(tool_name, method)
+            if len(self._cache) >= DECISION_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = decision
+        return decision
+
+    def _decide(self, tool_name: str, method: str) -> Decision:
+        if tool_name in self.denied:
+            return DENY
+
+        permission = self.permissions.get(tool_name)
+        if permission is None:
+            return DENY if self.policy == "deny" else ALLOW_UNLIMITED
+
+        allowed_methods = self.methods[tool_name]
+        if allowed_methods is not None and method not in allowed_methods and self.policy == "deny":
+            return DENY
+
+        limit, window = self.limits[tool_name]
+        return Decision(allowed=True, permission=permission, limit=limit, window=window, burst=permission.burst)
+
+
 class ToolAllowlist:
     """
     Manages tool permissions with Default Deny policy.
@@ -43,53 +141,111 @@ class ToolAllowlist:
           mcp_ssh-mcp:
             methods: [ssh_execute, ssh_connect]
             rate_limit: 10/min
+            burst: 20          # optional, defaults to the rate_limit count
     """
 
     def __init__(self, config_path: Optional[str] = None):
-        self.policy = "deny"
-        self.allowed_tools: Dict[str, ToolPermission] = {}
-        self.denied_tools: Set[str] = set()
+        self.config_path = config_path
+        self._table = DecisionTable()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
 
         if config_path:
             self.load(config_path)
 
+    @property
+    def table(self) -> DecisionTable:
+        return self._table
+
+    @property
+    def policy(self) -> str:
+        return self._table.policy
+
+    @property
+    def allowed_tools(self) -> Mapping[str, ToolPermission]:
+        return self._table.permissions
+
+    @property
+    def denied_tools(self) -> FrozenSet[str]:
+        return self._table.denied
+
     def load(self, config_path: str) -> None:
         path = Path(config_path)
         if not path.exists():
             logger.warning(f"Allowlist not found: {config_path}, using empty allowlist")
             return
 
+        stamp = _stat_stamp(path)
         with open(path) as f:
-            config = yaml.safe_load(f)
+            config = yaml.safe_load(f) or {}
 
-        self.policy = config.get("policy", "deny")
+        self._table = DecisionTable.compile(config)
+        self.config_path = config_path
+        self._stamp = stamp
 
-        for tool_name, tool_config in config.get("allowed_tools", {}).items():
-            methods = set(tool_config.get("methods", ["*"]))
-            self.allowed_tools[tool_name] = ToolPermission(
-                name=tool_name,
-                methods=methods,
-                rate_limit=tool_config.get("rate_limit", "60/min"),
-                audit=tool_config.get("audit", True),
-            )
+        logger.info(f"Loaded allowlist: {len(self._table.permissions)} tools permitted")
 
-        self.denied_tools = set(config.get("denied_tools", []))
+    def reload(self) -> bool:
+        """
+        Recompile if the file changed since the last load.
 
-        logger.info(f"Loaded allowlist: {len(self.allowed_tools)} tools permitted")
+        A file that fails to parse leaves the current table in place.
 
-    def is_allowed(self, tool_name: str, method: str) -> bool:
-        if tool_name in self.denied_tools:
+        Returns:
+            True if a new table was swapped in
+        """
+        if not self.config_path:
+            return False
+        path = Path(self.config_path)
+        if not path.exists() or _stat_stamp(path) == self._stamp:
+            return False
+
+        try:
+            self.load(self.config_path)
+        except Exception as e:
+            mcp_allowlist_reloads_total.labels(result="error").inc()
+            logger.error(f"Allowlist reload failed, keeping previous table: {e}")
+            # Don't retry the same broken file every poll
+            self._stamp = _stat_stamp(path)
             return False
 
-        if self.policy == "deny":
-            if tool_name not in self.allowed_tools:
-                return False
-            return self.allowed_tools[tool_name].allows_method(method)
+        mcp_allowlist_reloads_total.labels(result="success").inc()
+        return True
 
-        return tool_name not in self.denied_tools
+    def start_watching(self, interval: float = ALLOWLIST_RELOAD_INTERVAL) -> None:
+        """Poll the config file and hot-swap the table on change (interval <= 0 disables)."""
+        if interval <= 0 or self._watcher is not None or not self.config_path:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=watch, name="allowlist-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {self.config_path} for allowlist changes every {interval}s")
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def decide(self, tool_name: str, method: str) -> Decision:
+        return self._table.decide(tool_name, method)
+
+    def is_allowed(self, tool_name: str, method: str) -> bool:
+        return self._table.decide(tool_name, method).allowed
 
     def get_permission(self, tool_name: str) -> Optional[ToolPermission]:
-        return self.allowed_tools.get(tool_name)
+        return self._table.permissions.get(tool_name)
 
     def list_allowed_tools(self) -> List[str]:
-        return list(self.allowed_tools.keys())
+        return list(self._table.permissions.keys())
+
+
+def _stat_stamp(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
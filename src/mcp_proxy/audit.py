@@ -1,17 +1,44 @@
 """
 Audit Logger - Structured logging and Prometheus metrics for MCP tool invocations.
+
+log_invocation only updates metrics and appends the event to a bounded ring
+buffer; a background flusher thread serializes, logs and writes events in
+batches, so /invoke never blocks on file I/O. When the buffer is full the
+oldest unflushed event is dropped (and counted). close() drains the buffer
+before returning, so a graceful shutdown loses nothing.
+
+Audit files rotate by size (AUDIT_MAX_BYTES) and age (AUDIT_MAX_AGE);
+rotated segments are renamed <file>.<UTC timestamp> and, with
+AUDIT_COMPRESS=gzip, compressed to <file>.<UTC timestamp>.gz.
+
+With an AuditStore attached, every flushed batch is also inserted into an
+indexed SQLite store for lookups by audit_id, tool, status and time range.
 """
 
+import gzip
 import json
 import logging
+import os
+import shutil
+import threading
 import time
+from collections import deque
 from dataclasses import asdict, dataclass
-from typing import Optional
+from typing import List, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from .audit_store import AuditStore
 
 logger = logging.getLogger(__name__)
 
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "256"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_MAX_BYTES = int(os.getenv("AUDIT_MAX_BYTES", str(100 * 1024 * 1024)))
+AUDIT_MAX_AGE = float(os.getenv("AUDIT_MAX_AGE", "86400"))
+AUDIT_COMPRESS = os.getenv("AUDIT_COMPRESS", "")
+
 mcp_invocations_total = Counter(
     "mcp_invocations_total",
     "Total MCP tool invocations",
@@ -30,6 +57,21 @@ mcp_denied_total = Counter(
     ["tool", "method", "reason"]
 )
 
+mcp_audit_events_flushed_total = Counter(
+    "mcp_audit_events_flushed_total",
+    "Audit events written by the background flusher"
+)
+
+mcp_audit_events_dropped_total = Counter(
+    "mcp_audit_events_dropped_total",
+    "Audit events dropped because the ring buffer was full"
+)
+
+mcp_audit_buffer_depth = Gauge(
+    "mcp_audit_buffer_depth",
+    "Audit events waiting to be flushed"
+)
+
 
 @dataclass
 class AuditEvent:
@@ -52,12 +94,38 @@ class AuditLogger:
     Logs MCP tool invocations with structured JSON and Prometheus metrics.
     """
 
-    def __init__(self, log_file: Optional[str] = None):
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        buffer_size: int = AUDIT_BUFFER_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_bytes: int = AUDIT_MAX_BYTES,
+        max_age: float = AUDIT_MAX_AGE,
+        compress: str = AUDIT_COMPRESS,
+        store: Optional[AuditStore] = None,
+    ):
         self.log_file = log_file
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
         self._file_handler = None
+        self._opened_at = 0.0
+
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._wake = threading.Event()
+        self._stopping = False
+        self._idle = threading.Condition()
+        self._write_lock = threading.Lock()
 
         if log_file:
-            self._file_handler = open(log_file, "a")
+            self._open_file()
+
+        self._flusher = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._flusher.start()
 
     def log_invocation(
         self,
@@ -85,13 +153,7 @@ class AuditLogger:
         if duration_ms:
             mcp_invocation_duration.labels(tool=tool, method=method).observe(duration_ms / 1000)
 
-        log_line = event.to_json()
-        logger.info(f"MCP_AUDIT: {log_line}")
-
-        if self._file_handler:
-            self._file_handler.write(log_line + "\n")
-            self._file_handler.flush()
-
+        self._enqueue(event)
         return event
 
     def log_denied(
@@ -111,6 +173,107 @@ class AuditLogger:
             error=reason,
         )
 
+    def _enqueue(self, event: AuditEvent) -> None:
+        if self._stopping:
+            # Flusher is draining for shutdown; write inline so nothing is lost
+            self._write_batch([event])
+            return
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            mcp_audit_events_dropped_total.inc()
+        buffer.append(event)
+        if len(buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _take_batch(self) -> List[AuditEvent]:
+        batch = []
+        buffer = self._buffer
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(buffer.popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Audit flush failed ({len(batch)} events): {e}")
+            mcp_audit_buffer_depth.set(len(self._buffer))
+            with self._idle:
+                self._idle.notify_all()
+            if stopping:
+                return
+
+    def _write_batch(self, batch: List[AuditEvent]) -> None:
+        lines = [event.to_json() for event in batch]
+        for line in lines:
+            logger.info(f"MCP_AUDIT: {line}")
+
+        with self._write_lock:
+            if self._file_handler:
+                self._maybe_rotate()
+                self._file_handler.write("\n".join(lines) + "\n")
+                self._file_handler.flush()
+
+        if self.store:
+            try:
+                self.store.write(batch)
+            except Exception as e:
+                logger.error(f"Audit store write failed ({len(batch)} events): {e}")
+
+        mcp_audit_events_flushed_total.inc(len(batch))
+
+    def _open_file(self) -> None:
+        self._file_handler = open(self.log_file, "a")
+        self._opened_at = time.time()
+
+    def _maybe_rotate(self) -> None:
+        size = self._file_handler.tell()
+        if size == 0:
+            return
+        if size < self.max_bytes and time.time() - self._opened_at < self.max_age:
+            return
+
+        self._file_handler.close()
+        base = f"{self.log_file}.{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}"
+        segment, suffix = base, 1
+        while os.path.exists(segment) or os.path.exists(f"{segment}.gz"):
+            segment = f"{base}-{suffix}"
+            suffix += 1
+        os.replace(self.log_file, segment)
+
+        if self.compress == "gzip":
+            with open(segment, "rb") as src, gzip.open(f"{segment}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment)
+            segment = f"{segment}.gz"
+
+        logger.info(f"Rotated audit log to {segment}")
+        self._file_handler = open(self.log_file, "a")
+        self._opened_at = time.time()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything logged so far has been written."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._buffer:
+                self._wake.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._flusher.is_alive():
+                    return False
+                self._idle.wait(min(remaining, 0.1))
+        return True
+
     def get_metrics(self) -> bytes:
         return generate_latest()
 
@@ -118,5 +281,17 @@ class AuditLogger:
         return CONTENT_TYPE_LATEST
 
     def close(self):
-        if self._file_handler:
-            self._file_handler.close()
+        if not self._stopping:
+            self._stopping = True
+            self._wake.set()
+            self._flusher.join()
+            # Anything enqueued between the flusher's last pass and stop
+            for batch in iter(self._take_batch, []):
+                self._write_batch(batch)
+        with self._write_lock:
+            if self._file_handler:
+                self._file_handler.close()
+                self._file_handler = None
+        if self.store:
+            self.store.close()
+            self.store = None
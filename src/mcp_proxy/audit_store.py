@@ -0,0 +1,165 @@
+"""
+Audit Store - Indexed SQLite copy of the MCP audit trail.
+
+The audit flusher writes each batch here in one transaction alongside the
+JSON-lines file. Lookups by audit_id, tool, status and time range are
+served by (column, timestamp) indexes, so triage queries stay in the
+millisecond range over millions of events instead of scanning files.
+
+WAL mode lets the gateway's query endpoints read while the flusher writes;
+each reading thread gets its own connection.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_DB_PATH = os.getenv("AUDIT_DB_PATH", "")
+# Events older than this are pruned by the flusher (0 keeps everything)
+AUDIT_DB_RETENTION = float(os.getenv("AUDIT_DB_RETENTION", str(30 * 86400)))
+AUDIT_QUERY_MAX_LIMIT = 1000
+
+COLUMNS = ("audit_id", "timestamp", "tool", "method", "status", "duration_ms", "user_context", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id           INTEGER PRIMARY KEY,
+    audit_id     TEXT NOT NULL,
+    timestamp    REAL NOT NULL,
+    tool         TEXT NOT NULL,
+    method       TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    duration_ms  REAL,
+    user_context TEXT,
+    error        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audit_id ON audit_events(audit_id);
+CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_tool_ts ON audit_events(tool, timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_status_ts ON audit_events(status, timestamp);
+"""
+
+
+class AuditStore:
+    """SQLite (WAL) audit event store: one writer, per-thread readers."""
+
+    def __init__(self, path: str, retention: float = AUDIT_DB_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._write_lock = threading.Lock()
+        self._last_prune = 0.0
+
+        self._writer = self._connect()
+        self._writer.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._readers.append(conn)
+        return conn
+
+    def write(self, events: Iterable[Any]) -> int:
+        """Insert a batch of AuditEvent-like objects in one transaction."""
+        rows = [tuple(getattr(e, c) for c in COLUMNS) for e in events]
+        if not rows:
+            return 0
+        with self._write_lock, self._writer:
+            self._writer.executemany(
+                f"INSERT INTO audit_events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+        self._maybe_prune()
+        return len(rows)
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        if self.retention <= 0 or now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+        with self._write_lock, self._writer:
+            deleted = self._writer.execute(
+                "DELETE FROM audit_events WHERE timestamp < ?", (now - self.retention,)
+            ).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} audit events older than {self.retention:.0f}s")
+
+    def get(self, audit_id: str) -> List[Dict[str, Any]]:
+        """All events recorded under audit_id, in write order."""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM audit_events WHERE audit_id = ? ORDER BY id",
+            (audit_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def query(
+        self,
+        tool: Optional[str] = None,
+        method: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first events matching every given filter; until is exclusive."""
+        clauses, params = [], []
+        for column, value in (("tool", tool), ("method", method), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, min(limit, AUDIT_QUERY_MAX_LIMIT)))
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM audit_events {where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def counts(self, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Per-tool event counts by status within a time range."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT tool, status, COUNT(*) AS n FROM audit_events {where} GROUP BY tool, status",
+            params,
+        ).fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            result.setdefault(r["tool"], {})[r["status"]] = r["n"]
+        return result
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._writer.close()
+        for conn in self._readers:
+            conn.close()
+        self._readers = []
+        self._local = threading.local()
@@ -0,0 +1,129 @@
+"""
+MCP Echo Server - Local stand-in for an upstream MCP server.
+
+Speaks JSON-RPC 2.0 over stdio (newline-delimited) or Streamable HTTP and
+implements just enough of MCP for the gateway's tests and benchmarks:
+
+    initialize      returns serverInfo and capabilities
+    ping            returns {}
+    tools/list      lists the "echo" tool
+    tools/call      echoes name and arguments back as text content;
+                    arguments.sleep_ms delays the reply, arguments.fail
+                    returns an isError result
+
+Requests are handled concurrently, so replies can arrive out of order -
+which is exactly what pipelining clients must cope with.
+
+Usage:
+    python echo_server.py                 # stdio
+    python echo_server.py --http 8099     # Streamable HTTP on /mcp
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Dict, Optional
+
+PROTOCOL_VERSION = "2025-03-26"
+
+ECHO_TOOL = {
+    "name": "echo",
+    "description": "Echo the call back",
+    "inputSchema": {"type": "object"},
+}
+
+
+async def handle_message(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Handle one JSON-RPC message; returns None for notifications."""
+    if "id" not in message:
+        return None
+
+    method = message.get("method")
+    params = message.get("params") or {}
+    reply: Dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"]}
+
+    if method == "initialize":
+        reply["result"] = {
+            "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "omni-echo", "version": "1.0.0"},
+        }
+    elif method == "ping":
+        reply["result"] = {}
+    elif method == "tools/list":
+        reply["result"] = {"tools": [ECHO_TOOL]}
+    elif method == "tools/call":
+        arguments = params.get("arguments") or {}
+        if arguments.get("sleep_ms"):
+            await asyncio.sleep(arguments["sleep_ms"] / 1000)
+        text = json.dumps({"name": params.get("name"), "arguments": arguments})
+        reply["result"] = {
+            "content": [{"type": "text", "text": text}],
+            "isError": bool(arguments.get("fail")),
+        }
+    else:
+        reply["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+
+    return reply
+
+
+async def serve_stdio() -> None:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=16 * 1024 * 1024)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    out = sys.stdout.buffer
+    tasks = set()
+
+    async def respond(message: Dict[str, Any]) -> None:
+        reply = await handle_message(message)
+        if reply is not None:
+            out.write(json.dumps(reply).encode() + b"\n")
+            out.flush()
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(respond(json.loads(line)))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def create_app():
+    """Streamable HTTP variant (POST /mcp, JSON responses)."""
+    from fastapi import FastAPI, Request, Response
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI(title="MCP Echo Server")
+
+    @app.post("/mcp")
+    async def mcp(request: Request):
+        reply = await handle_message(await request.json())
+        if reply is None:
+            return Response(status_code=202)
+        headers = {"Mcp-Session-Id": "echo-session"} if reply.get("result", {}).get("serverInfo") else {}
+        return JSONResponse(reply, headers=headers)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP echo server")
+    parser.add_argument("--http", type=int, metavar="PORT", help="Serve Streamable HTTP instead of stdio")
+    args = parser.parse_args()
+
+    if args.http:
+        import uvicorn
+        uvicorn.run(create_app(), host="127.0.0.1", port=args.http, log_level="warning")
+    else:
+        asyncio.run(serve_stdio())
+
+
+if __name__ == "__main__":
+    main()
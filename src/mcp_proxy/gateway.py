@@ -7,11 +7,11 @@ All MCP tool calls must route through this gateway.
 Tools not in the allowlist are denied with 403 Forbidden.
 """
 
+import asyncio
 import logging
 import os
 import time
 import uuid
-from collections import defaultdict
 from contextlib import asynccontextmanager
 from typing import Any, Dict, Optional
 
@@ -21,6 +21,9 @@ from pydantic import BaseModel
 
 from .allowlist import ToolAllowlist
 from .audit import AuditLogger
+from .audit_store import AUDIT_DB_PATH, AuditStore
+from .ratelimit import RateLimiter, SQLiteRateLimiter, create_rate_limiter
+from .upstream import UpstreamPool
 
 try:
     from opentelemetry import trace
@@ -54,40 +57,29 @@ class ToolInvokeResponse(BaseModel):
     duration_ms: float
 
 
-class RateLimiter:
-    """Simple in-memory rate limiter."""
-
-    def __init__(self):
-        self.requests: Dict[str, list] = defaultdict(list)
-
-    def is_allowed(self, key: str, limit: int, window_seconds: int) -> bool:
-        now = time.time()
-        cutoff = now - window_seconds
-
-        self.requests[key] = [t for t in self.requests[key] if t > cutoff]
-
-        if len(self.requests[key]) >= limit:
-            return False
-
-        self.requests[key].append(now)
-        return True
-
-
 allowlist: Optional[ToolAllowlist] = None
 audit_logger: Optional[AuditLogger] = None
-rate_limiter: Optional[RateLimiter] = None
+rate_limiter: Optional[RateLimiter | SQLiteRateLimiter] = None
 http_client: Optional[httpx.AsyncClient] = None
+upstream_pool: Optional[UpstreamPool] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global allowlist, audit_logger, rate_limiter, http_client
+    global allowlist, audit_logger, rate_limiter, http_client, upstream_pool
 
     config_path = os.getenv("ALLOWLIST_PATH", "/config/mcp-allowlist.yaml")
     allowlist = ToolAllowlist(config_path)
-    audit_logger = AuditLogger()
-    rate_limiter = RateLimiter()
+    allowlist.start_watching()
+    audit_logger = AuditLogger(
+        os.getenv("AUDIT_LOG_PATH") or None,
+        store=AuditStore(AUDIT_DB_PATH) if AUDIT_DB_PATH else None,
+    )
+    rate_limiter = create_rate_limiter()
     http_client = httpx.AsyncClient(timeout=60.0)
+    upstream_pool = UpstreamPool.from_config(
+        os.getenv("MCP_UPSTREAMS_PATH", "/config/mcp-upstreams.yaml"), http_client
+    )
 
     logger.info("MCP Security Gateway initialized")
     logger.info(f"Policy: {allowlist.policy}")
@@ -95,10 +87,16 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    if upstream_pool:
+        await upstream_pool.close()
+    if allowlist:
+        allowlist.stop_watching()
     if http_client:
         await http_client.aclose()
     if audit_logger:
         audit_logger.close()
+    if rate_limiter is not None:
+        rate_limiter.close()
 
 
 app = FastAPI(
@@ -131,9 +129,56 @@ async def list_allowed_tools():
     return {"tools": allowlist.list_allowed_tools()}
 
 
+def _audit_store() -> AuditStore:
+    if not audit_logger:
+        raise HTTPException(status_code=503, detail="Not initialized")
+    if not audit_logger.store:
+        raise HTTPException(status_code=503, detail="Audit store not configured (set AUDIT_DB_PATH)")
+    return audit_logger.store
+
+
+@app.get("/audit")
+async def query_audit(
+    tool: Optional[str] = None,
+    method: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: int = 100,
+):
+    store = _audit_store()
+    events = await asyncio.to_thread(
+        store.query, tool=tool, method=method, status=status, since=since, until=until, limit=limit
+    )
+    return {"events": events, "count": len(events)}
+
+
+@app.get("/audit/summary")
+async def audit_summary(since: Optional[float] = None, until: Optional[float] = None):
+    store = _audit_store()
+    return {"tools": await asyncio.to_thread(store.counts, since, until)}
+
+
+@app.get("/audit/{audit_id}")
+async def get_audit_event(audit_id: str):
+    store = _audit_store()
+    events = await asyncio.to_thread(store.get, audit_id)
+    if not events:
+        raise HTTPException(status_code=404, detail=f"No audit events for '{audit_id}'")
+    return {"audit_id": audit_id, "events": events}
+
+
+@app.get("/upstreams")
+async def list_upstreams():
+    if not upstream_pool:
+        raise HTTPException(status_code=503, detail="Not initialized")
+    return {"upstreams": upstream_pool.stats()}
+
+
 @app.post("/invoke", response_model=ToolInvokeResponse)
 async def invoke_tool(request: ToolInvokeRequest):
-    if not allowlist or not audit_logger or not rate_limiter:
+    # rate_limiter is compared to None: an empty in-memory limiter has len() 0
+    if not allowlist or not audit_logger or rate_limiter is None or not upstream_pool:
         raise HTTPException(status_code=503, detail="Not initialized")
 
     audit_id = f"mcp-{uuid.uuid4().hex[:12]}"
@@ -146,7 +191,8 @@ async def invoke_tool(request: ToolInvokeRequest):
         span.set_attribute("method", request.method)
 
     try:
-        if not allowlist.is_allowed(request.tool, request.method):
+        decision = allowlist.decide(request.tool, request.method)
+        if not decision.allowed:
             audit_logger.log_denied(
                 audit_id=audit_id,
                 tool=request.tool,
@@ -166,11 +212,13 @@ async def invoke_tool(request: ToolInvokeRequest):
         if span:
             span.set_attribute("allowed", True)
 
-        permission = allowlist.get_permission(request.tool)
+        permission = decision.permission
         if permission:
-            limit, window = permission.parse_rate_limit()
             rate_key = f"{request.tool}:{request.method}"
-            if not rate_limiter.is_allowed(rate_key, limit, window):
+            allowed = await rate_limiter.is_allowed_async(
+                rate_key, decision.limit, decision.window, decision.burst
+            )
+            if not allowed:
                 audit_logger.log_denied(
                     audit_id=audit_id,
                     tool=request.tool,
@@ -243,13 +291,16 @@ async def invoke_tool(request: ToolInvokeRequest):
 
 async def _forward_to_mcp_server(request: ToolInvokeRequest) -> Any:
     """
-    Forward the request to the actual MCP server.
-
-    Note: In a full implementation, this would discover and connect to
-    the appropriate MCP server. For now, we return a placeholder.
+    Forward the request as an MCP tools/call over the tool's persistent
+    upstream session, bounded by the request's timeout_ms.
     """
     logger.info(f"Forwarding to MCP: {request.tool}.{request.method}")
-    return {"forwarded": True, "tool": request.tool, "method": request.method}
+    return await upstream_pool.call(
+        request.tool,
+        request.method,
+        request.arguments,
+        timeout=request.timeout_ms / 1000,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""
+Rate Limiter - Token buckets for MCP tool invocations.
+
+Each tool:method key holds one bucket (tokens, last refill). Capacity is the
+tool's burst (defaults to the rate_limit count) and tokens refill at
+count/period, so a check is O(1) time and memory per key regardless of
+traffic. Idle keys are evicted.
+
+Backends:
+    memory  per-process (default)
+    sqlite  shared file (RATE_LIMIT_DB_PATH) so limits hold across
+            multiple uvicorn workers
+
+The gateway awaits is_allowed_async(); the SQLite backend runs its check
+in a worker thread, so lock contention between workers (up to the 5s busy
+timeout) never blocks the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "/tmp/mcp-ratelimit.db")
+# Buckets untouched this long are dropped (a dropped bucket restarts full)
+RATE_LIMIT_IDLE_TTL = float(os.getenv("RATE_LIMIT_IDLE_TTL", "3600"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+
+def _refill(tokens: float, last: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + (now - last) * rate)
+
+
+class RateLimiter:
+    """
+    In-memory token-bucket limiter with idle-key eviction.
+
+    Buckets live in an OrderedDict kept in last-access order, so eviction
+    only ever inspects the oldest entries.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = RATE_LIMIT_IDLE_TTL,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def is_allowed(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        burst: Optional[int] = None,
+    ) -> bool:
+        capacity = float(burst or limit)
+        rate = limit / window_seconds
+        now = self._clock()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [capacity, now]
+                self._buckets[key] = bucket
+            else:
+                bucket[0] = _refill(bucket[0], bucket[1], now, capacity, rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            allowed = bucket[0] >= 1.0
+            if allowed:
+                bucket[0] -= 1.0
+
+            self._evict(now)
+        return allowed
+
+    async def is_allowed_async(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        burst: Optional[int] = None,
+    ) -> bool:
+        """is_allowed for the event loop (in-memory, so no thread hop)."""
+        return self.is_allowed(key, limit, window_seconds, burst)
+
+    def _evict(self, now: float) -> None:
+        """Drop idle buckets from the cold end, and the oldest beyond max_keys."""
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self.idle_ttl and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteRateLimiter:
+    """
+    Token-bucket limiter backed by a shared SQLite file.
+
+    Each check is one IMMEDIATE transaction on a WAL database, so concurrent
+    uvicorn workers see the same buckets. Idle rows are pruned periodically.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(
+        self,
+        path: str = RATE_LIMIT_DB_PATH,
+        idle_ttl: float = RATE_LIMIT_IDLE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_updated ON buckets(updated)")
+
+    def is_allowed(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        burst: Optional[int] = None,
+    ) -> bool:
+        capacity = float(burst or limit)
+        rate = limit / window_seconds
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = capacity if row is None else _refill(row[0], row[1], now, capacity, rate)
+
+                allowed = tokens >= 1.0
+                if allowed:
+                    tokens -= 1.0
+
+                conn.execute(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+
+                self._calls += 1
+                if self._calls % self.PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.idle_ttl,))
+
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed
+
+    async def is_allowed_async(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        burst: Optional[int] = None,
+    ) -> bool:
+        """is_allowed in a worker thread; BEGIN IMMEDIATE may wait on other workers."""
+        return await asyncio.to_thread(self.is_allowed, key, limit, window_seconds, burst)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_rate_limiter(backend: str = RATE_LIMIT_BACKEND):
+    """Build the limiter selected by RATE_LIMIT_BACKEND (memory|sqlite)."""
+    if backend == "sqlite":
+        logger.info(f"Rate limiter: shared SQLite at {RATE_LIMIT_DB_PATH}")
+        return SQLiteRateLimiter()
+    if backend != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using memory")
+    return RateLimiter()
@@ -0,0 +1,606 @@
+"""
+Upstream Sessions - Persistent JSON-RPC sessions to the MCP servers behind the gateway.
+
+One session per upstream tool is opened on first use and kept for the life
+of the gateway. Requests are pipelined: each call gets a JSON-RPC id and a
+future, is written without waiting for earlier calls, and is resolved when
+the matching reply arrives (in any order). A session that dies fails its
+pending calls and is reopened on the next call.
+
+Transports:
+    stdio  subprocess speaking newline-delimited JSON-RPC
+    http   MCP Streamable HTTP (POST per message, JSON or SSE reply)
+    sse    legacy HTTP+SSE (GET event stream, POST to announced endpoint)
+
+Config (MCP_UPSTREAMS_PATH, YAML):
+    upstreams:
+      mcp_context7:
+        transport: stdio
+        command: [npx, -y, "@upstash/context7-mcp"]
+      mcp_github:
+        transport: http
+        url: http://github-mcp:8080/mcp
+        headers: {Authorization: "Bearer ..."}
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+import yaml
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "omni-mcp-gateway", "version": "16.2.0"}
+# Handshake budget for opening a session (process start + initialize)
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("MCP_UPSTREAM_CONNECT_TIMEOUT", "30"))
+STDIO_LINE_LIMIT = 16 * 1024 * 1024
+
+mcp_upstream_sessions = Gauge(
+    "mcp_upstream_sessions",
+    "Open MCP upstream sessions",
+    ["transport"]
+)
+
+mcp_upstream_inflight = Gauge(
+    "mcp_upstream_inflight",
+    "In-flight JSON-RPC requests per MCP upstream",
+    ["tool"]
+)
+
+mcp_upstream_request_duration = Histogram(
+    "mcp_upstream_request_duration_seconds",
+    "MCP upstream JSON-RPC round-trip time",
+    ["tool"]
+)
+
+mcp_upstream_errors_total = Counter(
+    "mcp_upstream_errors_total",
+    "MCP upstream request failures",
+    ["tool", "reason"]
+)
+
+
+class UpstreamError(Exception):
+    """An upstream call failed (JSON-RPC error, tool error or transport failure)."""
+
+
+class UpstreamTimeout(UpstreamError):
+    """An upstream call exceeded its timeout."""
+
+
+class UpstreamClosed(UpstreamError):
+    """The upstream session ended while calls were pending."""
+
+
+class UpstreamNotConfigured(UpstreamError):
+    """No upstream is configured for the requested tool."""
+
+
+@dataclass
+class UpstreamConfig:
+    """How to reach one upstream MCP server."""
+    name: str
+    transport: str = "stdio"
+    command: List[str] = field(default_factory=list)
+    env: Dict[str, str] = field(default_factory=dict)
+    cwd: Optional[str] = None
+    url: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def load_upstreams(config_path: str) -> Dict[str, UpstreamConfig]:
+    path = Path(config_path)
+    if not path.exists():
+        logger.warning(f"Upstream config not found: {config_path}, no MCP servers reachable")
+        return {}
+
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+
+    upstreams = {}
+    for name, entry in (config.get("upstreams") or {}).items():
+        upstreams[name] = UpstreamConfig(
+            name=name,
+            transport=entry.get("transport", "stdio"),
+            command=list(entry.get("command", [])),
+            env={k: str(v) for k, v in (entry.get("env") or {}).items()},
+            cwd=entry.get("cwd"),
+            url=entry.get("url"),
+            headers=dict(entry.get("headers") or {}),
+        )
+
+    logger.info(f"Loaded {len(upstreams)} MCP upstreams")
+    return upstreams
+
+
+async def iter_sse(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[str, str]]:
+    """Parse a text/event-stream into (event, data) pairs."""
+    event = "message"
+    data: List[str] = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            name, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if name == "event":
+                event = value
+            elif name == "data":
+                data.append(value)
+    if data:
+        yield event, "\n".join(data)
+
+
+class UpstreamSession(ABC):
+    """
+    Base JSON-RPC session: id allocation, pending-future table and dispatch.
+
+    Subclasses implement _open, _send and _close.
+    """
+
+    transport = "base"
+
+    def __init__(self, config: UpstreamConfig):
+        self.config = config
+        self.server_info: Dict[str, Any] = {}
+        self.closed = False
+        self._counted = False
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        try:
+            await self._open()
+        except BaseException:
+            await self.close()
+            raise
+        self._counted = True
+        mcp_upstream_sessions.labels(transport=self.transport).inc()
+        try:
+            result = await self.request(
+                "initialize",
+                {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": CLIENT_INFO,
+                },
+                timeout=UPSTREAM_CONNECT_TIMEOUT,
+            )
+            self.server_info = result.get("serverInfo", {})
+            await self.notify("notifications/initialized")
+        except BaseException:
+            await self.close()
+            raise
+        logger.info(
+            f"MCP upstream '{self.config.name}' connected via {self.transport}: "
+            f"{self.server_info}"
+        )
+
+    async def request(
+        self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = 30.0
+    ) -> Any:
+        if self.closed:
+            raise UpstreamClosed(f"Session to '{self.config.name}' is closed")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+        async def round_trip() -> Dict[str, Any]:
+            await self._send(message)
+            reply: Dict[str, Any] = await future
+            return reply
+
+        try:
+            reply = await asyncio.wait_for(round_trip(), timeout)
+        except asyncio.TimeoutError:
+            if not self.closed:
+                try:
+                    await self.notify(
+                        "notifications/cancelled", {"requestId": request_id, "reason": "timeout"}
+                    )
+                except Exception:
+                    pass
+            raise UpstreamTimeout(f"'{self.config.name}' {method} timed out after {timeout:.1f}s")
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in reply:
+            error = reply["error"]
+            raise UpstreamError(f"{error.get('code')}: {error.get('message')}")
+        return reply.get("result")
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def close(self) -> None:
+        self._mark_closed(UpstreamClosed(f"Session to '{self.config.name}' closed"))
+        await self._close()
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        if "method" in message:
+            # Server-initiated request or notification; answer pings, ignore the rest
+            if message.get("method") == "ping" and "id" in message:
+                pong = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+                asyncio.ensure_future(self._send(pong))
+            return
+        request_id = message.get("id")
+        future = self._pending.get(request_id) if isinstance(request_id, int) else None
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def _lost(self, reason: str) -> None:
+        """Reader side ended: mark closed so the pool reopens on next use."""
+        if not self.closed:
+            logger.warning(f"MCP upstream '{self.config.name}' lost: {reason}")
+        self._mark_closed(UpstreamClosed(f"Session to '{self.config.name}' lost: {reason}"))
+
+    def _mark_closed(self, exc: Exception) -> None:
+        if self._counted:
+            self._counted = False
+            mcp_upstream_sessions.labels(transport=self.transport).dec()
+        self.closed = True
+        self._fail_pending(exc)
+
+    @abstractmethod
+    async def _open(self) -> None:
+        """Connect the transport (the initialize handshake follows in start)."""
+
+    @abstractmethod
+    async def _send(self, message: Dict[str, Any]) -> None:
+        """Write one JSON-RPC message; replies reach _dispatch."""
+
+    async def _close(self) -> None:
+        pass
+
+    def _require_url(self) -> str:
+        if not self.config.url:
+            raise UpstreamError(
+                f"No url configured for {self.transport} upstream '{self.config.name}'"
+            )
+        return self.config.url
+
+
+class StdioSession(UpstreamSession):
+    """MCP server as a subprocess; one writer lock, one reader task."""
+
+    transport = "stdio"
+
+    def __init__(self, config: UpstreamConfig):
+        super().__init__(config)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    async def _open(self) -> None:
+        if not self.config.command:
+            raise UpstreamError(f"No command configured for stdio upstream '{self.config.name}'")
+        self._process = await asyncio.create_subprocess_exec(
+            *self.config.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, **self.config.env},
+            cwd=self.config.cwd,
+            limit=STDIO_LINE_LIMIT,
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        stdout = self._process.stdout
+        try:
+            while True:
+                line = await stdout.readline()
+                if not line:
+                    break
+                try:
+                    self._dispatch(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.debug(f"'{self.config.name}' non-JSON output: {line[:200]!r}")
+        except Exception as e:
+            self._lost(str(e))
+            return
+        self._lost("process exited")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        data = json.dumps(message).encode() + b"\n"
+        async with self._write_lock:
+            if self._process is None or self._process.stdin is None:
+                raise UpstreamClosed(f"Session to '{self.config.name}' is closed")
+            stdin = self._process.stdin
+            try:
+                stdin.write(data)
+                await stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                self._lost(str(e))
+                raise UpstreamClosed(f"Session to '{self.config.name}' lost: {e}") from e
+
+    async def _close(self) -> None:
+        process, self._process = self._process, None
+        if process and process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), 2.0)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        if self._reader:
+            self._reader.cancel()
+
+
+class HttpSession(UpstreamSession):
+    """
+    MCP Streamable HTTP: every message is its own POST on the shared
+    keep-alive client, so concurrent calls multiplex over the pool's
+    connections. Replies come back as JSON or as a short SSE stream.
+    """
+
+    transport = "http"
+
+    def __init__(self, config: UpstreamConfig, client: httpx.AsyncClient):
+        super().__init__(config)
+        self._client = client
+        self._session_id: Optional[str] = None
+
+    async def _open(self) -> None:
+        self._require_url()
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/json, text/event-stream", **self.config.headers}
+        if self._session_id:
+            headers["Mcp-Session-Id"] = self._session_id
+            headers["MCP-Protocol-Version"] = PROTOCOL_VERSION
+        return headers
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            async with self._client.stream(
+                "POST", self._require_url(), json=message, headers=self._headers()
+            ) as response:
+                if response.status_code == 404 and self._session_id:
+                    self._lost("session expired")
+                    raise UpstreamClosed(f"Session to '{self.config.name}' expired")
+                response.raise_for_status()
+                self._session_id = response.headers.get("mcp-session-id", self._session_id)
+
+                content_type = response.headers.get("content-type", "")
+                if content_type.startswith("text/event-stream"):
+                    async for _, data in iter_sse(response.aiter_lines()):
+                        self._dispatch_payload(json.loads(data))
+                elif content_type.startswith("application/json"):
+                    self._dispatch_payload(json.loads(await response.aread()))
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"'{self.config.name}' HTTP error: {e}") from e
+
+    def _dispatch_payload(self, payload: Any) -> None:
+        for message in payload if isinstance(payload, list) else [payload]:
+            self._dispatch(message)
+
+    async def _close(self) -> None:
+        session_id, self._session_id = self._session_id, None
+        if session_id:
+            try:
+                await self._client.delete(
+                    self._require_url(),
+                    headers={**self.config.headers, "Mcp-Session-Id": session_id},
+                )
+            except httpx.HTTPError:
+                pass
+
+
+class SseSession(UpstreamSession):
+    """Legacy HTTP+SSE: one long-lived GET carries every reply."""
+
+    transport = "sse"
+
+    def __init__(self, config: UpstreamConfig, client: httpx.AsyncClient):
+        super().__init__(config)
+        self._client = client
+        self._endpoint: Optional[str] = None
+        self._stream: Optional[asyncio.Task] = None
+
+    async def _open(self) -> None:
+        self._require_url()
+        endpoint = asyncio.get_running_loop().create_future()
+        self._stream = asyncio.create_task(self._read_stream(endpoint))
+        self._endpoint = await asyncio.wait_for(endpoint, UPSTREAM_CONNECT_TIMEOUT)
+
+    async def _read_stream(self, endpoint: asyncio.Future) -> None:
+        url = self._require_url()
+        headers = {"Accept": "text/event-stream", **self.config.headers}
+        try:
+            async with self._client.stream(
+                "GET", url, headers=headers, timeout=httpx.Timeout(10.0, read=None)
+            ) as response:
+                response.raise_for_status()
+                async for event, data in iter_sse(response.aiter_lines()):
+                    if event == "endpoint":
+                        if not endpoint.done():
+                            endpoint.set_result(urljoin(url, data))
+                    elif event == "message":
+                        self._dispatch(json.loads(data))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not endpoint.done():
+                endpoint.set_exception(
+                    UpstreamError(f"'{self.config.name}' SSE connect failed: {e}")
+                )
+            self._lost(str(e))
+            return
+        self._lost("event stream ended")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if self._endpoint is None:
+            raise UpstreamClosed(f"Session to '{self.config.name}' is not open")
+        try:
+            response = await self._client.post(
+                self._endpoint, json=message, headers=self.config.headers
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"'{self.config.name}' HTTP error: {e}") from e
+
+    async def _close(self) -> None:
+        if self._stream:
+            self._stream.cancel()
+
+
+class UpstreamPool:
+    """Lazily opened, self-healing session per upstream tool."""
+
+    def __init__(
+        self,
+        upstreams: Dict[str, UpstreamConfig],
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.upstreams = upstreams
+        self._http_client = http_client
+        self._sessions: Dict[str, UpstreamSession] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._opening: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_config(
+        cls, config_path: str, http_client: Optional[httpx.AsyncClient] = None
+    ) -> "UpstreamPool":
+        return cls(load_upstreams(config_path), http_client)
+
+    def _create(self, config: UpstreamConfig) -> UpstreamSession:
+        if config.transport == "stdio":
+            return StdioSession(config)
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=60.0)
+        if config.transport == "http":
+            return HttpSession(config, self._http_client)
+        if config.transport == "sse":
+            return SseSession(config, self._http_client)
+        raise UpstreamError(f"Unknown transport '{config.transport}' for '{config.name}'")
+
+    async def session(self, tool: str) -> UpstreamSession:
+        session = self._sessions.get(tool)
+        if session is not None and not session.closed:
+            return session
+
+        config = self.upstreams.get(tool)
+        if config is None:
+            raise UpstreamNotConfigured(f"No MCP upstream configured for '{tool}'")
+
+        lock = self._locks.setdefault(tool, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(tool)
+            if session is None or session.closed:
+                if session is not None:
+                    await session.close()
+                session = self._create(config)
+                await session.start()
+                self._sessions[tool] = session
+        return session
+
+    async def _session_within(self, tool: str, timeout: float) -> UpstreamSession:
+        """
+        session(tool), bounded by the caller's timeout.
+
+        A cold start (process spawn + initialize) that outlasts the timeout
+        keeps going in the background, bounded by UPSTREAM_CONNECT_TIMEOUT,
+        so a slow upstream still warms up for later calls.
+        """
+        session = self._sessions.get(tool)
+        if session is not None and not session.closed:
+            return session
+
+        opening = self._opening.get(tool)
+        if opening is None or opening.done():
+            opening = self._opening[tool] = asyncio.ensure_future(self.session(tool))
+            opening.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(opening), timeout)
+        except asyncio.TimeoutError:
+            raise UpstreamTimeout(f"'{tool}' session not ready within {timeout:.1f}s") from None
+
+    async def call(self, tool: str, method: str, arguments: Dict[str, Any], timeout: float) -> Any:
+        """
+        Invoke tools/call on the tool's upstream; raises UpstreamError on any failure.
+
+        timeout bounds the whole call, including opening the session.
+        """
+        start = time.perf_counter()
+        inflight = mcp_upstream_inflight.labels(tool=tool)
+        inflight.inc()
+        try:
+            session = await self._session_within(tool, timeout)
+            remaining = max(timeout - (time.perf_counter() - start), 0.0)
+            result = await session.request(
+                "tools/call", {"name": method, "arguments": arguments}, timeout=remaining
+            )
+        except UpstreamTimeout:
+            mcp_upstream_errors_total.labels(tool=tool, reason="timeout").inc()
+            raise
+        except UpstreamClosed:
+            mcp_upstream_errors_total.labels(tool=tool, reason="closed").inc()
+            raise
+        except UpstreamError:
+            mcp_upstream_errors_total.labels(tool=tool, reason="error").inc()
+            raise
+        except (OSError, asyncio.TimeoutError) as e:
+            mcp_upstream_errors_total.labels(tool=tool, reason="connect").inc()
+            raise UpstreamError(f"Cannot reach '{tool}': {e}") from e
+        finally:
+            inflight.dec()
+            mcp_upstream_request_duration.labels(tool=tool).observe(time.perf_counter() - start)
+
+        if isinstance(result, dict) and result.get("isError"):
+            mcp_upstream_errors_total.labels(tool=tool, reason="tool_error").inc()
+            text = " ".join(
+                c.get("text", "") for c in result.get("content", []) if c.get("type") == "text"
+            )
+            raise UpstreamError(f"'{tool}.{method}' failed: {text or 'tool error'}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "transport": config.transport,
+                "connected": name in self._sessions and not self._sessions[name].closed,
+                "inflight": self._sessions[name].inflight if name in self._sessions else 0,
+                "server_info": self._sessions[name].server_info if name in self._sessions else {},
+            }
+            for name, config in self.upstreams.items()
+        }
+
+    async def close(self) -> None:
+        opening, self._opening = list(self._opening.values()), {}
+        for task in opening:
+            task.cancel()
+        sessions, self._sessions = list(self._sessions.values()), {}
+        await asyncio.gather(*opening, *(s.close() for s in sessions), return_exceptions=True)
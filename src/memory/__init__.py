@@ -4,6 +4,16 @@ Protocol OMNI Memory Module (Phase 4.2)
 Persistent memory layer using Mem0 for context retention across sessions.
 """
 
-from .mem0_client import Mem0Client, Memory, MemorySearchResult
+from .mem0_client import Mem0Client, Memory, MemoryQuery, MemorySearchResult
+from .retrieval_cache import RetrievalCache
+from .write_behind import MemoryWrite, WriteBehindQueue
 
-__all__ = ["Mem0Client", "Memory", "MemorySearchResult"]
+__all__ = [
+    "Mem0Client",
+    "Memory",
+    "MemoryQuery",
+    "MemorySearchResult",
+    "RetrievalCache",
+    "MemoryWrite",
+    "WriteBehindQueue",
+]
@@ -0,0 +1,204 @@
+"""
+Memory Retrieval Cache (v16.4)
+
+Short-lived cache in front of Mem0Client.search_memory. Follow-up prompts
+from the same user a few seconds apart ask Mem0 nearly the same question;
+within the TTL the previous result is served instead of another search.
+
+Two tiers, both LRU:
+    user   one bucket per user_id, so store_memory for a user drops that
+           user's bucket in O(1) (agent_id-scoped searches share it)
+    query  entries inside a bucket keyed by (normalized query, limit,
+           agent_id), bounded per user
+
+The total entry count is bounded across users by evicting from the least
+recently used user first. Failed searches are never cached.
+
+Each invalidate() also advances a global generation counter and records
+it for the user. A search captures generation() before asking Mem0 and
+passes it to put(), so a result that was in flight across a write is
+dropped instead of outliving it by a TTL. Only the max_entries most recent
+invalidations are remembered; puts for a forgotten user are dropped if
+they started before the oldest forgotten invalidation.
+
+Usage:
+    cache = RetrievalCache(ttl=30)
+    client = Mem0Client(retrieval_cache=cache)
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger("omni.memory.retrieval_cache")
+
+RETRIEVAL_CACHE_ENABLED = os.getenv("MEMORY_RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+RETRIEVAL_CACHE_TTL = float(os.getenv("MEMORY_RETRIEVAL_CACHE_TTL", "30"))
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_RETRIEVAL_CACHE_MAX_ENTRIES", "2048"))
+RETRIEVAL_CACHE_MAX_PER_USER = int(os.getenv("MEMORY_RETRIEVAL_CACHE_MAX_PER_USER", "32"))
+
+retrieval_cache_requests_total = Counter(
+    "agent_memory_retrieval_cache_requests_total",
+    "Memory retrieval cache lookups",
+    ["result"]  # hit, miss, expired
+)
+
+retrieval_cache_invalidations_total = Counter(
+    "agent_memory_retrieval_cache_invalidations_total",
+    "Per-user retrieval cache invalidations after memory writes"
+)
+
+retrieval_cache_hit_ratio = Gauge(
+    "agent_memory_retrieval_cache_hit_ratio",
+    "Memory retrieval cache hit ratio since start"
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a query."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", query.lower())).strip()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class RetrievalCache:
+    """Per-user TTL cache for memory search results (thread-safe)."""
+
+    def __init__(
+        self,
+        ttl: float = RETRIEVAL_CACHE_TTL,
+        max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+        max_per_user: int = RETRIEVAL_CACHE_MAX_PER_USER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_per_user = max_per_user
+        self._clock = clock
+        self._users: "OrderedDict[str, OrderedDict[Hashable, _Entry]]" = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._forgotten = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        query: str, limit: int, agent_id: Optional[str] = None
+    ) -> Tuple[str, int, Optional[str]]:
+        return normalize_query(query), limit, agent_id
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, user_id: str, key: Hashable) -> Optional[Any]:
+        now = self._clock()
+        with self._lock:
+            bucket = self._users.get(user_id)
+            entry = bucket.get(key) if bucket is not None else None
+            if entry is None:
+                result = "miss"
+            elif entry.expires_at <= now:
+                del bucket[key]
+                self._size -= 1
+                entry = None
+                result = "expired"
+            else:
+                bucket.move_to_end(key)
+                self._users.move_to_end(user_id)
+                result = "hit"
+
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            ratio = self._hits / (self._hits + self._misses)
+
+        retrieval_cache_requests_total.labels(result=result).inc()
+        retrieval_cache_hit_ratio.set(ratio)
+        return entry.value if entry is not None else None
+
+    def generation(self, user_id: str) -> int:
+        """Current generation; capture before searching user_id, pass to put()."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self, user_id: str, key: Hashable, value: Any, generation: Optional[int] = None
+    ) -> None:
+        """Cache value, unless user_id was invalidated since generation was captured."""
+        with self._lock:
+            if generation is not None and generation < self._invalidated.get(
+                user_id, self._forgotten
+            ):
+                return
+            bucket = self._users.get(user_id)
+            if bucket is None:
+                bucket = self._users[user_id] = OrderedDict()
+            else:
+                self._users.move_to_end(user_id)
+
+            if key in bucket:
+                self._size -= 1
+            bucket[key] = _Entry(value=value, expires_at=self._clock() + self.ttl)
+            bucket.move_to_end(key)
+            self._size += 1
+
+            while len(bucket) > self.max_per_user:
+                bucket.popitem(last=False)
+                self._size -= 1
+            self._evict_global()
+
+    def _evict_global(self) -> None:
+        while self._size > self.max_entries and self._users:
+            user_id, bucket = next(iter(self._users.items()))
+            bucket.popitem(last=False)
+            self._size -= 1
+            if not bucket:
+                del self._users[user_id]
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget everything cached for user_id (called after a memory write)."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated[user_id] = self._generation
+            self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > self.max_entries:
+                _, self._forgotten = self._invalidated.popitem(last=False)
+            bucket = self._users.pop(user_id, None)
+            if bucket:
+                self._size -= len(bucket)
+        if bucket:
+            retrieval_cache_invalidations_total.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": self._size,
+                "users": len(self._users),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / total if total else 0.0,
+            }
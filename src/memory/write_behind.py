@@ -0,0 +1,341 @@
+"""
+Write-Behind Memory Queue (v16.4)
+
+Moves Mem0 writes off the request path. Mem0 runs LLM fact extraction on
+every add, so an inline POST adds seconds to each COMPLEX response; the
+graph now enqueues the write and returns immediately.
+
+A single worker task drains the queue in batches (up to batch_size writes
+sent concurrently), retries failed writes with exponential backoff, and
+on shutdown drains whatever is left within a deadline. Writes that cannot
+be delivered (queue full, retries exhausted, drain timed out) are appended
+to an optional JSONL spool and replayed once Mem0 accepts writes again.
+
+Usage:
+    queue = WriteBehindQueue(Mem0Client())
+    queue.enqueue(MemoryWrite(content="...", user_id="user-123"))
+    ...
+    await queue.drain(timeout=10)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger("omni.memory.write_behind")
+
+# Queue bound; enqueue never blocks, overflow goes to the spool
+WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "1000"))
+# Writes sent to Mem0 concurrently per flush
+WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "8"))
+# How long the worker waits to fill a batch after the first write arrives
+WRITE_FLUSH_INTERVAL = float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.5"))
+# Attempts per write before it is spooled (or dropped)
+WRITE_MAX_ATTEMPTS = int(os.getenv("MEMORY_WRITE_MAX_ATTEMPTS", "4"))
+WRITE_BACKOFF_BASE = float(os.getenv("MEMORY_WRITE_BACKOFF_BASE", "0.5"))
+WRITE_BACKOFF_MAX = float(os.getenv("MEMORY_WRITE_BACKOFF_MAX", "30"))
+# Empty disables the spool; undeliverable writes are then dropped
+WRITE_SPOOL_PATH = os.getenv("MEMORY_WRITE_SPOOL_PATH", "")
+
+memory_write_queue_depth = Gauge(
+    "agent_memory_write_queue_depth",
+    "Memory writes waiting in the write-behind queue"
+)
+
+memory_write_flush_seconds = Histogram(
+    "agent_memory_write_flush_seconds",
+    "Time to deliver one batch of memory writes to Mem0",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+memory_writes_total = Counter(
+    "agent_memory_writes_total",
+    "Memory writes by outcome",
+    ["result"]  # stored, retried, spooled, dropped, replayed
+)
+
+
+@dataclass
+class MemoryWrite:
+    """A pending Mem0 add."""
+    content: str
+    user_id: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    agent_id: Optional[str] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class WriteBehindQueue:
+    """
+    Bounded, batching write-behind queue in front of Mem0Client.store_memory.
+
+    The worker task is started lazily on the first enqueue from a running
+    event loop, so importing the module or building the graph has no side
+    effects.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_size: int = WRITE_QUEUE_SIZE,
+        batch_size: int = WRITE_BATCH_SIZE,
+        flush_interval: float = WRITE_FLUSH_INTERVAL,
+        max_attempts: int = WRITE_MAX_ATTEMPTS,
+        backoff_base: float = WRITE_BACKOFF_BASE,
+        backoff_max: float = WRITE_BACKOFF_MAX,
+        spool_path: Optional[str] = WRITE_SPOOL_PATH or None,
+    ):
+        self.client = client
+        self.max_size = max_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.spool_path = spool_path
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # Writes taken off the queue but not yet resolved (flushing or backing off)
+        self._inflight: List[MemoryWrite] = []
+        self._closing = False
+        self._replay_pending = bool(spool_path and os.path.exists(spool_path))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def enqueue(self, write: MemoryWrite) -> bool:
+        """
+        Queue a write without blocking.
+
+        Returns:
+            True if queued, False if it was spooled or dropped instead
+        """
+        if self._closing:
+            self._spool([write], reason="closing")
+            return False
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(write)
+        except asyncio.QueueFull:
+            logger.warning("Memory write queue full, spooling write")
+            self._spool([write], reason="queue_full")
+            return False
+
+        memory_write_queue_depth.set(self._queue.qsize())
+        return True
+
+    def _ensure_worker(self) -> None:
+        """Start (or restart on a new event loop) the worker task."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            pending = self._take_all()
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._loop = loop
+            self._task = None
+            for write in pending:
+                self._queue.put_nowait(write)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def _take_all(self) -> List[MemoryWrite]:
+        """Remove and return every queued write."""
+        items: List[MemoryWrite] = []
+        if self._queue is None:
+            return items
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return items
+
+    async def _next_batch(self) -> List[MemoryWrite]:
+        """Wait for one write, then collect up to batch_size within flush_interval."""
+        batch = self._inflight = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        memory_write_queue_depth.set(self._queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        """Worker loop: flush batches, back off while Mem0 rejects writes."""
+        failures = 0
+        while True:
+            batch = await self._next_batch()
+            failed = await self._flush(batch)
+            self._inflight = []
+
+            if failed:
+                failures += 1
+                retry = [w for w in failed if w.attempts < self.max_attempts]
+                exhausted = [w for w in failed if w.attempts >= self.max_attempts]
+                if exhausted:
+                    self._spool(exhausted, reason="retries_exhausted")
+                if retry:
+                    self._inflight = retry
+                    memory_writes_total.labels(result="retried").inc(len(retry))
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+                    logger.warning(
+                        f"{len(retry)} memory writes failed, retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    self._inflight = []
+                    self._requeue(retry)
+            else:
+                failures = 0
+                if self._replay_pending:
+                    self._replay_spool()
+
+    async def _flush(self, batch: List[MemoryWrite]) -> List[MemoryWrite]:
+        """Send a batch concurrently. Returns the writes that failed."""
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._store(write) for write in batch), return_exceptions=True
+        )
+        memory_write_flush_seconds.observe(time.perf_counter() - start)
+
+        failed = []
+        for write, result in zip(batch, results):
+            write.attempts += 1
+            if isinstance(result, BaseException):
+                failed.append(write)
+            else:
+                memory_writes_total.labels(result="stored").inc()
+        return failed
+
+    async def _store(self, write: MemoryWrite) -> Optional[str]:
+        return await self.client.store_memory(
+            content=write.content,
+            user_id=write.user_id,
+            metadata=write.metadata or None,
+            agent_id=write.agent_id,
+            raise_on_error=True,
+        )
+
+    def _requeue(self, writes: List[MemoryWrite]) -> None:
+        """Put retried writes back; spool what no longer fits."""
+        overflow = []
+        for write in writes:
+            try:
+                self._queue.put_nowait(write)
+            except asyncio.QueueFull:
+                overflow.append(write)
+        if overflow:
+            self._spool(overflow, reason="queue_full")
+        memory_write_queue_depth.set(self._queue.qsize())
+
+    def _spool(self, writes: List[MemoryWrite], reason: str) -> None:
+        """Append undeliverable writes to the JSONL spool, or drop them."""
+        if not writes:
+            return
+        if not self.spool_path:
+            memory_writes_total.labels(result="dropped").inc(len(writes))
+            logger.error(f"Dropped {len(writes)} memory writes ({reason}, no spool configured)")
+            return
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for write in writes:
+                    write.attempts = 0
+                    f.write(json.dumps(asdict(write)) + "\n")
+            self._replay_pending = True
+            memory_writes_total.labels(result="spooled").inc(len(writes))
+            logger.warning(f"Spooled {len(writes)} memory writes ({reason})")
+        except OSError as e:
+            memory_writes_total.labels(result="dropped").inc(len(writes))
+            logger.error(f"Failed to spool {len(writes)} memory writes: {e}")
+
+    def _replay_spool(self) -> None:
+        """Move spooled writes back into the queue while there is room."""
+        self._replay_pending = False
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        try:
+            with open(self.spool_path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            logger.error(f"Failed to read memory spool: {e}")
+            return
+
+        if self.max_size <= 0:
+            room = len(lines)  # unbounded queue
+        else:
+            room = max(self.max_size - self._queue.qsize(), 0)
+        replay, keep = lines[:room], lines[room:]
+        for line in replay:
+            try:
+                self._queue.put_nowait(MemoryWrite(**json.loads(line)))
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.error(f"Skipping corrupt spool entry: {e}")
+
+        # Rewrite the spool with what did not fit (atomic replace)
+        try:
+            if keep:
+                tmp = f"{self.spool_path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(keep)
+                os.replace(tmp, self.spool_path)
+                self._replay_pending = True
+            else:
+                os.remove(self.spool_path)
+        except OSError as e:
+            logger.error(f"Failed to rewrite memory spool: {e}")
+
+        memory_writes_total.labels(result="replayed").inc(len(replay))
+        memory_write_queue_depth.set(self._queue.qsize())
+        logger.info(f"Replayed {len(replay)} spooled memory writes")
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """
+        Flush queued writes before shutdown.
+
+        Stops accepting new writes, delivers what it can within timeout and
+        spools the remainder. Delivery is at-least-once: a batch interrupted
+        mid-flush is sent again.
+        """
+        self._closing = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+        pending = self._inflight + self._take_all()
+        self._inflight = []
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+            try:
+                failed = await asyncio.wait_for(
+                    self._flush(batch), max(0.0, deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                failed = batch
+            if failed:
+                pending = failed + pending
+                break
+
+        self._spool(pending, reason="shutdown")
+        memory_write_queue_depth.set(0)
+        if pending:
+            logger.warning(f"Memory write drain left {len(pending)} writes undelivered")
+        else:
+            logger.info("Memory write queue drained")
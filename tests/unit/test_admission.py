@@ -0,0 +1,194 @@
+"""Unit tests for admission control and priority queueing."""
+
+import asyncio
+
+import pytest
+
+from agent import admission
+from agent.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    admission_rejected_total,
+    load_concurrency_limits,
+)
+from agent.nodes import inference
+from agent.nodes.state import ComplexityLevel
+
+
+def _rejected(key: str, priority: str, reason: str) -> float:
+    return admission_rejected_total.labels(endpoint=key, priority=priority, reason=reason)._value.get()
+
+
+async def _settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    """Test slots, queue order and rejection."""
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit_then_queues(self):
+        controller = AdmissionController("test-limit", max_concurrency=2)
+        assert await controller.acquire() == 0.0
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await _settle()
+        assert not waiter.done()
+        assert controller.queued == 1
+
+        controller.release()
+        assert await asyncio.wait_for(waiter, 1) >= 0.0
+        assert controller.active == 2
+        assert controller.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_admitted_before_background(self):
+        controller = AdmissionController("test-order", max_concurrency=1)
+        await controller.acquire()
+        order = []
+
+        async def wait(name, priority):
+            await controller.acquire(priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.ensure_future(wait("background", Priority.BACKGROUND)),
+            asyncio.ensure_future(wait("interactive-1", Priority.INTERACTIVE)),
+            asyncio.ensure_future(wait("interactive-2", Priority.INTERACTIVE)),
+        ]
+        await _settle()
+        for _ in range(3):
+            controller.release()
+            await _settle()
+        await asyncio.gather(*tasks)
+        assert order == ["interactive-1", "interactive-2", "background"]
+
+    @pytest.mark.asyncio
+    async def test_queue_deadline(self):
+        controller = AdmissionController("test-timeout", max_concurrency=1)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(timeout=0.01)
+        assert exc.value.reason == "timeout"
+        assert controller.queued == 0
+        assert _rejected("test-timeout", "interactive", "timeout") == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        controller = AdmissionController("test-full", max_concurrency=1, max_queue=1)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await _settle()
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire()
+        assert exc.value.reason == "overflow"
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_interactive_displaces_background_waiter(self):
+        controller = AdmissionController("test-displace", max_concurrency=1, max_queue=1)
+        await controller.acquire()
+        background = asyncio.ensure_future(controller.acquire(Priority.BACKGROUND))
+        interactive = asyncio.ensure_future(controller.acquire(Priority.INTERACTIVE))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected):
+            await background
+        controller.release()
+        await asyncio.wait_for(interactive, 1)
+        assert _rejected("test-displace", "background", "overflow") == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = AdmissionController("test-cancel", max_concurrency=1)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        assert controller.queued == 0
+        controller.release()
+        assert controller.active == 0
+
+    @pytest.mark.asyncio
+    async def test_slot_releases_and_unlimited(self):
+        controller = AdmissionController("test-slot", max_concurrency=1)
+        async with controller.slot():
+            assert controller.active == 1
+        assert controller.active == 0
+
+        unlimited = AdmissionController("test-unlimited", max_concurrency=0)
+        for _ in range(100):
+            await unlimited.acquire()
+        assert unlimited.queued == 0
+
+    def test_priority_parse(self):
+        assert Priority.parse("background") is Priority.BACKGROUND
+        assert Priority.parse(" Batch ") is Priority.BACKGROUND
+        assert Priority.parse(None) is Priority.INTERACTIVE
+        assert Priority.parse("urgent") is Priority.INTERACTIVE
+
+    def test_limits_from_agent_stack_and_env(self, tmp_path, monkeypatch):
+        pytest.importorskip("yaml")
+        path = tmp_path / "agent_stack.yaml"
+        path.write_text("cognitive_trinity:\n  oracle:\n    max_concurrency: 2\n")
+        monkeypatch.setenv("EXECUTOR_MAX_CONCURRENCY", "0")
+        assert load_concurrency_limits(str(path)) == {"deepseek": 2, "qwen": 0}
+
+
+@pytest.fixture
+def controllers(monkeypatch):
+    """Saturated Oracle (no queue) and an open Executor."""
+    oracle = AdmissionController("deepseek", max_concurrency=1, max_queue=0)
+    oracle.active = 1
+    executor = AdmissionController("qwen", max_concurrency=4)
+    monkeypatch.setattr(admission, "_controllers", {"deepseek": oracle, "qwen": executor})
+    return oracle, executor
+
+
+@pytest.mark.unit
+class TestOverflow:
+    """Test Oracle overflow to the Executor in call_model."""
+
+    @pytest.mark.asyncio
+    async def test_saturated_oracle_overflows_to_executor(self, controllers, monkeypatch):
+        calls = []
+
+        async def fake_impl(endpoint_key, messages, state, use_streaming, span):
+            calls.append(endpoint_key)
+            return {"response": "ok", "model_name": endpoint_key}
+
+        monkeypatch.setattr(inference, "_call_model_impl", fake_impl)
+        result = await inference.call_model({
+            "prompt": "design a scheduler",
+            "complexity": ComplexityLevel.COMPLEX,
+            "routing_reason": "Complex indicator: 'design'",
+        })
+
+        assert calls == ["qwen"]
+        assert result["overflowed"] is True
+        assert "overflow" in result["routing_reason"]
+        assert "queue_ms" in result["stage_timings"]
+        assert controllers[1].active == 0
+
+    @pytest.mark.asyncio
+    async def test_rejection_propagates_without_overflow(self, controllers, monkeypatch):
+        monkeypatch.setattr(inference, "ADMISSION_OVERFLOW_ENDPOINT", "")
+        with pytest.raises(AdmissionRejected):
+            await inference.call_model({"prompt": "prove it", "complexity": ComplexityLevel.COMPLEX})
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_slot_until_done(self, controllers, monkeypatch):
+        async def fake_stream(endpoint_key, state):
+            assert controllers[1].active == 1
+            yield f"data: {endpoint_key}\n"
+
+        monkeypatch.setattr(inference, "_stream_endpoint", fake_stream)
+        state = {"prompt": "design it", "complexity": ComplexityLevel.COMPLEX}
+        lines = [line async for line in inference.stream_model_response(state)]
+        assert lines == ["data: qwen\n"]
+        assert state["overflowed"] is True
+        assert controllers[1].active == 0
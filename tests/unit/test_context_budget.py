@@ -0,0 +1,198 @@
+"""Unit tests for token-budgeted context assembly."""
+
+import pytest
+
+from agent.context_budget import (
+    ContextBudget,
+    EndpointContext,
+    TokenCounter,
+    heuristic_token_count,
+    load_endpoint_contexts,
+)
+
+
+class _WordTokenizer:
+    """Stand-in for tokenizers.Tokenizer: one token per whitespace word."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, add_special_tokens=True):
+        self.calls += 1
+
+        class _Encoding:
+            ids = text.split()
+
+        return _Encoding()
+
+
+def _budget(context_size=1000):
+    return ContextBudget({"deepseek": EndpointContext(context_size=context_size)})
+
+
+@pytest.mark.unit
+class TestEndpointContexts:
+    """Test context sizes from agent_stack.yaml."""
+
+    def test_repo_config(self):
+        contexts = load_endpoint_contexts()
+        assert contexts["deepseek"].context_size == 8192
+        assert contexts["qwen"].context_size == 16384
+
+    def test_missing_file_uses_defaults(self, tmp_path):
+        contexts = load_endpoint_contexts(str(tmp_path / "missing.yaml"))
+        assert contexts["deepseek"].context_size == 8192
+
+    def test_env_tokenizer_override(self, tmp_path, monkeypatch):
+        stack = tmp_path / "stack.yaml"
+        stack.write_text("cognitive_trinity:\n  executor:\n    context_size: 4096\n    tokenizer: /a.json\n")
+        monkeypatch.setenv("EXECUTOR_TOKENIZER_PATH", "/b.json")
+        contexts = load_endpoint_contexts(str(stack))
+        assert contexts["qwen"].context_size == 4096
+        assert contexts["qwen"].tokenizer_path == "/b.json"
+
+
+@pytest.mark.unit
+class TestTokenCounter:
+    """Test counting, caching and line fitting."""
+
+    def test_counts_are_cached_per_string(self):
+        tokenizer = _WordTokenizer()
+        counter = TokenCounter(tokenizer)
+        assert counter.count("one two three") == 3
+        assert counter.count("one two three") == 3
+        assert tokenizer.calls == 1
+        assert counter.exact
+
+    def test_cache_is_bounded(self):
+        counter = TokenCounter(_WordTokenizer(), cache_size=2)
+        for text in ("a", "b", "c"):
+            counter.count(text)
+        assert list(counter._cache) == ["b", "c"]
+
+    def test_missing_tokenizer_file_falls_back(self, tmp_path):
+        counter = TokenCounter.from_file(str(tmp_path / "tokenizer.json"))
+        assert not counter.exact
+        assert counter.count("hello, world") == heuristic_token_count("hello, world") == 5
+
+    def test_fit_lines_keeps_closing_tag(self):
+        counter = TokenCounter(_WordTokenizer())
+        text = "\n".join(["<m>"] + [f"- fact {i}" for i in range(20)] + ["</m>"])
+        fitted = counter.fit_lines(text, 20)
+        lines = fitted.split("\n")
+        assert lines[0] == "<m>"
+        assert lines[-2:] == ["... (truncated)", "</m>"]
+        assert sum(counter.count(line) + 1 for line in lines) <= 20 + 1
+
+    def test_fit_lines_untouched_when_it_fits(self):
+        counter = TokenCounter(_WordTokenizer())
+        assert counter.fit_lines("a b\nc", 10) == "a b\nc"
+        assert counter.fit_lines("a b\nc", 0) == ""
+
+
+@pytest.mark.unit
+class TestPack:
+    """Test packing memory, code and history into the budget."""
+
+    def test_reserves_completion_tokens(self):
+        budget = _budget(1000)
+        assert budget.prompt_budget("deepseek", 100) == 900
+        assert budget.prompt_budget("deepseek", 4096) == 500
+
+    def test_everything_fits(self):
+        budget = _budget(1000)
+        messages = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"},
+                    {"role": "user", "content": "again"}]
+        packed = budget.pack("deepseek", messages, "<m>\n- x\n</m>", "def f(): pass", max_tokens=100)
+        assert packed.messages == messages
+        assert packed.memory_context == "<m>\n- x\n</m>"
+        assert packed.trimmed == []
+        assert packed.prompt_tokens <= packed.budget
+
+    def test_drops_oldest_history_first(self):
+        budget = _budget(600)
+        system = {"role": "system", "content": "be brief"}
+        history = [{"role": "user", "content": f"turn {i} " + "word " * 80} for i in range(10)]
+        latest = {"role": "user", "content": "latest question"}
+        packed = budget.pack("deepseek", [system] + history + [latest], max_tokens=100)
+
+        assert packed.messages[0] == system
+        assert packed.messages[-1] == latest
+        kept = packed.messages[1:-1]
+        assert kept == history[-len(kept):]
+        assert 0 < len(kept) < len(history)
+        assert packed.dropped_messages == len(history) - len(kept)
+        assert "history" in packed.trimmed
+        assert packed.prompt_tokens <= packed.budget
+
+    def test_context_capped_by_share(self):
+        budget = _budget(1000)
+        memory = "\n".join(["<relevant_memories>"] + [f"- memory {i} " + "x " * 20 for i in range(50)]
+                           + ["</relevant_memories>"])
+        packed = budget.pack("deepseek", [{"role": "user", "content": "q"}], memory, max_tokens=200)
+
+        assert "memory" in packed.trimmed
+        assert packed.memory_context.endswith("</relevant_memories>")
+        assert heuristic_token_count(packed.memory_context) <= packed.budget // 4 + 2
+        assert packed.prompt_tokens <= packed.budget
+
+    def test_oversized_latest_message_is_cut(self):
+        budget = _budget(600)
+        system = {"role": "system", "content": "be brief"}
+        lines = [f"line {i} " + "word " * 20 for i in range(200)]
+        pasted = {"role": "user", "content": "\n".join(lines)}
+        packed = budget.pack("deepseek", [system, pasted], max_tokens=100)
+
+        assert packed.messages[0] == system
+        assert packed.messages[-1]["content"].startswith("line 0 ")
+        assert "latest" in packed.trimmed
+        assert packed.prompt_tokens <= packed.budget
+
+        one_line = {"role": "user", "content": "word " * 2000}
+        packed = budget.pack("deepseek", [one_line], max_tokens=100)
+        assert packed.messages[-1]["content"].startswith("word ")
+        assert packed.prompt_tokens <= packed.budget
+
+    def test_oversized_system_prompt_leaves_room_for_the_question(self):
+        budget = _budget(600)
+        system = {"role": "system", "content": "\n".join(f"rule {i} " + "word " * 20
+                                                          for i in range(200))}
+        latest = {"role": "user", "content": "What is the capital of France?"}
+        packed = budget.pack("deepseek", [system, latest], max_tokens=100)
+
+        assert packed.messages[-1] == latest
+        assert packed.messages[0]["content"].startswith("rule 0 ")
+        assert "system" in packed.trimmed
+        assert "latest" not in packed.trimmed
+        assert packed.prompt_tokens <= packed.budget
+
+        pasted = {"role": "user", "content": "word " * 2000}
+        packed = budget.pack("deepseek", [system, pasted], max_tokens=100)
+        counter = budget.counter("deepseek")
+        assert counter.count_message(packed.messages[-1]) >= packed.budget // 5
+        assert packed.prompt_tokens <= packed.budget
+
+    def test_completion_tokens_fit_the_window(self):
+        budget = _budget(1000)
+        messages = [{"role": "user", "content": "word " * 400}]
+        prompt_tokens = budget.counter("deepseek").count_messages(messages)
+        # The reserve is capped at half the window; max_tokens is lowered instead
+        assert budget.prompt_budget("deepseek", 4096) == 500
+        assert budget.completion_tokens("deepseek", messages, 4096) == 1000 - prompt_tokens
+        assert budget.completion_tokens("deepseek", messages, 50) == 50
+
+    def test_build_messages_uses_endpoint_budget(self, monkeypatch):
+        from agent.nodes import inference
+        from agent.nodes.state import ComplexityLevel
+
+        monkeypatch.setattr(inference, "get_context_budget", lambda: _budget(300))
+        history = [{"role": "user", "content": "old " * 300}, {"role": "user", "content": "now"}]
+        messages = inference.build_messages({
+            "complexity": ComplexityLevel.COMPLEX,
+            "messages": history,
+            "memory_context": "<m>\n- likes tea\n</m>",
+            "max_tokens": 100,
+        })
+        assert [m["role"] for m in messages] == ["system", "user"]
+        assert "likes tea" in messages[0]["content"]
+        assert messages[-1]["content"] == "now"
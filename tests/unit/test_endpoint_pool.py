@@ -0,0 +1,206 @@
+"""Unit tests for load-balanced endpoint pools."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from agent import endpoint_pool
+from agent.endpoint_pool import EndpointPool, ReplicaConfig, build_pools
+from agent.nodes.state import ModelEndpoint
+
+
+def _endpoint(url: str = "http://unused/v1") -> ModelEndpoint:
+    return ModelEndpoint(name="test", url=url, model_id="test", timeout=5)
+
+
+def _pool(*urls: str, spares=(), balancing: str = "least_outstanding") -> EndpointPool:
+    replicas = [ReplicaConfig(url=u) for u in urls] + [ReplicaConfig(url=u, spare=True) for u in spares]
+    return EndpointPool("test", _endpoint(), replicas, balancing)
+
+
+def _eject(replica) -> None:
+    for _ in range(endpoint_pool.POOL_EJECT_FAILURES):
+        replica.observe(1.0, ok=False)
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    status = 200
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def start(status: int = 200) -> str:
+        handler = type("Handler", (_StatusHandler,), {"status": status})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.unit
+class TestBalancing:
+    """Test replica selection."""
+
+    def test_least_outstanding_spreads_concurrent_requests(self):
+        pool = _pool("http://a/v1", "http://b/v1")
+        with pool.lease() as first, pool.lease() as second:
+            assert first.replica is not second.replica
+            assert pool.in_flight == 2
+        assert pool.in_flight == 0
+
+    def test_least_outstanding_prefers_idle_replica(self):
+        pool = _pool("http://a/v1", "http://b/v1")
+        with pool.lease() as busy:
+            for _ in range(4):
+                with pool.lease() as lease:
+                    assert lease.replica is not busy.replica
+
+    def test_ewma_prefers_faster_replica(self):
+        pool = _pool("http://a/v1", "http://b/v1", balancing="ewma")
+        slow, fast = pool.replicas
+        slow.observe(900.0, ok=True)
+        fast.observe(100.0, ok=True)
+        with pool.lease() as lease:
+            assert lease.replica is fast
+
+    def test_ewma_sheds_load_from_busy_replica(self):
+        pool = _pool("http://a/v1", "http://b/v1", balancing="ewma")
+        slow, fast = pool.replicas
+        slow.observe(300.0, ok=True)
+        fast.observe(100.0, ok=True)
+        fast.in_flight = 3
+        with pool.lease() as lease:
+            assert lease.replica is slow
+
+    def test_single_replica_keeps_tier_name(self):
+        assert [r.name for r in _pool("http://a/v1").replicas] == ["test"]
+        assert [r.name for r in _pool("http://a/v1", "http://b/v1").replicas] == ["test-0", "test-1"]
+
+    def test_unknown_balancing_falls_back(self):
+        assert _pool("http://a/v1", balancing="random").balancing == "least_outstanding"
+
+
+@pytest.mark.unit
+class TestEjection:
+    """Test passive health ejection and spares."""
+
+    def test_failing_replica_is_ejected(self):
+        pool = _pool("http://a/v1", "http://b/v1")
+        bad, good = pool.replicas
+        _eject(bad)
+        assert bad.ejected
+        for _ in range(3):
+            with pool.lease() as lease:
+                assert lease.replica is good
+
+    def test_spare_only_when_primaries_ejected(self):
+        pool = _pool("http://a/v1", spares=["http://spare/v1"])
+        primary, spare = pool.replicas
+        with pool.lease() as lease:
+            assert lease.replica is primary
+        _eject(primary)
+        with pool.lease() as lease:
+            assert lease.replica is spare
+
+    def test_all_ejected_fails_open(self):
+        pool = _pool("http://a/v1")
+        _eject(pool.replicas[0])
+        with pool.lease() as lease:
+            assert lease.replica is pool.replicas[0]
+
+    def test_ejected_replica_gets_trial_after_timeout(self, monkeypatch):
+        monkeypatch.setattr(endpoint_pool, "POOL_EJECT_SECONDS", 0.0)
+        pool = _pool("http://a/v1", "http://b/v1")
+        bad = pool.replicas[0]
+        _eject(bad)
+        bad.in_flight = -1  # make it the least loaded once it is eligible
+        with pool.lease() as lease:
+            assert lease.replica is bad
+        assert not bad.ejected
+
+    def test_server_errors_count_as_failures(self, server_factory):
+        pool = EndpointPool("test-5xx", _endpoint(), [ReplicaConfig(url=server_factory(500))])
+        try:
+            for _ in range(endpoint_pool.POOL_EJECT_FAILURES):
+                assert pool.post("/chat/completions", {}).status_code == 500
+        finally:
+            pool.close()
+        assert pool.replicas[0].ejected
+
+    def test_connection_errors_count_as_failures(self):
+        pool = EndpointPool("test-down", _endpoint(), [ReplicaConfig(url="http://127.0.0.1:1/v1")])
+        try:
+            for _ in range(endpoint_pool.POOL_EJECT_FAILURES):
+                with pytest.raises(httpx.TransportError):
+                    pool.post("/chat/completions", {})
+        finally:
+            pool.close()
+        assert pool.replicas[0].ejected
+        assert pool.in_flight == 0
+
+    def test_stream_uses_pool_replicas(self, server_factory):
+        pool = EndpointPool("test-stream", _endpoint(), [ReplicaConfig(url=server_factory())])
+        try:
+            with pool.stream("/chat/completions", {}) as response:
+                assert response.status_code == 200
+                response.read()
+        finally:
+            pool.close()
+        assert pool.replicas[0].ewma_ms is not None
+        assert pool.in_flight == 0
+
+
+@pytest.mark.unit
+class TestBuildPools:
+    """Test replica configuration."""
+
+    def test_replicas_from_agent_stack(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "agent_stack.yaml"
+        path.write_text(
+            "cognitive_trinity:\n"
+            "  executor:\n"
+            "    balancing: ewma\n"
+            "    replicas:\n"
+            "      - http://qwen-0:8002/v1\n"
+            "      - url: http://qwen-1:8002/v1/\n"
+            "  oracle:\n"
+            "    replicas:\n"
+            "      - url: http://ds:8000/v1\n"
+            "      - url: http://ds-spare:8000/v1\n"
+            "        spare: true\n"
+        )
+        pools = build_pools(str(path))
+        assert pools["qwen"].balancing == "ewma"
+        assert [r.url for r in pools["qwen"].replicas] == ["http://qwen-0:8002/v1", "http://qwen-1:8002/v1"]
+        assert [r.spare for r in pools["deepseek"].replicas] == [False, True]
+        assert pools["qwen"].endpoint.model_id == "qwen2.5-coder-7b"
+
+    def test_env_overrides_and_default(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("EXECUTOR_REPLICAS", "http://a:1/v1, http://b:2/v1")
+        pools = build_pools(str(tmp_path / "missing.yaml"))
+        assert [r.url for r in pools["qwen"].replicas] == ["http://a:1/v1", "http://b:2/v1"]
+        assert [r.url for r in pools["deepseek"].replicas] == ["http://deepseek-v32:8000/v1"]
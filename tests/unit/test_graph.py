@@ -190,3 +190,72 @@ class TestGraphInvocation:
         from agent.graph import stream_graph
 
         assert inspect.isasyncgenfunction(stream_graph)
+
+
+@pytest.mark.unit
+class TestRetrieveContext:
+    """Test the concurrent memory + knowledge stage."""
+
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently(self, monkeypatch):
+        """Stage latency should be max(sources), not their sum."""
+        import asyncio
+        import time
+
+        from agent.nodes import context
+
+        async def slow_memory(state):
+            await asyncio.sleep(0.2)
+            return {"memories": [{"id": "m1"}], "memory_context": "mem"}
+
+        async def slow_knowledge(state):
+            await asyncio.sleep(0.2)
+            return {"code_context": "code"}
+
+        monkeypatch.setattr(context, "retrieve_memory", slow_memory)
+        monkeypatch.setattr(context, "retrieve_knowledge", slow_knowledge)
+
+        start = time.perf_counter()
+        result = await context.retrieve_context({"prompt": "Explain the router design"})
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.35
+        assert result["memory_context"] == "mem"
+        assert result["code_context"] == "code"
+        assert result["stage_timings"]["memory_ms"] >= 200
+
+    @pytest.mark.asyncio
+    async def test_late_source_is_dropped(self, monkeypatch):
+        """A source that misses its deadline contributes empty context."""
+        import asyncio
+
+        from agent.nodes import context
+
+        async def hung_memory(state):
+            await asyncio.sleep(5)
+            return {"memories": [{"id": "late"}], "memory_context": "late"}
+
+        async def fast_knowledge(state):
+            return {"code_context": "code"}
+
+        monkeypatch.setattr(context, "retrieve_memory", hung_memory)
+        monkeypatch.setattr(context, "retrieve_knowledge", fast_knowledge)
+        monkeypatch.setattr(context, "MEMORY_DEADLINE", 0.05)
+
+        result = await context.retrieve_context({"prompt": "Explain the router design"})
+
+        assert result["memory_context"] == ""
+        assert result["memories"] == []
+        assert result["code_context"] == "code"
+
+    def test_timed_wrapper_records_stage(self):
+        """timed() should add <stage>_ms and keep node-reported timings."""
+        from agent.graph import timed
+
+        def node(state):
+            return {"stage_timings": {"inner_ms": 1.0}, "x": 1}
+
+        result = timed("demo", node)({})
+        assert result["x"] == 1
+        assert result["stage_timings"]["inner_ms"] == 1.0
+        assert "demo_ms" in result["stage_timings"]
@@ -0,0 +1,125 @@
+"""Unit tests for the health registry and circuit breakers."""
+
+import asyncio
+
+import pytest
+
+from agent.health import CircuitBreaker, CircuitState, HealthRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    """Test closed / open / half-open transitions."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("mem0", failure_threshold=2, reset_timeout=10, clock=FakeClock())
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_allows_one_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("mem0", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 11
+        assert breaker.allow()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow()
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("mem0", failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 11
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert not breaker.allow()
+
+
+@pytest.mark.unit
+class TestHealthRegistry:
+    """Test background refresh results and request-path gating."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_updates_status_and_breaker(self):
+        healthy = True
+
+        async def check():
+            return healthy
+
+        registry = HealthRegistry(timeout=1)
+        registry.register(
+            "memory", check,
+            breaker=CircuitBreaker("memory", failure_threshold=1, reset_timeout=60),
+        )
+
+        await registry.refresh()
+        assert registry.snapshot()["memory"]["status"] == "healthy"
+        assert registry.allow("memory")
+
+        healthy = False
+        await registry.refresh()
+        assert registry.snapshot()["memory"]["status"] == "unhealthy"
+        assert registry.snapshot()["memory"]["circuit"] == "open"
+        assert not registry.allow("memory")
+
+        healthy = True
+        await registry.refresh()
+        assert registry.allow("memory")
+
+    @pytest.mark.asyncio
+    async def test_slow_check_times_out(self):
+        async def hang():
+            await asyncio.sleep(5)
+            return True
+
+        registry = HealthRegistry(timeout=0.05)
+        registry.register("knowledge", hang, critical=False)
+        await registry.refresh()
+
+        snapshot = registry.snapshot()["knowledge"]
+        assert snapshot["status"] == "unhealthy"
+        assert "timed out" in snapshot["error"]
+        assert snapshot["critical"] is False
+
+    def test_unknown_component_is_allowed(self):
+        assert HealthRegistry().allow("nonexistent")
+
+    @pytest.mark.asyncio
+    async def test_memory_node_skips_when_circuit_open(self, monkeypatch):
+        from agent.nodes import memory as memory_node
+        from agent.nodes.state import ComplexityLevel
+
+        registry = HealthRegistry()
+        registry.register("memory", lambda: None, breaker=CircuitBreaker("memory", failure_threshold=1))
+        registry.record_failure("memory")
+        monkeypatch.setattr(memory_node, "get_health_registry", lambda: registry)
+
+        def fail():
+            raise AssertionError("Mem0 client must not be used while the circuit is open")
+
+        monkeypatch.setattr(memory_node, "_get_mem0_client", fail)
+
+        result = await memory_node.retrieve_memory({
+            "prompt": "Recall how we configured the NUMA pinning last time",
+            "complexity": ComplexityLevel.COMPLEX,
+        })
+        assert result == {"memories": [], "memory_context": ""}
@@ -0,0 +1,204 @@
+"""Unit tests for hedged executor-first routing."""
+
+import asyncio
+
+import pytest
+
+from agent.admission import AdmissionRejected
+from agent.graph import route_after_cache
+from agent.nodes import hedge
+from agent.nodes.classification import HeuristicClassifier
+from agent.nodes.metacognition import check_gates
+from agent.nodes.state import ComplexityLevel
+
+GOOD_ANSWER = (
+    "A mutex serializes access to shared state: each thread acquires the lock "
+    "before touching the data and releases it afterwards, so updates never interleave."
+)
+
+BORDERLINE_PROMPT = "Please review the architecture of our billing service module"
+
+
+def _state(**overrides):
+    state = {
+        "prompt": "How does a mutex protect shared state between threads?",
+        "complexity": ComplexityLevel.COMPLEX,
+        "borderline": True,
+        "retry_count": 0,
+        "routing_reason": "Complex indicator: 'architecture'",
+    }
+    state.update(overrides)
+    return state
+
+
+def _fake_generate(answers, delays=None, calls=None, cancelled=None):
+    """generate() stand-in: per-endpoint answer (or exception) after a delay."""
+    async def generate(endpoint_key, state):
+        if calls is not None:
+            calls.append(endpoint_key)
+        try:
+            await asyncio.sleep((delays or {}).get(endpoint_key, 0))
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(endpoint_key)
+            raise
+        answer = answers[endpoint_key]
+        if isinstance(answer, Exception):
+            raise answer
+        return {"response": answer, "model_name": endpoint_key}
+    return generate
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(hedge, "HEDGED_ROUTING_ENABLED", True)
+    monkeypatch.setattr(hedge, "HEDGE_ORACLE_DELAY", -1.0)
+    monkeypatch.setattr(hedge, "HEDGE_EXECUTOR_TIMEOUT", 5.0)
+    return monkeypatch
+
+
+@pytest.mark.unit
+class TestShouldHedge:
+    """Test which requests take the hedged path."""
+
+    def test_borderline_complex_first_attempt(self, hedging):
+        assert hedge.should_hedge(_state())
+        assert route_after_cache(_state()) == "hedge"
+
+    def test_disabled(self, hedging):
+        hedging.setattr(hedge, "HEDGED_ROUTING_ENABLED", False)
+        assert not hedge.should_hedge(_state())
+        assert route_after_cache(_state()) == "miss"
+
+    def test_clear_cut_routine_and_retries_are_not_hedged(self, hedging):
+        assert not hedge.should_hedge(_state(borderline=False))
+        assert not hedge.should_hedge(_state(complexity=ComplexityLevel.ROUTINE))
+        assert not hedge.should_hedge(_state(retry_count=1))
+
+    def test_cache_hit_wins(self, hedging):
+        assert route_after_cache(_state(cache_hit=True)) == "hit"
+
+
+@pytest.mark.unit
+class TestBorderline:
+    """Test the heuristic classifier's borderline signal."""
+
+    def test_single_keyword_short_prompt(self):
+        classifier = HeuristicClassifier()
+        prompt = BORDERLINE_PROMPT
+        complexity, _ = classifier.classify(prompt, 0)
+        assert complexity == ComplexityLevel.COMPLEX
+        assert classifier.is_borderline(prompt, 0)
+
+    def test_several_keywords_or_deep_context(self):
+        classifier = HeuristicClassifier()
+        prompt = "Refactor the architecture and debug the security of the kubernetes setup"
+        assert not classifier.is_borderline(prompt, 0)
+        assert not classifier.is_borderline(BORDERLINE_PROMPT, 8)
+
+
+@pytest.mark.unit
+class TestCheckGates:
+    """Test the gate runner shared with metacognition."""
+
+    def test_good_answer_passes(self):
+        assert check_gates(GOOD_ANSWER, "How does a mutex protect shared state?") == (0, "", "")
+
+    def test_short_answer_fails(self):
+        gate, failure_type, _ = check_gates("Yes.", "How does a mutex protect shared state?")
+        assert gate == 3
+        assert failure_type == "too_short"
+
+
+@pytest.mark.unit
+class TestHedgedCall:
+    """Test executor-first answers, escalation and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_executor_passes_gates(self, hedging):
+        calls = []
+        hedging.setattr(hedge, "generate", _fake_generate({"qwen": GOOD_ANSWER}, calls=calls))
+        result = await hedge.hedged_call(_state())
+        assert result["response"] == GOOD_ANSWER
+        assert result["hedge_winner"] == "qwen"
+        assert result["qwen_passed"] is True
+        assert calls == ["qwen"]
+
+    @pytest.mark.asyncio
+    async def test_gate_failure_escalates(self, hedging):
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": "Yes.", "deepseek": GOOD_ANSWER},
+        ))
+        result = await hedge.hedged_call(_state())
+        assert result["model_name"] == "deepseek"
+        assert result["hedge_winner"] == "deepseek"
+        assert result["qwen_passed"] is False
+        assert "too_short" not in result["routing_reason"]
+        assert "length" in result["routing_reason"]
+
+    @pytest.mark.asyncio
+    async def test_slow_executor_is_cancelled_and_escalates(self, hedging):
+        hedging.setattr(hedge, "HEDGE_EXECUTOR_TIMEOUT", 0.05)
+        cancelled = []
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": GOOD_ANSWER, "deepseek": GOOD_ANSWER}, delays={"qwen": 5}, cancelled=cancelled,
+        ))
+        result = await hedge.hedged_call(_state())
+        assert result["hedge_winner"] == "deepseek"
+        assert cancelled == ["qwen"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_oracle_cancelled_when_executor_passes(self, hedging):
+        hedging.setattr(hedge, "HEDGE_ORACLE_DELAY", 0.0)
+        calls, cancelled = [], []
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": GOOD_ANSWER, "deepseek": GOOD_ANSWER},
+            delays={"qwen": 0.05, "deepseek": 5}, calls=calls, cancelled=cancelled,
+        ))
+        result = await hedge.hedged_call(_state())
+        assert result["hedge_winner"] == "qwen"
+        assert calls == ["qwen", "deepseek"]
+        assert cancelled == ["deepseek"]
+
+    @pytest.mark.asyncio
+    async def test_oracle_rejected_keeps_executor_answer(self, hedging):
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": "Yes.", "deepseek": AdmissionRejected("deepseek", "overflow")},
+        ))
+        result = await hedge.hedged_call(_state())
+        assert result["response"] == "Yes."
+        assert result["hedge_winner"] == "qwen"
+        assert result["qwen_passed"] is False
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_error_leave_qwen_passed_unset(self, hedging):
+        hedging.setattr(hedge, "generate", _fake_generate({
+            "qwen": AdmissionRejected("qwen", "overflow"), "deepseek": GOOD_ANSWER,
+        }))
+        result = await hedge.hedged_call(_state())
+        assert result["hedge_winner"] == "deepseek"
+        assert result["qwen_passed"] is None
+
+        hedging.setattr(hedge, "HEDGE_EXECUTOR_TIMEOUT", 0.01)
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": GOOD_ANSWER, "deepseek": GOOD_ANSWER}, delays={"qwen": 5},
+        ))
+        result = await hedge.hedged_call(_state())
+        assert result["qwen_passed"] is None
+
+    @pytest.mark.asyncio
+    async def test_executor_first_escalation_carries_verdict_only(self, hedging):
+        wins = hedge.hedge_wins_total.labels(route="deepseek")._value.get()
+        hedging.setattr(hedge, "generate", _fake_generate({"qwen": "Yes."}))
+        assert await hedge.executor_first(_state()) == {"qwen_passed": False}
+        hedging.setattr(hedge, "generate", _fake_generate(
+            {"qwen": AdmissionRejected("qwen", "timeout")},
+        ))
+        assert await hedge.executor_first(_state()) == {"qwen_passed": None}
+        # The oracle has not answered yet; stream_graph records its win
+        assert hedge.hedge_wins_total.labels(route="deepseek")._value.get() == wins
+
+        hedging.setattr(hedge, "generate", _fake_generate({"qwen": GOOD_ANSWER}))
+        result = await hedge.executor_first(_state())
+        assert result["hedge_winner"] == "qwen"
+        assert result["qwen_passed"] is True
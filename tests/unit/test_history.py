@@ -0,0 +1,127 @@
+"""Unit tests for conversation history compaction."""
+
+import asyncio
+
+import pytest
+
+from agent.nodes import history
+from agent.nodes.classification import classify_complexity
+
+
+def _chat(turns):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i}"})
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+    messages.append({"role": "user", "content": "latest"})
+    return messages
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    calls = []
+
+    def fake_summarize(previous, messages):
+        calls.append((previous, [m["content"] for m in messages]))
+        return f"summary of {len(calls)} calls"
+
+    monkeypatch.setattr(history, "_summarize_sync", fake_summarize)
+    monkeypatch.setattr(history, "_summary_cache", history.SummaryCache())
+    monkeypatch.setattr(history, "HISTORY_KEEP_RECENT", 2)
+    monkeypatch.setattr(history, "HISTORY_COMPACTION_CHUNK", 4)
+    return calls
+
+
+async def _settle():
+    while history._pending:
+        await asyncio.gather(*history._pending.values())
+
+
+@pytest.mark.unit
+class TestPrefixKeys:
+    """Test rolling conversation-prefix hashes."""
+
+    def test_keys_are_stable_across_turns(self):
+        short = _chat(4)[1:9]
+        longer = _chat(6)[1:13]
+        assert history.prefix_keys(short, 4) == history.prefix_keys(longer, 4)[:2]
+
+    def test_partial_chunk_has_no_key(self):
+        assert history.prefix_keys(_chat(1)[1:4], 4) == []
+
+    def test_content_changes_key(self):
+        a = _chat(2)[1:5]
+        b = [dict(m) for m in a]
+        b[0]["content"] = "edited"
+        assert history.prefix_keys(a, 4) != history.prefix_keys(b, 4)
+
+
+@pytest.mark.unit
+class TestCompactHistory:
+    """Test the compaction node."""
+
+    @pytest.mark.asyncio
+    async def test_short_chat_untouched(self, summarizer):
+        assert await history.compact_history({"messages": _chat(1)}) == {}
+        assert summarizer == []
+
+    @pytest.mark.asyncio
+    async def test_first_turn_schedules_then_reuses(self, summarizer):
+        messages = _chat(3)  # 7 conversation messages, 4 compactable
+        assert await history.compact_history({"messages": messages}) == {}
+        await _settle()
+        assert summarizer == [("", ["question 0", "answer 0", "question 1", "answer 1"])]
+
+        result = await history.compact_history({"messages": messages})
+        compacted = result["messages"]
+        assert compacted[0]["role"] == "system"
+        assert compacted[0]["content"].startswith("You are helpful.")
+        assert "<conversation_summary>\nsummary of 1 calls\n</conversation_summary>" in compacted[0]["content"]
+        assert [m["content"] for m in compacted[1:]] == ["question 2", "answer 2", "latest"]
+        await _settle()
+        assert len(summarizer) == 1
+
+    @pytest.mark.asyncio
+    async def test_summary_extends_incrementally(self, summarizer):
+        await history.compact_history({"messages": _chat(3)})
+        await _settle()
+
+        # Two more turns: the cached summary is used while the next block is folded in
+        result = await history.compact_history({"messages": _chat(5)})
+        assert [m["content"] for m in result["messages"][1:4]] == ["question 2", "answer 2", "question 3"]
+        await _settle()
+        assert summarizer[1] == ("summary of 1 calls", ["question 2", "answer 2", "question 3", "answer 3"])
+
+        result = await history.compact_history({"messages": _chat(5)})
+        assert "summary of 2 calls" in result["messages"][0]["content"]
+        assert [m["content"] for m in result["messages"][1:]] == ["question 4", "answer 4", "latest"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_turns_summarize_once(self, summarizer):
+        messages = _chat(3)
+        await asyncio.gather(*(history.compact_history({"messages": messages}) for _ in range(5)))
+        await _settle()
+        assert len(summarizer) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_summary_keeps_history(self, summarizer, monkeypatch):
+        def broken(previous, messages):
+            raise RuntimeError("executor down")
+
+        monkeypatch.setattr(history, "_summarize_sync", broken)
+        messages = _chat(3)
+        await history.compact_history({"messages": messages})
+        await _settle()
+        assert await history.compact_history({"messages": messages}) == {}
+
+    @pytest.mark.asyncio
+    async def test_compacted_chat_is_not_escalated(self, summarizer):
+        messages = _chat(5)
+        await history.compact_history({"messages": messages})
+        await _settle()
+        await history.compact_history({"messages": messages})
+        await _settle()
+
+        compacted = (await history.compact_history({"messages": messages}))["messages"]
+        assert classify_complexity({"messages": messages, "prompt": "latest"})["complexity"].value == "complex"
+        assert classify_complexity({"messages": compacted, "prompt": "latest"})["complexity"].value == "routine"
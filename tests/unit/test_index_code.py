@@ -0,0 +1,195 @@
+"""Unit tests for the incremental code indexer (scripts/index_code.py)."""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import index_code  # noqa: E402
+
+
+def _write(path: Path, source: str) -> Path:
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "pkg"
+    src.mkdir()
+    _write(src / "a.py", "def alpha():\n    return 1\n")
+    _write(src / "b.py", "class Beta:\n    def run(self):\n        pass\n")
+    return src
+
+
+def _delta(tree: Path, manifest):
+    return index_code.compute_delta(index_code.collect_files(tree), tree.parent, manifest)
+
+
+@pytest.mark.unit
+class TestManifest:
+    """Test loading and saving the content-hash manifest."""
+
+    def test_missing_or_unreadable_is_empty(self, tmp_path):
+        empty = {"version": index_code.MANIFEST_VERSION, "files": {}}
+        assert index_code.load_manifest(tmp_path / "none.json") == empty
+        (tmp_path / "bad.json").write_text("{not json")
+        assert index_code.load_manifest(tmp_path / "bad.json") == empty
+        (tmp_path / "old.json").write_text(json.dumps({"version": 0, "files": {"x": {}}}))
+        assert index_code.load_manifest(tmp_path / "old.json") == empty
+
+    def test_round_trip(self, tree, tmp_path):
+        manifest = index_code.load_manifest(tmp_path / "manifest.json")
+        _delta(tree, manifest)
+        index_code.save_manifest(tmp_path / "manifest.json", manifest)
+        assert index_code.load_manifest(tmp_path / "manifest.json") == manifest
+        assert not (tmp_path / "manifest.json.tmp").exists()
+
+
+@pytest.mark.unit
+class TestComputeDelta:
+    """Test diffing the tree against the manifest."""
+
+    def test_first_run_adds_everything(self, tree):
+        manifest = index_code.load_manifest(tree / "missing.json")
+        delta = _delta(tree, manifest)
+        assert sorted(Path(p).name for p in delta.added) == ["a.py", "b.py"]
+        assert delta.changed == [] and delta.removed == []
+        assert any(q.endswith("alpha") for q in delta.added_symbols)
+        assert len(manifest["files"]) == 2
+
+    def test_unchanged_and_touched_files_are_skipped(self, tree):
+        manifest = index_code.load_manifest(tree / "missing.json")
+        _delta(tree, manifest)
+        os.utime(tree / "a.py", (1, 1))
+        delta = _delta(tree, manifest)
+        assert not delta.has_changes
+        assert delta.unchanged == 2
+        assert delta.parsed == []
+
+    def test_changed_and_removed(self, tree):
+        manifest = index_code.load_manifest(tree / "missing.json")
+        _delta(tree, manifest)
+        _write(tree / "a.py", "def alpha2():\n    return 2\n")
+        (tree / "b.py").unlink()
+        delta = _delta(tree, manifest)
+
+        assert [Path(p).name for p in delta.changed] == ["a.py"]
+        assert [Path(p).name for p in delta.removed] == ["b.py"]
+        assert any(q.endswith("alpha2") for q in delta.added_symbols)
+        removed = delta.removed_symbols
+        assert any(q.endswith("alpha") for q in removed)
+        assert any(q.endswith("Beta") for q in removed)
+        assert len(manifest["files"]) == 1
+
+    def test_file_vanishing_before_hash_is_removed(self, tree, monkeypatch):
+        manifest = index_code.load_manifest(tree / "missing.json")
+        _delta(tree, manifest)
+        _write(tree / "b.py", "class Beta:\n    pass\n\n\nclass Gamma:\n    pass\n")
+        real_sha256 = index_code._file_sha256
+
+        def sha256(file_path):
+            if file_path.name == "b.py":
+                raise FileNotFoundError(file_path)
+            return real_sha256(file_path)
+
+        monkeypatch.setattr(index_code, "_file_sha256", sha256)
+        delta = _delta(tree, manifest)
+        assert [Path(p).name for p in delta.removed] == ["b.py"]
+        assert delta.changed == []
+
+
+@pytest.mark.unit
+class TestRunIncremental:
+    """Test when the incremental pass persists the manifest."""
+
+    def test_output_file_does_not_save_manifest(self, tree, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        output = tmp_path / "delta.cypher"
+        delta = index_code.run_incremental(tree, tree.parent, manifest_path, str(output), None)
+        assert delta.has_changes
+        assert "MERGE" in output.read_text()
+        assert not manifest_path.exists()
+        # Not applied yet, so the next run produces the same delta
+        again = index_code.run_incremental(tree, tree.parent, manifest_path, str(output), None)
+        assert sorted(again.added) == sorted(delta.added)
+
+
+class FakeSession:
+    def __init__(self, writes):
+        self.writes = writes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, query, rows):
+        self.writes.append((query, list(rows)))
+
+
+class FakeDriver:
+    def __init__(self):
+        self.writes = []
+        self.closed = False
+
+    def session(self):
+        return FakeSession(self.writes)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.unit
+class TestGraphRows:
+    """Test the UNWIND batches written to Memgraph."""
+
+    def _parsed(self, tree):
+        return index_code.parse_files(index_code.collect_files(tree), tree.parent)
+
+    def test_rows_per_label(self, tree):
+        _write(tree / "c.py", "import os\n\n\nasync def gamma():\n    pass\n")
+        batches = index_code.graph_rows(self._parsed(tree))
+        assert [label for label, _, _ in batches] == [
+            "files", "classes", "methods", "functions", "imports",
+        ]
+        rows = {label: rows for label, _, rows in batches}
+
+        assert sorted(r["name"] for r in rows["files"]) == ["a.py", "b.py", "c.py"]
+        assert [r["name"] for r in rows["classes"]] == ["Beta"]
+        method = rows["methods"][0]
+        assert method["name"] == "run"
+        assert method["cls_qname"] == rows["classes"][0]["qname"]
+        functions = {r["name"]: r for r in rows["functions"]}
+        assert set(functions) == {"alpha", "gamma"}
+        assert functions["gamma"]["is_async"] is True
+        assert [r["module"] for r in rows["imports"]] == ["os"]
+        paths = {r["path"] for r in rows["files"]}
+        assert all(r["path"] in paths for r in rows["classes"] + rows["functions"])
+
+    def test_batches_respect_batch_size(self, tree, monkeypatch):
+        for i in range(5):
+            _write(tree / f"f{i}.py", f"def f{i}():\n    pass\n")
+        driver = FakeDriver()
+        monkeypatch.setattr(index_code, "DRIVER_AVAILABLE", True)
+        monkeypatch.setattr(
+            index_code, "GraphDatabase",
+            type("GraphDatabase", (), {"driver": staticmethod(lambda uri, auth: driver)}),
+            raising=False,
+        )
+        files = self._parsed(tree)
+        written = index_code.index_to_memgraph(files, "bolt://memgraph", "", "", batch_size=3)
+
+        expected = sum(len(rows) for _, _, rows in index_code.graph_rows(files))
+        assert written == expected
+        assert all(len(rows) <= 3 for _, rows in driver.writes)
+        file_batches = [rows for query, rows in driver.writes if query is index_code._UNWIND_FILES]
+        assert [len(rows) for rows in file_batches] == [3, 3, 1]
+        # Nodes go before the relationships that MATCH them
+        assert driver.writes[0][0] is index_code._UNWIND_FILES
+        assert driver.closed
@@ -0,0 +1,64 @@
+"""Unit tests for the inference node streaming path."""
+
+import asyncio
+import threading
+
+import pytest
+
+from agent.nodes.inference import _iterate_in_thread
+
+
+@pytest.mark.unit
+class TestIterateInThread:
+    """Test incremental hand-off from the upstream reader thread."""
+
+    @pytest.mark.asyncio
+    async def test_yields_before_producer_finishes(self):
+        """First chunk should reach the consumer while the producer is still running."""
+        release = threading.Event()
+
+        def produce(emit, stop):
+            emit("data: first\n")
+            assert release.wait(timeout=5), "consumer never saw the first chunk"
+            emit("data: second\n")
+
+        stream = _iterate_in_thread(produce)
+        first = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        assert first == "data: first\n"
+
+        release.set()
+        rest = [line async for line in stream]
+        assert rest == ["data: second\n"]
+
+    @pytest.mark.asyncio
+    async def test_producer_error_is_reraised(self):
+        """Errors in the worker thread should surface to the consumer."""
+
+        def produce(emit, stop):
+            emit("data: partial\n")
+            raise RuntimeError("upstream reset")
+
+        received = []
+        with pytest.raises(RuntimeError, match="upstream reset"):
+            async for line in _iterate_in_thread(produce):
+                received.append(line)
+
+        assert received == ["data: partial\n"]
+
+    @pytest.mark.asyncio
+    async def test_consumer_close_stops_blocked_producer(self):
+        """Closing the stream early should unblock a producer stuck on a full queue."""
+        finished = threading.Event()
+
+        def produce(emit, stop):
+            try:
+                for i in range(1000):
+                    emit(f"data: {i}\n")
+            finally:
+                finished.set()
+
+        stream = _iterate_in_thread(produce, maxsize=2)
+        assert await stream.__anext__() == "data: 0\n"
+        await stream.aclose()
+
+        assert await asyncio.to_thread(finished.wait, 5)
@@ -0,0 +1,95 @@
+"""Unit tests for the single-pass keyword matcher."""
+
+import pytest
+
+from agent import matcher
+from agent.matcher import (
+    DEFAULT_VOCABULARY,
+    KeywordMatcher,
+    load_vocabulary,
+    prompt_matcher,
+    response_matcher,
+)
+
+PROMPTS = [
+    "Hello! Can you check the system status and your vram usage?",
+    "Refactor the classification node, then explain why the gpu trace is slow step by step",
+    "this is a thin wrapper; find where the function is defined",
+    "Thank you, bye",
+    "",
+]
+
+
+@pytest.mark.unit
+class TestKeywordMatcher:
+    """Test literal vocabulary matching."""
+
+    def test_overlapping_hits_across_categories(self):
+        matches = prompt_matcher.scan("Show the System Status")
+        assert matches.first("status") == "system status"
+        assert "system" in matches.get("sovereign")
+        assert "status" in matches.get("status_query")
+
+    def test_keyword_inside_another_word(self):
+        # Substring semantics: "hi" inside "this", "root" inside "rooted"
+        matches = prompt_matcher.scan("this tree is rooted")
+        assert "hi" in matches.get("trivial")
+        assert "root" in matches.get("sovereign")
+
+    def test_prefix_keywords_all_reported(self):
+        m = KeywordMatcher({"a": ["thank", "thank you"], "b": ["you"]})
+        matches = m.scan("thank you")
+        assert sorted(matches.get("a")) == ["thank", "thank you"]
+        assert matches.get("b") == ["you"]
+
+    def test_first_follows_vocabulary_order(self):
+        m = KeywordMatcher({"kw": ["zeta", "alpha"]})
+        assert m.scan("alpha then zeta").first("kw") == "zeta"
+
+    @pytest.mark.parametrize("prompt", PROMPTS)
+    def test_equivalent_to_substring_scans(self, prompt):
+        matches = prompt_matcher.scan(prompt)
+        lowered = prompt.lower()
+        for category, words in DEFAULT_VOCABULARY.items():
+            if category in matcher.RESPONSE_CATEGORIES:
+                continue
+            assert set(matches.get(category)) == {w for w in words if w in lowered}
+
+    def test_empty_vocabulary(self):
+        assert KeywordMatcher({}).scan("anything").categories() == {}
+
+
+@pytest.mark.unit
+class TestResponseMatcher:
+    """Test regex marker matching for the metacognition gates."""
+
+    def test_gate_markers(self):
+        matches = response_matcher.scan("As an AI, I cannot do that...")
+        assert matches.first("hallucination") == "as an ai"
+        assert matches.first("incomplete") == r"\.{3,}$"
+
+    def test_anchor_only_at_end(self):
+        assert "incomplete" not in response_matcher.scan("Wait... here is the full answer.")
+
+
+@pytest.mark.unit
+class TestLoadVocabulary:
+    """Test the routing-vocabulary.yaml overlay."""
+
+    def test_yaml_overrides_category(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "routing-vocabulary.yaml"
+        path.write_text("vocabularies:\n  trivial:\n    - howdy\n")
+        vocabulary = load_vocabulary(str(path))
+        assert vocabulary["trivial"] == ["howdy"]
+        assert vocabulary["sovereign"] == DEFAULT_VOCABULARY["sovereign"]
+
+    def test_invalid_yaml_keeps_defaults(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "routing-vocabulary.yaml"
+        path.write_text("vocabularies: [unclosed\n")
+        assert load_vocabulary(str(path)) == DEFAULT_VOCABULARY
+
+    def test_repo_config_matches_defaults(self):
+        pytest.importorskip("yaml")
+        assert load_vocabulary(str(matcher._REPO_VOCABULARY_PATH)) == DEFAULT_VOCABULARY
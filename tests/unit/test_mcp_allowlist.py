@@ -1,5 +1,7 @@
 """Unit tests for MCP Tool Allowlist."""
 
+import os
+
 import pytest
 
 from mcp_proxy.allowlist import ToolAllowlist, ToolPermission
@@ -188,3 +190,76 @@ allowed_tools:
         assert allowlist.is_allowed("mcp_file", "list") is True
         assert allowlist.is_allowed("mcp_file", "write") is False
         assert allowlist.is_allowed("mcp_file", "delete") is False
+
+
+@pytest.mark.unit
+class TestDecisionTable:
+    """Test the compiled decision table and hot reload."""
+
+    CONFIG = """
+policy: deny
+allowed_tools:
+  mcp_ssh:
+    methods: [ssh_execute]
+    rate_limit: 10/min
+    burst: 20
+  mcp_docs:
+    methods: ["*"]
+    rate_limit: 5/sec
+denied_tools:
+  - mcp_shell
+"""
+
+    def test_decision_carries_parsed_limits(self, tmp_path):
+        config_file = tmp_path / "allowlist.yaml"
+        config_file.write_text(self.CONFIG)
+        allowlist = ToolAllowlist(str(config_file))
+
+        decision = allowlist.decide("mcp_ssh", "ssh_execute")
+        assert decision.allowed is True
+        assert (decision.limit, decision.window, decision.burst) == (10, 60, 20)
+        assert decision.permission.name == "mcp_ssh"
+
+        assert allowlist.decide("mcp_docs", "anything").window == 1
+        assert allowlist.decide("mcp_ssh", "ssh_delete").allowed is False
+        assert allowlist.decide("mcp_shell", "x").allowed is False
+
+    def test_verdicts_are_memoized(self, tmp_path):
+        config_file = tmp_path / "allowlist.yaml"
+        config_file.write_text(self.CONFIG)
+        allowlist = ToolAllowlist(str(config_file))
+
+        first = allowlist.decide("mcp_docs", "search")
+        assert allowlist.decide("mcp_docs", "search") is first
+
+    def test_table_is_read_only(self, tmp_path):
+        config_file = tmp_path / "allowlist.yaml"
+        config_file.write_text(self.CONFIG)
+        allowlist = ToolAllowlist(str(config_file))
+
+        with pytest.raises(TypeError):
+            allowlist.allowed_tools["mcp_new"] = None
+
+    def test_reload_swaps_table(self, tmp_path):
+        config_file = tmp_path / "allowlist.yaml"
+        config_file.write_text(self.CONFIG)
+        allowlist = ToolAllowlist(str(config_file))
+        old_table = allowlist.table
+        assert allowlist.reload() is False
+
+        config_file.write_text(self.CONFIG.replace("[ssh_execute]", "[ssh_execute, ssh_connect]"))
+        os.utime(config_file, ns=(0, 10**9))
+        assert allowlist.reload() is True
+        assert allowlist.table is not old_table
+        assert allowlist.is_allowed("mcp_ssh", "ssh_connect") is True
+        assert old_table.decide("mcp_ssh", "ssh_connect").allowed is False
+
+    def test_broken_reload_keeps_previous_table(self, tmp_path):
+        config_file = tmp_path / "allowlist.yaml"
+        config_file.write_text(self.CONFIG)
+        allowlist = ToolAllowlist(str(config_file))
+
+        config_file.write_text("allowed_tools: [unclosed")
+        os.utime(config_file, ns=(0, 10**9))
+        assert allowlist.reload() is False
+        assert allowlist.is_allowed("mcp_ssh", "ssh_execute") is True
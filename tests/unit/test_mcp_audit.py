@@ -0,0 +1,125 @@
+"""Unit tests for the batched MCP audit writer."""
+
+import gzip
+import json
+
+import pytest
+
+from mcp_proxy.audit import AuditEvent, AuditLogger, mcp_audit_events_dropped_total
+from mcp_proxy.audit_store import AuditStore
+
+
+def _log(audit, n, start=0):
+    for i in range(start, start + n):
+        audit.log_invocation(audit_id=f"a{i}", tool="mcp_test", method="read", status="success")
+
+
+def _ids(path):
+    return [json.loads(line)["audit_id"] for line in path.read_text().splitlines()]
+
+
+@pytest.mark.unit
+class TestAuditLogger:
+    """Test buffering, flushing and rotation."""
+
+    def test_close_drains_everything(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        audit = AuditLogger(str(path), flush_interval=60, batch_size=1000)
+        _log(audit, 50)
+        audit.close()
+        assert _ids(path) == [f"a{i}" for i in range(50)]
+
+    def test_flush_writes_in_background(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        audit = AuditLogger(str(path), flush_interval=60, batch_size=10)
+        _log(audit, 25)
+        assert audit.flush(timeout=5)
+        assert len(_ids(path)) == 25
+        audit.close()
+
+    def test_full_buffer_drops_oldest(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        audit = AuditLogger(str(path), buffer_size=3, flush_interval=60, batch_size=1000)
+        before = mcp_audit_events_dropped_total._value.get()
+        _log(audit, 5)
+        audit.close()
+        assert mcp_audit_events_dropped_total._value.get() - before == 2
+        assert _ids(path) == ["a2", "a3", "a4"]
+
+    def test_size_rotation_with_gzip(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        audit = AuditLogger(str(path), flush_interval=60, batch_size=5, max_bytes=200, compress="gzip")
+        for i in range(4):
+            _log(audit, 5, start=i * 5)
+            audit.flush(timeout=5)
+        audit.close()
+
+        segments = sorted(tmp_path.glob("audit.jsonl.*.gz"))
+        assert len(segments) == 3
+        rotated = [
+            json.loads(line)["audit_id"]
+            for seg in segments
+            for line in gzip.decompress(seg.read_bytes()).decode().splitlines()
+        ]
+        assert sorted(rotated + _ids(path), key=lambda a: int(a[1:])) == [f"a{i}" for i in range(20)]
+
+    def test_age_rotation(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        audit = AuditLogger(str(path), flush_interval=60, batch_size=1, max_age=0)
+        _log(audit, 2)
+        audit.close()
+        assert len(list(tmp_path.glob("audit.jsonl.*"))) >= 1
+
+    def test_logged_after_close_is_written_inline(self, tmp_path, caplog):
+        audit = AuditLogger(flush_interval=60)
+        audit.close()
+        with caplog.at_level("INFO", logger="mcp_proxy.audit"):
+            _log(audit, 1)
+        assert "MCP_AUDIT" in caplog.text
+
+
+@pytest.mark.unit
+class TestAuditStore:
+    """Test indexed audit lookups."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"), retention=0)
+        store.write([
+            AuditEvent(timestamp=100.0 + i, audit_id=f"a{i}", tool=f"tool{i % 2}", method="read",
+                       status="error" if i % 5 == 0 else "success")
+            for i in range(20)
+        ])
+        yield store
+        store.close()
+
+    def test_get_by_audit_id(self, store):
+        [event] = store.get("a7")
+        assert event["tool"] == "tool1"
+        assert event["timestamp"] == 107.0
+        assert store.get("missing") == []
+
+    def test_query_filters_newest_first(self, store):
+        events = store.query(tool="tool0", status="error")
+        assert [e["audit_id"] for e in events] == ["a10", "a0"]
+
+    def test_time_range_is_half_open(self, store):
+        events = store.query(since=105, until=108)
+        assert [e["audit_id"] for e in events] == ["a7", "a6", "a5"]
+
+    def test_limit(self, store):
+        assert len(store.query(limit=3)) == 3
+
+    def test_counts(self, store):
+        assert store.counts() == {
+            "tool0": {"error": 2, "success": 8},
+            "tool1": {"error": 2, "success": 8},
+        }
+
+    def test_logger_writes_through_to_store(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        audit = AuditLogger(flush_interval=60, store=store)
+        _log(audit, 3)
+        audit.flush(timeout=5)
+        assert [e["audit_id"] for e in store.query()] == ["a2", "a1", "a0"]
+        audit.close()
@@ -0,0 +1,103 @@
+"""Unit tests for the MCP gateway token-bucket rate limiters."""
+
+import pytest
+
+from mcp_proxy.ratelimit import RateLimiter, SQLiteRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "memory":
+        rl = RateLimiter(clock=clock)
+    else:
+        rl = SQLiteRateLimiter(path=str(tmp_path / "rl.db"), clock=clock)
+    rl.clock = clock
+    yield rl
+    rl.close()
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Test bucket semantics shared by both backends."""
+
+    def test_limit_then_deny(self, limiter):
+        assert all(limiter.is_allowed("t:m", 3, 60) for _ in range(3))
+        assert not limiter.is_allowed("t:m", 3, 60)
+
+    def test_refills_at_limit_per_window(self, limiter):
+        for _ in range(3):
+            limiter.is_allowed("t:m", 3, 60)
+        limiter.clock.now += 19
+        assert not limiter.is_allowed("t:m", 3, 60)
+        limiter.clock.now += 1
+        assert limiter.is_allowed("t:m", 3, 60)
+        assert not limiter.is_allowed("t:m", 3, 60)
+
+    def test_burst_caps_capacity(self, limiter):
+        assert all(limiter.is_allowed("t:m", 2, 60, burst=5) for _ in range(5))
+        assert not limiter.is_allowed("t:m", 2, 60, burst=5)
+        limiter.clock.now += 3600
+        assert sum(limiter.is_allowed("t:m", 2, 60, burst=5) for _ in range(10)) == 5
+
+    def test_keys_are_independent(self, limiter):
+        assert limiter.is_allowed("a:m", 1, 60)
+        assert not limiter.is_allowed("a:m", 1, 60)
+        assert limiter.is_allowed("b:m", 1, 60)
+
+
+    @pytest.mark.asyncio
+    async def test_async_check_matches_sync(self, limiter):
+        assert await limiter.is_allowed_async("t:m", 1, 60)
+        assert not await limiter.is_allowed_async("t:m", 1, 60)
+        assert not limiter.is_allowed("t:m", 1, 60)
+
+
+@pytest.mark.unit
+class TestEviction:
+    """Test that the in-memory limiter bounds its key set."""
+
+    def test_idle_keys_evicted(self):
+        clock = FakeClock()
+        rl = RateLimiter(idle_ttl=60, clock=clock)
+        for i in range(100):
+            rl.is_allowed(f"tool{i}:m", 10, 60)
+        clock.now += 61
+        rl.is_allowed("fresh:m", 10, 60)
+        assert len(rl) == 1
+
+    def test_max_keys_drops_oldest(self):
+        clock = FakeClock()
+        rl = RateLimiter(max_keys=3, clock=clock)
+        for key in ("a", "b", "c"):
+            rl.is_allowed(key, 10, 60)
+        rl.is_allowed("a", 10, 60)
+        rl.is_allowed("d", 10, 60)
+        assert list(rl._buckets) == ["c", "a", "d"]
+
+
+@pytest.mark.unit
+class TestSharedBackend:
+    """Two SQLite limiters on one file share buckets, like two workers."""
+
+    def test_workers_share_limit(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        a = SQLiteRateLimiter(path=path, clock=clock)
+        b = SQLiteRateLimiter(path=path, clock=clock)
+        try:
+            assert a.is_allowed("t:m", 2, 60)
+            assert b.is_allowed("t:m", 2, 60)
+            assert not a.is_allowed("t:m", 2, 60)
+            assert not b.is_allowed("t:m", 2, 60)
+        finally:
+            a.close()
+            b.close()
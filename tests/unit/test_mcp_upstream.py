@@ -0,0 +1,144 @@
+"""Unit tests for MCP upstream sessions against the local echo server."""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from mcp_proxy import echo_server
+from mcp_proxy.upstream import (
+    UpstreamConfig,
+    UpstreamError,
+    UpstreamNotConfigured,
+    UpstreamPool,
+    UpstreamTimeout,
+    iter_sse,
+)
+
+ECHO_COMMAND = [sys.executable, str(Path(echo_server.__file__))]
+
+
+def _echoed(result):
+    return json.loads(result["content"][0]["text"])
+
+
+@pytest.fixture
+async def stdio_pool():
+    pool = UpstreamPool({"mcp_echo": UpstreamConfig(name="mcp_echo", command=ECHO_COMMAND)})
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.unit
+class TestStdioUpstream:
+    """Test the persistent stdio session."""
+
+    @pytest.mark.asyncio
+    async def test_call_round_trip(self, stdio_pool):
+        result = await stdio_pool.call("mcp_echo", "echo", {"x": 1}, timeout=10)
+        assert _echoed(result) == {"name": "echo", "arguments": {"x": 1}}
+        assert stdio_pool.stats()["mcp_echo"]["server_info"]["name"] == "omni-echo"
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused(self, stdio_pool):
+        await stdio_pool.call("mcp_echo", "echo", {}, timeout=10)
+        first = await stdio_pool.session("mcp_echo")
+        await stdio_pool.call("mcp_echo", "echo", {}, timeout=10)
+        assert await stdio_pool.session("mcp_echo") is first
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_pipelined(self, stdio_pool):
+        await stdio_pool.call("mcp_echo", "echo", {}, timeout=10)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            stdio_pool.call("mcp_echo", "echo", {"i": i, "sleep_ms": 300}, timeout=10)
+            for i in range(10)
+        ))
+        assert time.perf_counter() - start < 1.5
+        assert [_echoed(r)["arguments"]["i"] for r in results] == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_timeout_leaves_session_usable(self, stdio_pool):
+        with pytest.raises(UpstreamTimeout):
+            await stdio_pool.call("mcp_echo", "echo", {"sleep_ms": 2000}, timeout=0.2)
+        result = await stdio_pool.call("mcp_echo", "echo", {"ok": True}, timeout=10)
+        assert _echoed(result)["arguments"] == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_tool_error_raises(self, stdio_pool):
+        with pytest.raises(UpstreamError, match="failed"):
+            await stdio_pool.call("mcp_echo", "echo", {"fail": True}, timeout=10)
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_process_exit(self, stdio_pool):
+        session = await stdio_pool.session("mcp_echo")
+        session._process.kill()
+        await session._process.wait()
+        for _ in range(50):
+            if session.closed:
+                break
+            await asyncio.sleep(0.02)
+
+        result = await stdio_pool.call("mcp_echo", "echo", {"again": 1}, timeout=10)
+        assert _echoed(result)["arguments"] == {"again": 1}
+        assert await stdio_pool.session("mcp_echo") is not session
+
+    @pytest.mark.asyncio
+    async def test_session_start_bounded_by_call_timeout(self):
+        # A process that never answers initialize
+        hung = [sys.executable, "-c", "import time; time.sleep(60)"]
+        pool = UpstreamPool({"mcp_hung": UpstreamConfig(name="mcp_hung", command=hung)})
+        try:
+            start = time.perf_counter()
+            with pytest.raises(UpstreamTimeout):
+                await pool.call("mcp_hung", "echo", {}, timeout=0.3)
+            assert time.perf_counter() - start < 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool(self, stdio_pool):
+        with pytest.raises(UpstreamNotConfigured):
+            await stdio_pool.call("mcp_missing", "x", {}, timeout=1)
+
+
+@pytest.mark.unit
+class TestHttpUpstream:
+    """Test the Streamable HTTP session via an in-process echo app."""
+
+    @pytest.mark.asyncio
+    async def test_call_and_session_header(self):
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=echo_server.create_app()))
+        pool = UpstreamPool(
+            {"mcp_echo": UpstreamConfig(name="mcp_echo", transport="http", url="http://echo/mcp")},
+            client,
+        )
+        try:
+            results = await asyncio.gather(*(
+                pool.call("mcp_echo", "echo", {"i": i}, timeout=10) for i in range(5)
+            ))
+            assert [_echoed(r)["arguments"]["i"] for r in results] == list(range(5))
+            session = await pool.session("mcp_echo")
+            assert session._session_id == "echo-session"
+        finally:
+            await pool.close()
+            await client.aclose()
+
+
+@pytest.mark.unit
+class TestSseParser:
+    """Test text/event-stream parsing."""
+
+    @pytest.mark.asyncio
+    async def test_events(self):
+        async def lines():
+            for line in [": keepalive", "event: endpoint", "data: /messages?s=1", "",
+                         "data: {\"a\":", "data: 1}", ""]:
+                yield line
+
+        events = [e async for e in iter_sse(lines())]
+        assert events == [("endpoint", "/messages?s=1"), ("message", "{\"a\":\n1}")]
@@ -1,12 +1,16 @@
 """Unit tests for Mem0 client wrapper."""
+import json
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from memory import mem0_client
 from memory.mem0_client import (
     Mem0Client,
     Memory,
+    MemoryQuery,
     MemorySearchResult,
     format_memories_for_context,
 )
@@ -275,3 +279,88 @@ class TestFormatMemoriesForContext:
         result = format_memories_for_context(memories, max_tokens=100)
 
         assert "truncated" in result
+
+
+def _client_with(handler):
+    client = Mem0Client(base_url="http://mem0")
+    client._client = httpx.AsyncClient(base_url="http://mem0", transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.unit
+class TestSearchMany:
+    """Test batched multi-user search."""
+
+    QUERIES = [
+        MemoryQuery(query="languages", user_id="alice", limit=2),
+        MemoryQuery(query="editor", user_id="bob", limit=1, agent_id="omni"),
+    ]
+
+    @pytest.mark.asyncio
+    async def test_single_batch_request(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"results": [
+                {"results": [{"id": f"{q['user_id']}-1", "memory": q["query"], "score": 0.9}]}
+                for q in body["queries"]
+            ]})
+
+        client = _client_with(handler)
+        results = await client.search_many(self.QUERIES)
+
+        assert len(requests) == 1
+        assert requests[0].url.path == "/v1/memories/search/batch/"
+        sent = json.loads(requests[0].content)["queries"]
+        assert sent[0] == {"query": "languages", "user_id": "alice", "limit": 2}
+        assert sent[1]["agent_id"] == "omni"
+        assert [r.query for r in results] == ["languages", "editor"]
+        assert [r.memories[0].id for r in results] == ["alice-1", "bob-1"]
+
+    @pytest.mark.asyncio
+    async def test_per_query_error_is_empty(self):
+        def handler(request):
+            return httpx.Response(200, json={"results": [
+                {"results": [{"id": "m1", "memory": "x"}]},
+                {"results": [], "error": "qdrant timeout"},
+            ]})
+
+        results = await _client_with(handler).search_many(self.QUERIES)
+        assert [r.total_count for r in results] == [1, 0]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_without_batch_endpoint(self):
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path.endswith("/batch/"):
+                return httpx.Response(404)
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"results": [{"id": body["user_id"], "memory": body["query"]}]})
+
+        client = _client_with(handler)
+        results = await client.search_many(self.QUERIES)
+        assert [r.memories[0].id for r in results] == ["alice", "bob"]
+
+        await client.search_many(self.QUERIES)
+        assert paths.count("/v1/memories/search/batch/") == 1
+
+    @pytest.mark.asyncio
+    async def test_large_batches_are_chunked(self, monkeypatch):
+        monkeypatch.setattr(mem0_client, "MEM0_SEARCH_BATCH_SIZE", 2)
+        sizes = []
+
+        def handler(request):
+            queries = json.loads(request.content)["queries"]
+            sizes.append(len(queries))
+            return httpx.Response(200, json={"results": [
+                {"results": [{"id": q["query"], "memory": ""}]} for q in queries
+            ]})
+
+        queries = [MemoryQuery(query=str(i), user_id="u") for i in range(5)]
+        results = await _client_with(handler).search_many(queries)
+        assert sorted(sizes) == [1, 2, 2]
+        assert [r.memories[0].id for r in results] == ["0", "1", "2", "3", "4"]
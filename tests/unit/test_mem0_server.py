@@ -0,0 +1,114 @@
+"""Unit tests for the Mem0 server's batched search endpoint."""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+SERVER_PATH = Path(__file__).resolve().parents[2] / "docker" / "server_mem0.py"
+
+
+@pytest.fixture(scope="module")
+def server():
+    """docker/server_mem0.py loaded once (its metrics register at import).
+
+    A stand-in mem0 module is used while loading if the real one is absent.
+    """
+    stub = importlib.util.find_spec("mem0") is None
+    if stub:
+        sys.modules["mem0"] = types.SimpleNamespace(Memory=object)
+    try:
+        spec = importlib.util.spec_from_file_location("server_mem0_under_test", SERVER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if stub:
+            del sys.modules["mem0"]
+    return module
+
+
+class FakeVectorStore:
+    def __init__(self, fail_users=()):
+        self.fail_users = set(fail_users)
+        self.calls = []
+
+    def search(self, query, vectors, limit, filters):
+        self.calls.append(filters["user_id"])
+        if filters["user_id"] in self.fail_users:
+            raise TypeError("search() got an unexpected keyword argument 'vectors'")
+        return [SimpleNamespace(id="v1", score=0.9, payload={"data": f"fast {query}"})]
+
+
+class FakeMemory:
+    def __init__(self, vector_store, enable_graph=False):
+        self.vector_store = vector_store
+        self.enable_graph = enable_graph
+        self.searched = []
+
+    def search(self, query, user_id, limit, agent_id=None):
+        self.searched.append(user_id)
+        return {"results": [{"id": "m1", "memory": f"slow {query}"}]}
+
+
+class FakeBatcher:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def embed_many(self, texts):
+        if self.fail:
+            raise RuntimeError("embedder down")
+        return [[0.1, 0.2] for _ in texts]
+
+
+def _request(server, *users):
+    return server.BatchSearchRequest(queries=[
+        server.BatchSearchQuery(query=f"q-{u}", user_id=u) for u in users
+    ])
+
+
+@pytest.mark.unit
+class TestBatchSearch:
+    """Test the batched lookup and its Memory.search fallback."""
+
+    @pytest.mark.asyncio
+    async def test_vector_lookup_per_query(self, server, monkeypatch):
+        memory = FakeMemory(FakeVectorStore())
+        monkeypatch.setattr(server, "memory", memory)
+        monkeypatch.setattr(server, "batcher", FakeBatcher())
+
+        body = await server.search_memory_batch(_request(server, "alice", "bob"))
+        assert [r["results"][0]["memory"] for r in body["results"]] == [
+            "fast q-alice", "fast q-bob",
+        ]
+        assert memory.searched == []
+
+    @pytest.mark.asyncio
+    async def test_failed_vector_lookup_falls_back_per_query(self, server, monkeypatch):
+        memory = FakeMemory(FakeVectorStore(fail_users={"bob"}))
+        monkeypatch.setattr(server, "memory", memory)
+        monkeypatch.setattr(server, "batcher", FakeBatcher())
+
+        body = await server.search_memory_batch(_request(server, "alice", "bob"))
+        assert [r["results"][0]["memory"] for r in body["results"]] == [
+            "fast q-alice", "slow q-bob",
+        ]
+        assert all("error" not in r for r in body["results"])
+        assert memory.searched == ["bob"]
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_or_graph_store_uses_memory_search(self, server, monkeypatch):
+        memory = FakeMemory(FakeVectorStore())
+        monkeypatch.setattr(server, "memory", memory)
+        monkeypatch.setattr(server, "batcher", FakeBatcher(fail=True))
+        body = await server.search_memory_batch(_request(server, "alice"))
+        assert body["results"][0]["results"][0]["memory"] == "slow q-alice"
+
+        memory = FakeMemory(FakeVectorStore(), enable_graph=True)
+        monkeypatch.setattr(server, "memory", memory)
+        monkeypatch.setattr(server, "batcher", FakeBatcher())
+        await server.search_memory_batch(_request(server, "alice"))
+        assert memory.vector_store.calls == []
+        assert memory.searched == ["alice"]
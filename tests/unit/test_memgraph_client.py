@@ -0,0 +1,99 @@
+"""Unit tests for the Memgraph client query batching."""
+
+import pytest
+
+from knowledge.memgraph_client import MemgraphClient, _extract_search_terms
+
+
+class FakeAsyncResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        self._iter = iter(self._records)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeAsyncSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.driver.queries.append((query, params))
+        return FakeAsyncResult(self.driver.records)
+
+
+class FakeAsyncDriver:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def session(self):
+        return FakeAsyncSession(self)
+
+
+def _node(name, qualified_name):
+    return {"name": name, "qualified_name": qualified_name, "line_start": 1}
+
+
+@pytest.mark.unit
+class TestSearchTerms:
+    """Test symbol-name extraction from prompts."""
+
+    def test_skips_keywords_and_short_words(self):
+        terms = _extract_search_terms("where is the function that calls parse_request in GraphState")
+        assert terms == ["calls", "parse_request", "GraphState"]
+
+    def test_caps_and_deduplicates(self):
+        terms = _extract_search_terms("alpha beta alpha gamma delta epsilon zeta", max_terms=3)
+        assert terms == ["alpha", "beta", "gamma"]
+
+
+@pytest.mark.unit
+class TestGetCodeContextAsync:
+    """Test the batched async code-context lookup."""
+
+    @pytest.mark.asyncio
+    async def test_single_batched_query(self):
+        driver = FakeAsyncDriver([
+            {"idx": 0, "s": _node("parse_request", "agent.nodes.parse_request"), "kind": "Function", "file_path": "nodes/routing.py"},
+            {"idx": 1, "s": _node("GraphState", "agent.nodes.state.GraphState"), "kind": "Class", "file_path": "nodes/state.py"},
+            {"idx": 1, "s": _node("parse_request", "agent.nodes.parse_request"), "kind": "Function", "file_path": "nodes/routing.py"},
+        ])
+        client = MemgraphClient(uri="bolt://unused:7687")
+        client._async_driver = driver
+
+        context = await client.get_code_context_async("where is parse_request used with GraphState")
+
+        assert len(driver.queries) == 1
+        query, params = driver.queries[0]
+        assert "UNWIND" in query
+        assert params["terms"] == ["parse_request", "used", "with", "GraphState"]
+        assert [s.qualified_name for s in context.symbols] == [
+            "agent.nodes.parse_request",
+            "agent.nodes.state.GraphState",
+        ]
+        assert context.symbols[1].kind == "Class"
+
+    @pytest.mark.asyncio
+    async def test_no_terms_skips_query(self):
+        driver = FakeAsyncDriver([])
+        client = MemgraphClient(uri="bolt://unused:7687")
+        client._async_driver = driver
+
+        context = await client.get_code_context_async("what is it")
+
+        assert context.symbols == []
+        assert driver.queries == []
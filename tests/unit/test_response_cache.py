@@ -0,0 +1,205 @@
+"""Unit tests for the response cache."""
+
+import time
+
+import pytest
+
+from agent.response_cache import (
+    CachedResponse,
+    MemoryBackend,
+    ResponseCache,
+    SQLiteBackend,
+    make_cache_key,
+)
+
+
+def _entry(text: str = "cached answer", ttl: float = 60) -> CachedResponse:
+    now = time.time()
+    return CachedResponse(response=text, model_name="qwen-executor", created_at=now, expires_at=now + ttl)
+
+
+@pytest.mark.unit
+class TestCacheKey:
+    """Test key normalization."""
+
+    def test_whitespace_and_case_share_key(self):
+        a = make_cache_key([{"role": "user", "content": "Explain  GIL"}], "qwen", 0.0, 512)
+        b = make_cache_key([{"role": "user", "content": "explain gil "}], "qwen", 0.0, 512)
+        assert a == b
+
+    def test_model_and_temperature_change_key(self):
+        messages = [{"role": "user", "content": "Explain GIL"}]
+        base = make_cache_key(messages, "qwen", 0.0, 512)
+        assert make_cache_key(messages, "deepseek", 0.0, 512) != base
+        assert make_cache_key(messages, "qwen", 0.2, 512) != base
+
+
+@pytest.mark.unit
+class TestMemoryBackend:
+    """Test TTL and LRU eviction."""
+
+    def test_expired_entry_is_dropped(self):
+        backend = MemoryBackend(max_entries=10, max_bytes=1024)
+        backend.set("k", _entry(ttl=-1))
+        assert backend.get("k") is None
+        assert len(backend) == 0
+
+    def test_lru_eviction_by_count(self):
+        backend = MemoryBackend(max_entries=2, max_bytes=1024)
+        backend.set("a", _entry())
+        backend.set("b", _entry())
+        backend.get("a")
+        backend.set("c", _entry())
+        assert backend.get("a") is not None
+        assert backend.get("b") is None
+        assert backend.get("c") is not None
+
+    def test_eviction_by_bytes(self):
+        backend = MemoryBackend(max_entries=10, max_bytes=10)
+        backend.set("a", _entry("123456"))
+        backend.set("b", _entry("abcdef"))
+        assert backend.get("a") is None
+        assert backend.get("b") is not None
+
+
+@pytest.mark.unit
+class TestSQLiteBackend:
+    """Test the on-disk tier."""
+
+    def test_entries_survive_reopen(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        backend = SQLiteBackend(path, max_entries=10)
+        backend.set("k", _entry("persisted"))
+        backend.close()
+
+        reopened = SQLiteBackend(path, max_entries=10)
+        entry = reopened.get("k")
+        reopened.close()
+        assert entry is not None
+        assert entry.response == "persisted"
+
+    def test_size_bound(self, tmp_path):
+        backend = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=2)
+        for key in ("a", "b", "c"):
+            backend.set(key, _entry())
+            time.sleep(0.01)
+        assert backend.get("a") is None
+        assert backend.get("c") is not None
+        backend.close()
+
+
+class _FakeEmbedder:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def embed(self, text):
+        return self.vectors[text]
+
+    def close(self):
+        pass
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test tiered lookups and bypass rules."""
+
+    def test_temperature_bypass(self):
+        cache = ResponseCache(memory=MemoryBackend(10, 1024), max_temperature=0.0)
+        assert cache.bypass_reason(0.7) == "temperature"
+        assert cache.bypass_reason(0.0) is None
+
+    @pytest.mark.asyncio
+    async def test_disk_hit_promotes_to_memory(self, tmp_path):
+        disk = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=10)
+        disk.set("k", _entry("from disk"))
+        cache = ResponseCache(memory=MemoryBackend(10, 1024), disk=disk)
+
+        entry, tier = await cache.lookup("k")
+        assert tier == "disk"
+        assert entry.response == "from disk"
+
+        _, tier = await cache.lookup("k")
+        assert tier == "memory"
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit_within_scope(self):
+        embedder = _FakeEmbedder({
+            "what is the gil?": [1.0, 0.0],
+            "what's the gil?": [0.99, 0.05],
+            "what is numa?": [0.0, 1.0],
+        })
+        cache = ResponseCache(memory=MemoryBackend(10, 4096), embedder=embedder, similarity=0.95)
+        await cache.store("k1", "GIL answer", "qwen", scope="s1", prompt="What is the GIL?")
+
+        entry, tier = await cache.lookup("k2", scope="s1", prompt="What's the GIL?")
+        assert tier == "semantic"
+        assert entry.response == "GIL answer"
+
+        entry, _ = await cache.lookup("k3", scope="s2", prompt="What's the GIL?")
+        assert entry is None
+
+        entry, _ = await cache.lookup("k4", scope="s1", prompt="What is NUMA?")
+        assert entry is None
+
+
+@pytest.mark.unit
+class TestCacheNodes:
+    """Test the graph nodes around call_model."""
+
+    @pytest.mark.asyncio
+    async def test_store_then_hit(self, monkeypatch):
+        from agent.nodes import cache as cache_nodes
+        from agent.nodes.state import ComplexityLevel
+
+        cache = ResponseCache(memory=MemoryBackend(10, 4096), max_temperature=0.0)
+        monkeypatch.setattr(cache_nodes, "get_response_cache", lambda: cache)
+
+        state = {
+            "prompt": "What is the GIL?",
+            "messages": [{"role": "user", "content": "What is the GIL?"}],
+            "temperature": 0.0,
+            "max_tokens": 256,
+            "complexity": ComplexityLevel.ROUTINE,
+        }
+
+        miss = await cache_nodes.check_response_cache(state)
+        assert miss["cache_hit"] is False
+
+        state.update(miss)
+        state.update({"response": "The GIL is a mutex.", "model_name": "qwen-executor"})
+        await cache_nodes.cache_response(state)
+
+        hit = await cache_nodes.check_response_cache(state)
+        assert hit["cache_hit"] is True
+        assert hit["response"] == "The GIL is a mutex."
+
+    @pytest.mark.asyncio
+    async def test_unverified_response_not_stored(self, monkeypatch):
+        from agent.nodes import cache as cache_nodes
+
+        cache = ResponseCache(memory=MemoryBackend(10, 4096))
+        monkeypatch.setattr(cache_nodes, "get_response_cache", lambda: cache)
+
+        await cache_nodes.cache_response({
+            "cache_key": "k",
+            "response": "meh",
+            "metacog_passed": True,
+            "metacog_verdict": "passed_after_max_retries:too_short",
+        })
+        assert cache.memory.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_overflowed_response_not_stored(self, monkeypatch):
+        from agent.nodes import cache as cache_nodes
+
+        cache = ResponseCache(memory=MemoryBackend(10, 4096))
+        monkeypatch.setattr(cache_nodes, "get_response_cache", lambda: cache)
+
+        await cache_nodes.cache_response({
+            "cache_key": "k",
+            "response": "Answered by the Executor instead.",
+            "model_name": "qwen-executor",
+            "overflowed": True,
+        })
+        assert cache.memory.get("k") is None
@@ -0,0 +1,157 @@
+"""Unit tests for the per-user memory retrieval cache."""
+
+import json
+
+import httpx
+import pytest
+
+from memory.mem0_client import Mem0Client
+from memory.retrieval_cache import RetrievalCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.mark.unit
+class TestRetrievalCache:
+    """Test keying, expiry, bounds and invalidation."""
+
+    def test_normalized_keys_match(self):
+        assert normalize_query("  What's my EDITOR?? ") == normalize_query("what s my editor")
+        assert RetrievalCache.key("Hi there", 5) != RetrievalCache.key("Hi there", 3)
+
+    def test_hit_until_ttl(self, clock):
+        cache = RetrievalCache(ttl=10, clock=clock)
+        key = cache.key("q", 5)
+        cache.put("alice", key, "result")
+        clock.now = 9.9
+        assert cache.get("alice", key) == "result"
+        clock.now = 10.0
+        assert cache.get("alice", key) is None
+        assert len(cache) == 0
+
+    def test_users_are_isolated_and_invalidated(self, clock):
+        cache = RetrievalCache(clock=clock)
+        key = cache.key("q", 5)
+        cache.put("alice", key, "a")
+        cache.put("bob", key, "b")
+        cache.invalidate("alice")
+        assert cache.get("alice", key) is None
+        assert cache.get("bob", key) == "b"
+
+    def test_put_after_invalidate_is_dropped(self, clock):
+        cache = RetrievalCache(clock=clock)
+        key = cache.key("q", 5)
+        generation = cache.generation("alice")
+        cache.invalidate("alice")
+        cache.put("alice", key, "stale", generation)
+        assert cache.get("alice", key) is None
+        cache.put("alice", key, "fresh", cache.generation("alice"))
+        assert cache.get("alice", key) == "fresh"
+
+    def test_invalidation_records_are_bounded(self, clock):
+        cache = RetrievalCache(max_entries=2, clock=clock)
+        generation = cache.generation("alice")
+        for user_id in ("alice", "bob", "carol"):
+            cache.invalidate(user_id)
+        assert len(cache._invalidated) == 2
+        # alice's record was forgotten: an older in-flight put is still dropped
+        cache.put("alice", "k", "stale", generation)
+        assert cache.get("alice", "k") is None
+        cache.put("alice", "k", "fresh", cache.generation("alice"))
+        assert cache.get("alice", "k") == "fresh"
+
+    def test_per_user_bound(self, clock):
+        cache = RetrievalCache(max_per_user=2, clock=clock)
+        for q in ("a", "b", "c"):
+            cache.put("alice", cache.key(q, 5), q)
+        assert cache.get("alice", cache.key("a", 5)) is None
+        assert len(cache) == 2
+
+    def test_global_bound_evicts_least_recent_user(self, clock):
+        cache = RetrievalCache(max_entries=2, clock=clock)
+        cache.put("alice", "k", 1)
+        cache.put("bob", "k", 2)
+        cache.get("alice", "k")
+        cache.put("carol", "k", 3)
+        assert cache.get("bob", "k") is None
+        assert cache.get("alice", "k") == 1
+        assert cache.stats()["entries"] == 2
+
+    def test_hit_ratio(self, clock):
+        cache = RetrievalCache(clock=clock)
+        cache.put("u", "k", 1)
+        cache.get("u", "k")
+        cache.get("u", "other")
+        assert cache.stats()["hit_ratio"] == 0.5
+
+
+@pytest.mark.unit
+class TestMem0ClientCaching:
+    """Test the cache in front of Mem0Client.search_memory."""
+
+    def _client(self, handler):
+        client = Mem0Client(base_url="http://mem0", retrieval_cache=RetrievalCache())
+        client._client = httpx.AsyncClient(
+            base_url="http://mem0", transport=httpx.MockTransport(handler)
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_follow_up_served_from_cache_until_store(self):
+        searches = []
+
+        def handler(request):
+            if request.url.path == "/v1/memories/search/":
+                searches.append(json.loads(request.content)["query"])
+                return httpx.Response(200, json={"results": [{"id": "m1", "memory": "likes vim"}]})
+            return httpx.Response(200, json={"id": "new"})
+
+        client = self._client(handler)
+        await client.search_memory("Which editor do I use?", "alice")
+        result = await client.search_memory("which editor do I use", "alice")
+        assert result.memories[0].id == "m1"
+        assert len(searches) == 1
+
+        await client.store_memory("switched to emacs", "alice")
+        await client.search_memory("which editor do I use", "alice")
+        assert len(searches) == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+
+        client = self._client(handler)
+        first = await client.search_memory("q", "alice")
+        await client.search_memory("q", "alice")
+        assert first.error
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_search_in_flight_across_store_is_not_cached(self):
+        searches = []
+
+        def handler(request):
+            searches.append(request)
+            # store_memory for the same user lands while the search is running
+            client.retrieval_cache.invalidate("alice")
+            return httpx.Response(200, json={"results": [{"id": "m1", "memory": "likes vim"}]})
+
+        client = self._client(handler)
+        await client.search_memory("which editor do I use", "alice")
+        await client.search_memory("which editor do I use", "alice")
+        assert len(searches) == 2
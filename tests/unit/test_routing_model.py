@@ -0,0 +1,232 @@
+"""Unit tests for the learned complexity classifier and routing log."""
+
+import json
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agent.nodes import classification  # noqa: E402
+from agent.nodes.state import ComplexityLevel  # noqa: E402
+from agent.routing_log import RoutingLog  # noqa: E402
+from agent.routing_model import (  # noqa: E402
+    RoutingModel,
+    calibrate_threshold,
+    features,
+    label_from_outcome,
+    route_metrics,
+    train,
+)
+
+ROUTINE = [
+    "check the spelling in this docstring",
+    "what does the system prompt say",
+    "write a list comprehension that squares numbers",
+    "rename this variable to snake case",
+    "convert this loop to a dict comprehension",
+    "add type hints to this function",
+]
+COMPLEX = [
+    "design a sharded storage layer with failover",
+    "prove that this scheduler never deadlocks",
+    "plan a migration of the kernel module across three clusters",
+    "analyze the race condition between the flusher and close",
+    "architect a multi region deployment with consistent reads",
+    "derive the power efficiency ratio under varying voltage",
+]
+
+
+def _dataset(repeat=20):
+    rows, labels = [], []
+    for _ in range(repeat):
+        rows += [(p, 0) for p in ROUTINE] + [(p, 0) for p in COMPLEX]
+        labels += ["routine"] * len(ROUTINE) + ["complex"] * len(COMPLEX)
+    return rows, labels
+
+
+@pytest.fixture(scope="module")
+def model():
+    rows, labels = _dataset()
+    return train(rows, labels, n_features=1 << 14, epochs=5)
+
+
+@pytest.mark.unit
+class TestFeatures:
+    """Test hashed n-gram features."""
+
+    def test_stable_and_bounded(self):
+        a = features("Refactor the router", 2, 1 << 10)
+        b = features("refactor  the ROUTER", 2, 1 << 10)
+        assert np.array_equal(a, b)
+        assert a.max() < 1 << 10
+        # 3 unigrams + 2 bigrams + length + depth
+        assert len(a) == 7
+
+
+@pytest.mark.unit
+class TestRoutingModel:
+    """Test training, scoring and persistence."""
+
+    def test_separates_training_classes(self, model):
+        assert model.classify("check the spelling in this docstring")[0] == "routine"
+        assert model.classify("design a sharded storage layer with failover")[0] == "complex"
+
+    def test_keyword_alone_does_not_escalate(self, model):
+        label, p_oracle = model.classify("check what the system prompt says")
+        assert label == "routine"
+        assert p_oracle < 0.5
+
+    def test_scoring_under_a_millisecond(self, model):
+        prompt = "analyze the race condition between the flusher and close " * 10
+        model.classify(prompt)
+        start = time.perf_counter()
+        for _ in range(200):
+            model.classify(prompt)
+        assert (time.perf_counter() - start) / 200 < 0.001
+
+    def test_batch_matches_single(self, model):
+        rows = [(p, 1) for p in ROUTINE[:3]]
+        batch = model.predict_proba_batch(rows)
+        for row, proba in zip(rows, batch):
+            assert np.allclose(model.predict_proba(*row), proba, atol=1e-5)
+
+    def test_save_load_round_trip(self, model, tmp_path):
+        model.threshold = 0.7
+        path = str(tmp_path / "router.npz")
+        model.save(path)
+        loaded = RoutingModel.load(path)
+        assert loaded.classes == model.classes
+        assert loaded.threshold == pytest.approx(0.7)
+        prompt = "plan a migration"
+        assert np.allclose(loaded.predict_proba(prompt), model.predict_proba(prompt))
+
+    def test_threshold_moves_decision(self, model):
+        proba = model.predict_proba("plan a migration of the kernel module across three clusters")
+        assert model.decide(proba, threshold=0.0)[0] == "complex"
+        assert model.decide(proba, threshold=1.01)[0] == "routine"
+
+    def test_single_class_rejected(self):
+        with pytest.raises(ValueError):
+            train([("a", 0), ("b", 0)], ["routine", "routine"], n_features=64)
+
+
+@pytest.mark.unit
+class TestEvaluationHelpers:
+    """Test labels, metrics and threshold calibration."""
+
+    def test_label_from_outcome(self):
+        assert label_from_outcome({"label": "deepseek"}) == "complex"
+        assert label_from_outcome({"endpoint": "qwen", "complexity": "trivial"}) == "trivial"
+        failed = {"endpoint": "qwen", "complexity": "routine", "metacog_passed": False}
+        assert label_from_outcome(failed) == "complex"
+        replayed = {"endpoint": "deepseek", "complexity": "complex", "qwen_passed": True}
+        assert label_from_outcome(replayed) == "routine"
+        assert label_from_outcome({"endpoint": "deepseek", "complexity": "complex"}) == "complex"
+        assert label_from_outcome({"endpoint": "qwen", "error": "timeout"}) is None
+
+    def test_manual_override_is_not_a_label(self):
+        forced = {
+            "endpoint": "deepseek", "complexity": "complex", "model": "deepseek-v3.2",
+            "routing_reason": "Manual override: deepseek-v3.2", "override": True,
+        }
+        assert label_from_outcome(forced) is None
+        assert label_from_outcome({**forced, "label": "routine"}) == "routine"
+        # Older records without the override field
+        legacy = {k: v for k, v in forced.items() if k != "override"}
+        assert label_from_outcome(legacy) is None
+
+    def test_unknown_model_name_is_auto_routed(self):
+        record = {
+            "endpoint": "deepseek", "complexity": "complex", "model": "gpt-4o",
+            "routing_reason": "Complex indicator: 'architecture'", "override": False,
+        }
+        assert label_from_outcome(record) == "complex"
+
+    def test_route_metrics(self):
+        m = route_metrics(
+            ["complex", "routine", "routine", "complex"],
+            ["complex", "complex", "routine", "routine"],
+        )
+        assert m.oracle_share == 0.5
+        assert m.oracle_recall == 0.5
+        assert m.accuracy == 0.5
+
+    def test_calibrate_threshold(self):
+        p = np.array([0.9, 0.6, 0.3, 0.8, 0.1])
+        labels = ["complex", "complex", "complex", "routine", "routine"]
+        assert calibrate_threshold(p, labels, 2 / 3, max_threshold=1.0) == pytest.approx(0.6)
+        assert calibrate_threshold(p, labels, 1.0) == pytest.approx(0.3)
+        assert calibrate_threshold(p, labels, 1 / 3) == pytest.approx(0.5)
+
+
+@pytest.mark.unit
+class TestClassifierBackend:
+    """Test backend selection in the classification node."""
+
+    def test_linear_backend(self, model, tmp_path):
+        model.threshold = 0.5
+        path = str(tmp_path / "router.npz")
+        model.save(path)
+        backend = classification._load_classifier("linear", path)
+        assert backend.name == "linear"
+        complexity, reason = backend.classify("design a sharded storage layer with failover", 0)
+        assert complexity == ComplexityLevel.COMPLEX
+        assert reason.startswith("Routing model")
+
+    def test_missing_model_falls_back(self, tmp_path):
+        backend = classification._load_classifier("linear", str(tmp_path / "missing.npz"))
+        assert backend.name == "heuristic"
+
+    def test_node_uses_configured_backend(self, model, monkeypatch):
+        model.threshold = 0.5
+        monkeypatch.setattr(classification, "_classifier", classification.LinearClassifier(model))
+        result = classification.classify_complexity(
+            {"prompt": "check the spelling in this docstring"}
+        )
+        assert result["complexity"] == ComplexityLevel.ROUTINE
+        assert result["model_name"] == "qwen2.5-coder-7b"
+
+    def test_borderline_reuses_classify_score(self, model, monkeypatch):
+        model.threshold = 0.5
+        backend = classification.LinearClassifier(model)
+        calls = []
+        real_classify = model.classify
+
+        def classify(prompt, context_count):
+            calls.append(prompt)
+            return real_classify(prompt, context_count)
+
+        monkeypatch.setattr(model, "classify", classify)
+        prompt = "design a sharded storage layer with failover"
+        backend.classify(prompt, 0)
+        backend.is_borderline(prompt, 0)
+        assert calls == [prompt]
+        backend.is_borderline("another prompt", 0)
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestRoutingLog:
+    """Test routing outcome records."""
+
+    def test_record_round_trips_to_label(self, tmp_path, monkeypatch):
+        from agent import routing_log
+
+        path = tmp_path / "routing.jsonl"
+        monkeypatch.setattr(routing_log, "_routing_log", RoutingLog(str(path)))
+        routing_log.record_outcome({
+            "prompt": "rename this variable",
+            "messages": [{"role": "user", "content": "rename this variable"}],
+            "complexity": ComplexityLevel.ROUTINE,
+            "metacog_passed": True,
+        })
+        routing_log.record_outcome({"prompt": "status", "is_status_query": True})
+        routing_log.close_routing_log()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 1
+        assert records[0]["endpoint"] == "qwen"
+        assert records[0]["context_messages"] == 0
+        assert records[0]["override"] is False
+        assert label_from_outcome(records[0]) == "routine"
@@ -0,0 +1,94 @@
+"""Unit tests for the local memory-mapped symbol index."""
+
+import pytest
+
+from knowledge.memgraph_client import CodeSymbol, MemgraphClient
+from knowledge.symbol_index import SymbolIndex, build_symbol_index
+
+
+def _symbols():
+    return [
+        CodeSymbol(name="parse_request", qualified_name="agent.nodes.routing.parse_request",
+                   kind="Function", signature="def parse_request(state)", file_path="/src/agent/nodes/routing.py",
+                   line_start=10, line_end=30),
+        CodeSymbol(name="GraphState", qualified_name="agent.nodes.state.GraphState",
+                   kind="Class", docstring="State passed between nodes", file_path="/src/agent/nodes/state.py",
+                   line_start=40, line_end=80),
+        CodeSymbol(name="request_parser", qualified_name="agent.util.request_parser",
+                   kind="Function", file_path="/src/agent/util.py"),
+        CodeSymbol(name="parse", qualified_name="agent.util.parse", kind="Function", file_path="/src/agent/util.py"),
+        CodeSymbol(name="Ignored", qualified_name="agent.util.Ignored", kind="Import"),
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "symbols.idx")
+    assert build_symbol_index(_symbols(), path) == 4
+    idx = SymbolIndex.open(path)
+    yield idx
+    idx.close()
+
+
+@pytest.mark.unit
+class TestSymbolIndex:
+    """Test lookups against the on-disk index."""
+
+    def test_round_trip_fields(self, index):
+        [symbol] = index.lookup("GraphState")
+        assert symbol.qualified_name == "agent.nodes.state.GraphState"
+        assert symbol.kind == "Class"
+        assert symbol.docstring == "State passed between nodes"
+        assert (symbol.line_start, symbol.line_end) == (40, 80)
+
+    def test_find_is_contains_and_ranked(self, index):
+        names = [s.name for s in index.find("parse")]
+        assert names == ["parse", "parse_request", "request_parser"]
+
+    def test_find_is_case_sensitive(self, index):
+        assert index.find("graphstate") == []
+        assert [s.name for s in index.find("State")] == ["GraphState"]
+
+    def test_kind_filter(self, index):
+        assert index.find("parse", kind="Class") == []
+        assert len(index.find("parse", kind="Function")) == 3
+
+    def test_unindexed_kind_matches_nothing(self, index):
+        assert index.find("parse", kind="Method") == []
+        assert index.prefix("parse", kind="Symbol") == []
+        assert index.lookup("parse", kind="Method") == []
+
+    def test_prefix_is_case_insensitive(self, index):
+        assert [s.name for s in index.prefix("graph")] == ["GraphState"]
+        assert [s.name for s in index.prefix("parse")] == ["parse", "parse_request"]
+
+    def test_short_term_scans(self, index):
+        assert {s.name for s in index.find("re")} == {"parse_request", "request_parser"}
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "bogus.idx"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            SymbolIndex.open(str(path))
+
+
+@pytest.mark.unit
+class TestMemgraphClientIndexPath:
+    """MemgraphClient answers name lookups from the index without Bolt."""
+
+    @pytest.mark.asyncio
+    async def test_code_context_uses_index(self, tmp_path):
+        path = str(tmp_path / "symbols.idx")
+        build_symbol_index(_symbols(), path)
+        client = MemgraphClient(uri="bolt://unused:7687", symbol_index_path=path)
+
+        def no_bolt():
+            raise AssertionError("Bolt driver must not be used")
+
+        client._get_driver = no_bolt
+        client._get_async_driver = no_bolt
+
+        context = await client.get_code_context_async("where is parse_request defined")
+        assert [s.name for s in context.symbols] == ["parse_request"]
+
+        assert [s.name for s in client.find_symbol("Graph", kind="Class")] == ["GraphState"]
@@ -0,0 +1,73 @@
+"""Unit tests for the pooled inference transport."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agent.nodes.state import ModelEndpoint
+from agent.transport import InferenceTransport, inference_connections_total
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def _count(key: str, reused: str) -> float:
+    return inference_connections_total.labels(endpoint=key, reused=reused)._value.get()
+
+
+@pytest.mark.unit
+class TestInferenceTransport:
+    """Test connection pooling and reuse accounting."""
+
+    def test_keep_alive_connection_is_reused(self, chat_server):
+        """Sequential requests should share one TCP connection."""
+        endpoint = ModelEndpoint(name="test", url=chat_server, model_id="test", timeout=5)
+        transport = InferenceTransport("test-reuse", endpoint)
+        try:
+            for _ in range(3):
+                response = transport.post("/chat/completions", {"messages": []})
+                assert response.status_code == 200
+        finally:
+            transport.close()
+
+        assert _count("test-reuse", "false") == 1
+        assert _count("test-reuse", "true") == 2
+        assert transport.in_flight == 0
+
+    def test_close_then_reopen(self, chat_server):
+        """A closed transport should lazily reopen on next use."""
+        endpoint = ModelEndpoint(name="test", url=chat_server, model_id="test", timeout=5)
+        transport = InferenceTransport("test-reopen", endpoint)
+        transport.post("/chat/completions", {})
+        transport.close()
+
+        response = transport.post("/chat/completions", {})
+        transport.close()
+
+        assert response.status_code == 200
+        assert _count("test-reopen", "false") == 2
@@ -0,0 +1,153 @@
+"""Unit tests for the write-behind memory queue."""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict
+
+import pytest
+
+from memory.write_behind import MemoryWrite, WriteBehindQueue
+
+
+class FakeMem0:
+    """Records store calls; fails the first `fail_times` calls."""
+
+    def __init__(self, fail_times: int = 0, delay: float = 0.0):
+        self.fail_times = fail_times
+        self.delay = delay
+        self.calls = 0
+        self.stored = []
+        self.active = 0
+        self.max_active = 0
+
+    async def store_memory(
+        self, content, user_id, metadata=None, agent_id=None, raise_on_error=False
+    ):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.calls <= self.fail_times:
+                raise RuntimeError("mem0 unavailable")
+            self.stored.append(content)
+            return f"mem-{len(self.stored)}"
+        finally:
+            self.active -= 1
+
+
+async def _wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def _write(i: int) -> MemoryWrite:
+    return MemoryWrite(content=f"fact {i}", user_id="user-1")
+
+
+@pytest.mark.unit
+class TestWriteBehindQueue:
+    """Test batching, retries, spooling and drain."""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_does_not_wait_for_mem0(self):
+        """Enqueue returns immediately even when Mem0 is slow."""
+        client = FakeMem0(delay=0.2)
+        queue = WriteBehindQueue(client, batch_size=4, flush_interval=0.01, spool_path=None)
+
+        start = time.perf_counter()
+        assert queue.enqueue(_write(1))
+        assert time.perf_counter() - start < 0.05
+
+        await _wait_for(lambda: len(client.stored) == 1)
+        await queue.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_batches_are_sent_concurrently(self):
+        client = FakeMem0(delay=0.05)
+        queue = WriteBehindQueue(client, batch_size=4, flush_interval=0.05, spool_path=None)
+
+        for i in range(4):
+            queue.enqueue(_write(i))
+
+        await _wait_for(lambda: len(client.stored) == 4)
+        assert client.max_active == 4
+        await queue.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried(self):
+        client = FakeMem0(fail_times=1)
+        queue = WriteBehindQueue(
+            client, batch_size=1, flush_interval=0, backoff_base=0.01, spool_path=None
+        )
+
+        queue.enqueue(_write(1))
+        await _wait_for(lambda: client.stored == ["fact 1"])
+        assert client.calls == 2
+        await queue.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_writes_are_spooled_and_replayed(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        failing = FakeMem0(fail_times=100)
+        queue = WriteBehindQueue(
+            failing, batch_size=1, flush_interval=0, max_attempts=2,
+            backoff_base=0.01, spool_path=str(spool),
+        )
+
+        queue.enqueue(_write(1))
+        await _wait_for(lambda: spool.exists())
+        await queue.drain(timeout=1)
+        assert json.loads(spool.read_text().splitlines()[0])["content"] == "fact 1"
+
+        # A fresh process replays the spool after its first successful flush
+        healthy = FakeMem0()
+        queue = WriteBehindQueue(healthy, batch_size=1, flush_interval=0, spool_path=str(spool))
+        queue.enqueue(_write(2))
+        await _wait_for(lambda: sorted(healthy.stored) == ["fact 1", "fact 2"])
+        assert not spool.exists()
+        await queue.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_unbounded_queue_replays_whole_spool(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        spool.write_text("".join(json.dumps(asdict(_write(i))) + "\n" for i in range(3)))
+        healthy = FakeMem0()
+        queue = WriteBehindQueue(
+            healthy, max_size=0, batch_size=1, flush_interval=0, spool_path=str(spool)
+        )
+        queue.enqueue(_write(3))
+        await _wait_for(lambda: len(healthy.stored) == 4)
+        assert not spool.exists()
+        await queue.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_overflow_goes_to_spool(self, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+        client = FakeMem0(delay=0.5)
+        queue = WriteBehindQueue(
+            client, max_size=1, batch_size=1, flush_interval=0, spool_path=str(spool)
+        )
+
+        # The worker has not run yet, so the single slot is still taken
+        assert queue.enqueue(_write(1))
+        assert queue.enqueue(_write(2)) is False
+        assert "fact 2" in spool.read_text()
+        await queue.drain(timeout=2)
+
+    @pytest.mark.asyncio
+    async def test_drain_delivers_pending_writes(self):
+        client = FakeMem0()
+        queue = WriteBehindQueue(client, batch_size=2, flush_interval=10, spool_path=None)
+
+        for i in range(5):
+            queue.enqueue(_write(i))
+        await queue.drain(timeout=1)
+
+        assert sorted(client.stored) == [f"fact {i}" for i in range(5)]
+        assert queue.depth == 0
+        assert queue.enqueue(_write(6)) is False